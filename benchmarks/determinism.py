@@ -0,0 +1,83 @@
+"""Measure the throughput cost of deterministic LightGBM training.
+
+For every thread count in --threads the final-model fit (ModelTrainer.fit) runs
+with `resources.deterministic` off and on, on synthetic pg15training-like data.
+Reported per mode: best time of --repeat fits, training rows per second, the
+slowdown of deterministic mode against the default one, and whether two fits
+produced identical trees.
+
+Usage: python benchmarks/determinism.py [--rows N] [--threads 1 4] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from synthetic import make_pg15_dataset  # noqa: E402
+
+from data.etl import DataPreparation  # noqa: E402
+from model.model_trainer import ModelTrainer  # noqa: E402
+from utils.resources import ResourceBudget  # noqa: E402
+
+PARAMS = {
+    "n_estimators": 100,
+    "learning_rate": 0.1,
+    "max_depth": 6,
+    "num_leaves": 31,
+    "min_child_samples": 20,
+    "subsample": 0.8,
+    "subsample_freq": 1,
+    "colsample_bytree": 0.8,
+    "verbosity": -1,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument(
+        "--threads", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1})
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    dataset = DataPreparation.build_target(make_pg15_dataset(args.rows, args.seed))
+    y = dataset.pop(DataPreparation.TARGET_COLUMN)
+    X = DataPreparation.create_encoder("onehot").fit_transform(dataset)
+    params = {**PARAMS, "random_state": args.seed}
+
+    print(f"rows={args.rows} features={X.shape[1]}")
+    print(
+        f"{'threads':>7} {'mode':<13} {'time [s]':>9} {'rows/s':>10} "
+        f"{'cost':>7} {'identical':>9}"
+    )
+    for num_threads in args.threads:
+        default_time = None
+        for deterministic in (False, True):
+            trainer = ModelTrainer(
+                X, y, args.seed, ResourceBudget(num_threads, deterministic)
+            )
+            times, models = [], []
+            for _ in range(max(2, args.repeat)):
+                start = time.perf_counter()
+                trainer.fit(params)
+                times.append(time.perf_counter() - start)
+                models.append(trainer.booster.model_to_string())
+            best = min(times)
+            default_time = default_time or best
+            print(
+                f"{num_threads:>7} "
+                f"{'deterministic' if deterministic else 'default':<13} "
+                f"{best:>9.2f} {args.rows / best:>10.0f} "
+                f"{best / default_time - 1:>+7.1%} "
+                f"{str(len(set(models)) == 1):>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
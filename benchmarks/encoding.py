@@ -0,0 +1,68 @@
+"""Compare time and memory of DataPreparation.transform_dataset encodings.
+
+The `legacy` row is the reference the encodings replaced: a row-wise `apply`
+computing the target followed by `pd.get_dummies`.
+
+Usage: python benchmarks/encoding.py [--rows N] [--seed N]
+"""
+
+import argparse
+import functools
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from synthetic import make_pg15_dataset  # noqa: E402
+
+from data.etl import DataPreparation  # noqa: E402
+
+
+def legacy_transform(dataset: pd.DataFrame) -> pd.DataFrame:
+    """The original transform_dataset, kept as the benchmark's reference."""
+    dataset[DataPreparation.TARGET_COLUMN] = dataset["Numtppd"].apply(
+        lambda x: 1 if x != 0 else 0
+    )
+    dataset = dataset.drop(columns=DataPreparation.NUMERICAL_COLUMNS)
+    return pd.get_dummies(dataset, columns=DataPreparation.CATEGORICAL_COLUMNS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    raw = make_pg15_dataset(args.rows, args.seed)
+    print(f"rows={args.rows}")
+    print(f"{'encoding':<10} {'time [s]':>10} {'peak [MiB]':>12} {'result [MiB]':>13}")
+    transforms = {"legacy": legacy_transform} | {
+        encoding: functools.partial(
+            DataPreparation.transform_dataset, encoding=encoding
+        )
+        for encoding in DataPreparation.ENCODINGS
+    }
+    for encoding, transform in transforms.items():
+        # Timed and memory-traced separately: tracemalloc slows down allocations.
+        start = time.perf_counter()
+        transform(raw.copy())
+        elapsed = time.perf_counter() - start
+
+        dataset = raw.copy()
+        tracemalloc.start()
+        result = transform(dataset)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        size = result.memory_usage(deep=True).sum()
+        print(
+            f"{encoding:<10} {elapsed:>10.2f} {peak / 2**20:>12.1f} "
+            f"{size / 2**20:>13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
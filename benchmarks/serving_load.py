@@ -0,0 +1,105 @@
+"""Load generator for the scoring server (src/serve.py).
+
+Opens `--concurrency` keep-alive connections that each send single-row
+POST /predict requests, then reports throughput and p50/p99 latency.
+
+Usage:
+  python benchmarks/serving_load.py --port 8080 [--input rows.csv]
+      [--concurrency 64] [--requests 5000]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+import pandas as pd
+from synthetic import make_pg15_dataset
+
+
+async def _client(
+    host: str, port: int, bodies: list[bytes], latencies: list[float]
+) -> int:
+    reader, writer = await asyncio.open_connection(host, port)
+    errors = 0
+    try:
+        for body in bodies:
+            start = time.perf_counter()
+            writer.write(
+                f"POST /predict HTTP/1.1\r\nHost: {host}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                f"\r\n".encode()
+                + body
+            )
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            content_length = 0
+            while (line := await reader.readline()) not in (b"\r\n", b""):
+                name, _, value = line.decode().partition(":")
+                if name.lower() == "content-length":
+                    content_length = int(value)
+            await reader.readexactly(content_length)
+            latencies.append(time.perf_counter() - start)
+            errors += status != 200
+    finally:
+        writer.close()
+    return errors
+
+
+async def run_load(
+    host: str, port: int, rows: pd.DataFrame, concurrency: int, n_requests: int
+) -> dict[str, float]:
+    records = rows.to_dict(orient="records")
+    bodies = [
+        json.dumps(records[i % len(records)], default=str).encode()
+        for i in range(n_requests)
+    ]
+    latencies: list[float] = []
+    start = time.perf_counter()
+    errors = await asyncio.gather(
+        *(
+            _client(host, port, bodies[i::concurrency], latencies)
+            for i in range(concurrency)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    latency_ms = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors),
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(latency_ms, 50)),
+        "p99_ms": float(np.percentile(latency_ms, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--input", type=str, default=None, help="CSV of raw rows (default: synthetic)"
+    )
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    if args.input:
+        rows = pd.read_csv(args.input, nrows=10_000)
+    else:
+        rows = make_pg15_dataset(10_000)
+
+    stats = asyncio.run(
+        run_load(args.host, args.port, rows, args.concurrency, args.requests)
+    )
+    print(
+        f"requests={stats['requests']} errors={stats['errors']} "
+        f"throughput={stats['requests_per_second']:.0f} req/s "
+        f"p50={stats['p50_ms']:.2f} ms p99={stats['p99_ms']:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""Time the pipeline hot paths at several scales and compare with a stored baseline.
+
+Runs offline on synthetic pg15training-like data (see synthetic.py). For every
+row count in --rows it times:
+
+  load       DataLoader.load_data of the CSV (compact dtypes, as the pipeline)
+  transform  DataPreparation.build_target + FeatureEncoder.fit_transform
+  split      DataPreparation.train_test_split
+  trial      one ModelTrainer._objective call with fixed params (data prepared once)
+  fit        ModelTrainer.fit of the final model
+  predict    ModelTrainer.evaluate on the test split
+  metrics    ModelStatistics.calculate_metrics
+
+Each case reports the best of --repeat runs. Results are compared with the
+baseline file (cases slower by more than --tolerance are flagged as regressions);
+--save-baseline replaces it. Baselines are machine specific: record one on the
+machine that runs the comparison.
+
+Usage: python benchmarks/suite.py [--rows 10000 100000] [--repeat 3]
+           [--encoding onehot] [--baseline benchmarks/baseline.json]
+           [--save-baseline] [--fail-on-regression]
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import lightgbm as lgb
+import optuna
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from synthetic import make_pg15_dataset  # noqa: E402
+
+from config import FloatRange, IntRange, OptunaConfig  # noqa: E402
+from data.data_loader import DataLoader  # noqa: E402
+from data.etl import DataPreparation  # noqa: E402
+from data.schema import PG15_SCHEMA  # noqa: E402
+from model.model_trainer import ModelTrainer  # noqa: E402
+from utils.statistics import ModelStatistics  # noqa: E402
+
+DEFAULT_BASELINE: Path = Path(__file__).resolve().parent / "baseline.json"
+
+# Fixed hyperparameters of the timed trial and final fit
+PARAMS: dict[str, Any] = {
+    "n_estimators": 50,
+    "learning_rate": 0.1,
+    "max_depth": 6,
+    "num_leaves": 31,
+    "min_child_samples": 20,
+    "subsample": 0.8,
+    "colsample_bytree": 0.8,
+}
+
+
+def fixed_optuna_config() -> OptunaConfig:
+    """OptunaConfig whose search space is the single point PARAMS."""
+    ranges = {
+        name: (IntRange if isinstance(value, int) else FloatRange)(value, value)
+        for name, value in PARAMS.items()
+    }
+    return OptunaConfig(n_trials=1, **ranges)
+
+
+def best_time(fn: Callable[[], Any], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run_scale(
+    n_rows: int, encoding: str, repeat: int, seed: int, tmp_dir: str
+) -> dict[str, float]:
+    """Seconds per case for one dataset size."""
+    dataset_path = os.path.join(tmp_dir, f"pg15_{n_rows}.csv")
+    make_pg15_dataset(n_rows, seed).to_csv(dataset_path, index=False)
+    results = {}
+
+    def load() -> pd.DataFrame:
+        return DataLoader.load_data(dataset_path, schema=PG15_SCHEMA)
+
+    results["load"] = best_time(load, repeat)
+    raw = load()
+
+    def transform() -> pd.DataFrame:
+        dataset = DataPreparation.build_target(raw)
+        target = dataset.pop(DataPreparation.TARGET_COLUMN)
+        encoded = DataPreparation.create_encoder(encoding).fit_transform(dataset)
+        encoded[DataPreparation.TARGET_COLUMN] = target.to_numpy()
+        return encoded
+
+    results["transform"] = best_time(transform, repeat)
+    encoded = transform()
+
+    results["split"] = best_time(
+        lambda: DataPreparation.train_test_split(encoded, random_state=seed), repeat
+    )
+    X_train, X_test, y_train, y_test = DataPreparation.train_test_split(
+        encoded, random_state=seed
+    )
+
+    config = fixed_optuna_config()
+    trainer = ModelTrainer(X_train, y_train, random_state=seed)
+    trainer._prepare_datasets(0.2, config)
+    try:
+        results["trial"] = best_time(
+            lambda: trainer._objective(optuna.trial.FixedTrial(PARAMS), config),
+            repeat,
+        )
+    finally:
+        trainer._release_datasets()
+
+    params = {**PARAMS, "random_state": seed, "verbosity": -1}
+    results["fit"] = best_time(lambda: trainer.fit(params), repeat)
+    results["predict"] = best_time(lambda: trainer.evaluate(X_test, y_test), repeat)
+    y_pred = trainer.evaluate(X_test, y_test)
+    results["metrics"] = best_time(
+        lambda: ModelStatistics.calculate_metrics(y_test, y_pred), repeat
+    )
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+) -> list[str]:
+    """Print current vs. baseline times; return the regressed "<rows>/<case>"s."""
+    regressions = []
+    print(f"{'rows':>9} {'case':<10} {'time [ms]':>10} {'baseline':>10} {'ratio':>7}")
+    for rows, cases in results.items():
+        for case, seconds in cases.items():
+            reference = baseline.get(rows, {}).get(case)
+            ratio = seconds / reference if reference else None
+            flag = ""
+            if ratio is not None and ratio > 1 + tolerance:
+                regressions.append(f"{rows}/{case}")
+                flag = "  REGRESSION"
+            print(
+                f"{rows:>9} {case:<10} {seconds * 1000:>10.1f} "
+                + (
+                    f"{reference * 1000:>10.1f} {ratio:>6.2f}x"
+                    if ratio is not None
+                    else f"{'-':>10} {'-':>7}"
+                )
+                + flag
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--encoding", choices=DataPreparation.ENCODINGS, default="onehot"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown vs. baseline as a fraction (default: 0.25)",
+    )
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = {
+            str(n_rows): run_scale(
+                n_rows, args.encoding, args.repeat, args.seed, tmp_dir
+            )
+            for n_rows in args.rows
+        }
+
+    baseline = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("encoding") != args.encoding:
+            print(f"Baseline encoding {baseline.get('encoding')} != {args.encoding}")
+    regressions = compare(results, baseline.get("results", {}), args.tolerance)
+
+    if args.save_baseline:
+        args.baseline.write_text(
+            json.dumps(
+                {
+                    "machine": {
+                        "platform": platform.platform(),
+                        "python": platform.python_version(),
+                        "cpu_count": os.cpu_count(),
+                        "lightgbm": lgb.__version__,
+                        "pandas": pd.__version__,
+                    },
+                    "encoding": args.encoding,
+                    "repeat": args.repeat,
+                    "results": results,
+                },
+                indent=2,
+            )
+            + "\n"
+        )
+        print(f"Saved baseline to {args.baseline}")
+
+    if regressions:
+        print(f"Regressions (> {args.tolerance:.0%} slower): {', '.join(regressions)}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
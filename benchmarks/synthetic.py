@@ -0,0 +1,57 @@
+"""Synthetic data generator matching the pg15training schema.
+
+Column names, dtypes and category cardinalities follow the CASdatasets pg15training
+data frame; values are random, with the claim counts drawn so that roughly 10% of
+policies have a third-party property damage claim.
+"""
+
+import numpy as np
+import pandas as pd
+
+CATEGORY_LEVELS: dict[str, list] = {
+    "CalYear": [2009, 2010],
+    "Gender": ["Male", "Female"],
+    "Type": ["A", "B", "C", "D", "E", "F"],
+    "Category": ["Large", "Medium", "Small"],
+    "Occupation": ["Employed", "Housewife", "Retired", "Self-employed", "Unemployed"],
+    "Group1": list(range(1, 21)),
+    "SubGroup2": [f"L{i}" for i in range(1, 472)],
+    "Group2": list("LMNOPQRSTU"),
+}
+
+
+def make_pg15_dataset(
+    n_rows: int, seed: int = 42, n_subgroups: int | None = None
+) -> pd.DataFrame:
+    """Random pg15training-like frame with `n_rows` rows.
+
+    `n_subgroups` limits the SubGroup2 cardinality (the widest one-hot block).
+    """
+    rng = np.random.default_rng(seed)
+    levels = dict(CATEGORY_LEVELS)
+    if n_subgroups is not None:
+        levels["SubGroup2"] = levels["SubGroup2"][:n_subgroups]
+
+    data = {
+        "PolNum": np.arange(200_000_000, 200_000_000 + n_rows),
+        "CalYear": rng.choice(levels["CalYear"], n_rows),
+        "Gender": rng.choice(levels["Gender"], n_rows),
+        "Type": rng.choice(levels["Type"], n_rows),
+        "Category": rng.choice(levels["Category"], n_rows),
+        "Occupation": rng.choice(levels["Occupation"], n_rows),
+        "Age": rng.integers(18, 76, n_rows),
+        "Group1": rng.choice(levels["Group1"], n_rows),
+        "Bonus": rng.integers(-50, 151, n_rows),
+        "Poldur": rng.integers(0, 16, n_rows),
+        "Value": rng.integers(1000, 50_000, n_rows),
+        "Adind": rng.integers(0, 2, n_rows),
+        "SubGroup2": rng.choice(levels["SubGroup2"], n_rows),
+        "Group2": rng.choice(levels["Group2"], n_rows),
+        "Density": rng.uniform(14, 300, n_rows),
+        "Exppdays": rng.integers(1, 366, n_rows),
+        "Numtppd": rng.poisson(0.11, n_rows),
+        "Numtpbi": rng.poisson(0.04, n_rows),
+    }
+    data["Indtppd"] = np.where(data["Numtppd"] > 0, rng.gamma(2, 800, n_rows), 0.0)
+    data["Indtpbi"] = np.where(data["Numtpbi"] > 0, rng.gamma(2, 2500, n_rows), 0.0)
+    return pd.DataFrame(data)
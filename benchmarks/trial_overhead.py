@@ -0,0 +1,96 @@
+"""Compare per-trial overhead of the Optuna objective before and after dataset reuse.
+
+The "legacy" path re-splits the pandas frame and fits an `LGBMClassifier` on every
+trial (binning the data each time); the "prepared" path splits and bins once and
+trains every trial against the shared `lightgbm.Dataset`.
+
+Usage: python benchmarks/trial_overhead.py [--rows N] [--trials N] [--rounds N]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+from lightgbm import LGBMClassifier
+from sklearn.model_selection import train_test_split
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from model.model_trainer import ModelTrainer  # noqa: E402
+
+
+def make_dataset(n_rows: int, n_features: int, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(
+        rng.integers(0, 2, size=(n_rows, n_features)).astype(bool),
+        columns=[f"f{i}" for i in range(n_features)],
+    )
+    y = pd.Series((rng.random(n_rows) < 0.1).astype(int))
+    return X, y
+
+
+def legacy_trial(X, y, n_rounds: int, seed: int):
+    X_train_sub, X_val, y_train_sub, y_val = train_test_split(
+        X, y, test_size=0.2, random_state=seed
+    )
+    model = LGBMClassifier(
+        n_estimators=n_rounds, n_jobs=-1, random_state=seed, verbosity=-1
+    )
+    model.fit(X_train_sub, y_train_sub)
+    model.predict(X_val)
+
+
+def prepared_trial(trainer: ModelTrainer, n_rounds: int, seed: int):
+    booster = lgb.train(
+        {"objective": "binary", "seed": seed, **ModelTrainer.DATASET_PARAMS},
+        trainer._train_set,
+        num_boost_round=n_rounds,
+    )
+    booster.predict(trainer._X_val)
+
+
+def time_trials(fn, n_trials: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n_trials):
+        fn()
+    return (time.perf_counter() - start) / n_trials
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--features", type=int, default=60)
+    parser.add_argument("--trials", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    X, y = make_dataset(args.rows, args.features, args.seed)
+
+    legacy = time_trials(
+        lambda: legacy_trial(X, y, args.rounds, args.seed), args.trials
+    )
+
+    trainer = ModelTrainer(X, y, random_state=args.seed)
+    start = time.perf_counter()
+    trainer._prepare_hold_out(test_size=0.2)
+    setup = time.perf_counter() - start
+    prepared = time_trials(
+        lambda: prepared_trial(trainer, args.rounds, args.seed), args.trials
+    )
+
+    print(f"rows={args.rows} features={args.features} rounds={args.rounds}")
+    print(f"legacy   per-trial: {legacy * 1000:8.1f} ms")
+    print(
+        f"prepared per-trial: {prepared * 1000:8.1f} ms "
+        f"(one-off setup {setup * 1000:.1f} ms)"
+    )
+    print(f"speedup: {legacy / prepared:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,31 @@
-from dataclasses import dataclass
+import os
+from dataclasses import dataclass, field
 
 from utils.files import read_yaml
 
+# Allowed values of the string options, kept here so a config can be validated
+# without importing the modules implementing them (and their heavy dependencies).
+ENCODINGS: tuple[str, ...] = ("onehot", "category", "sparse")
+DATASET_FORMATS: tuple[str, ...] = ("csv", "parquet", "feather")
+PRUNERS: tuple[str, ...] = ("median", "successive_halving", "hyperband")
+METRICS: tuple[str, ...] = ("accuracy", "auc", "logloss", "f1", "pr_auc")
+INFERENCE_COSTS: tuple[str, ...] = ("latency", "complexity")
+PROFILING_MODES: tuple[str, ...] = ("cprofile", "tracemalloc")
+UPDATE_MODES: tuple[str, ...] = ("boost", "refit")
+LOG_LEVELS: tuple[str, ...] = ("DEBUG", "INFO", "WARNING", "ERROR")
+CONSOLE_FORMATS: tuple[str, ...] = ("text", "json")
+
+# Hyperparameters searched by Optuna, each with a range in OptunaConfig
+SEARCH_SPACE: tuple[str, ...] = (
+    "n_estimators",
+    "learning_rate",
+    "max_depth",
+    "num_leaves",
+    "min_child_samples",
+    "subsample",
+    "colsample_bytree",
+)
+
 
 @dataclass
 class IntRange:
@@ -20,11 +44,27 @@ class DataConfig:
     url: str
     dataset_file_path: str
     dataset_name: str
+    # Download cache (conditional requests, content-addressed blobs); None disables it
+    cache_dir: str | None = None
+    # Cached entries younger than this are reused without contacting the server
+    cache_ttl_seconds: int = 0
+    # csv, parquet or feather; None infers it from the dataset_file_path extension
+    dataset_format: str | None = None
+    # Extra feature columns to load besides those DataPreparation requires;
+    # None loads every column.
+    columns: list[str] | None = None
 
 
 @dataclass
 class DatasetConfig:
     test_size: float
+    # Categorical encoding: onehot, category (native LightGBM) or sparse (CSR)
+    encoding: str = "onehot"
+    # Out-of-core: stream the dataset in chunks of chunk_size rows into a LightGBM
+    # binary Dataset under binary_dir instead of loading it into memory
+    out_of_core: bool = False
+    chunk_size: int = 100_000
+    binary_dir: str = "data/processed"
 
 
 @dataclass
@@ -37,6 +77,38 @@ class OptunaConfig:
     min_child_samples: IntRange
     subsample: FloatRange
     colsample_bytree: FloatRange
+    # Parallel execution: n_workers processes share a file-backed study journal.
+    # threads_per_worker defaults to resources.num_threads // n_workers.
+    n_workers: int = 1
+    threads_per_worker: int | None = None
+    # Journal file persisting studies across runs (keyed by data and search space);
+    # None keeps the study in memory (or a temporary file for parallel workers).
+    storage_path: str | None = None
+    # Run n_trials more on a resumed study instead of topping it up to n_trials
+    extend_study: bool = False
+    # Stop a trial once validation logloss has not improved for this many rounds.
+    early_stopping_rounds: int | None = None
+    # Score trials by stratified k-fold cross-validation instead of one hold-out
+    cv_folds: int | None = None
+    # One of: median, successive_halving, hyperband; None disables pruning.
+    pruner: str | None = None
+    # Objective: accuracy, auc, logloss, f1 (at the validation-optimal threshold)
+    # or pr_auc
+    metric: str = "accuracy"
+    # Multi-objective search also minimizing inference cost: latency (predict
+    # microseconds per row) or complexity (leaves of all trees); no pruning then.
+    # The final model is the best-scoring Pareto-optimal trial within
+    # max_inference_cost; the whole front is written to pareto_front_path.
+    inference_cost: str | None = None
+    max_inference_cost: float | None = None
+    pareto_front_path: str | None = None
+    # Multi-fidelity search: a trial first trains on these increasing fractions of
+    # the training rows (stratified, each sample nested in the next) and moves on
+    # to the next one, and finally to all rows, only while its score ranks in the
+    # top 1 / fidelity_reduction_factor of the trials scored on that fraction.
+    # None trains every trial on all rows; not with cv_folds or inference_cost.
+    fidelities: list[float] | None = None
+    fidelity_reduction_factor: int = 3
 
 
 @dataclass
@@ -44,6 +116,100 @@ class ModelConfig:
     output_path: str
     output_params_path: str
     metrics_path: str
+    # Fitted FeatureEncoder (JSON); defaults to encoder.json next to output_path
+    encoder_path: str | None = None
+    # Model flattened to NumPy arrays (model.compiled); defaults to model.npz next
+    # to output_path
+    compiled_path: str | None = None
+    # History of the saved models (full and incremental trainings); defaults to
+    # lineage.json next to output_path
+    lineage_path: str | None = None
+
+    def __post_init__(self):
+        if self.encoder_path is None:
+            self.encoder_path = os.path.join(
+                os.path.dirname(self.output_path), "encoder.json"
+            )
+        if self.compiled_path is None:
+            self.compiled_path = os.path.join(
+                os.path.dirname(self.output_path), "model.npz"
+            )
+        if self.lineage_path is None:
+            self.lineage_path = os.path.join(
+                os.path.dirname(self.output_path), "lineage.json"
+            )
+
+
+@dataclass
+class ServingConfig:
+    host: str = "127.0.0.1"
+    port: int = 8080
+    # A micro-batch is scored once it has max_batch_size rows or its first request
+    # waited max_wait_ms.
+    max_batch_size: int = 256
+    max_wait_ms: float = 5.0
+    # Score with the compiled NumPy model (model.compiled_path) instead of the
+    # LightGBM booster: lower latency for single rows and small batches, slower
+    # for batches of more than ~100 rows.
+    compiled: bool = False
+
+
+@dataclass
+class IncrementalConfig:
+    # Update the saved model with the rows of new partition_column values only.
+    # Falls back to full training without a saved model or lineage match, or after
+    # max_updates updates since the last full training.
+    enabled: bool = False
+    partition_column: str = "CalYear"
+    # boost: add num_boost_round trees fitted on the new rows; refit: keep the
+    # trees and refit their leaf values (decay_rate is the weight of the old ones)
+    mode: str = "boost"
+    num_boost_round: int = 50
+    decay_rate: float = 0.9
+    # The update is saved only if gate_metric on the hold-out of the new rows is
+    # at most max_metric_drop worse than with the previous model (one of the
+    # optuna.metric choices)
+    gate_metric: str = "auc"
+    max_metric_drop: float = 0.0
+    max_updates: int = 10
+
+
+@dataclass
+class CacheConfig:
+    # Stage result cache (load, transform, split, optimize, fit); None disables it
+    dir: str | None = None
+    max_size_mb: int = 2048
+
+
+@dataclass
+class ProfilingConfig:
+    # JSON report of per-stage and per-trial timings and memory; defaults to
+    # profile.json next to metrics.json
+    report_path: str | None = None
+    # Optional deep profiling: cprofile or tracemalloc (adds overhead)
+    mode: str | None = None
+
+
+@dataclass
+class ResourcesConfig:
+    # Threads of the whole run: LightGBM num_threads and the OpenMP/BLAS pools
+    # (OMP_NUM_THREADS etc.), split between parallel workers; None uses all cores
+    num_threads: int | None = None
+    # Reproducible LightGBM training for a given thread count (deterministic and
+    # force_row_wise), at a throughput cost (see benchmarks/determinism.py)
+    deterministic: bool = False
+
+
+@dataclass
+class LoggingConfig:
+    level: str = "DEBUG"
+    # Human-readable log file; None logs to the console only
+    log_path: str | None = "training.log"
+    # Console output: text (human-readable) or json (one object per line)
+    console: str = "text"
+    # JSON-lines file of structured events, one per Optuna trial (params, score,
+    # duration); None disables it
+    events_path: str | None = None
 
 
 @dataclass
@@ -53,6 +219,38 @@ class Config:
     dataset: DatasetConfig
     optuna: OptunaConfig
     model: ModelConfig
+    serving: ServingConfig = field(default_factory=ServingConfig)
+    incremental: IncrementalConfig = field(default_factory=IncrementalConfig)
+    cache: CacheConfig = field(default_factory=CacheConfig)
+    profiling: ProfilingConfig = field(default_factory=ProfilingConfig)
+    resources: ResourcesConfig = field(default_factory=ResourcesConfig)
+    logging: LoggingConfig = field(default_factory=LoggingConfig)
+
+
+def _load_optuna_config(optuna_config: dict) -> OptunaConfig:
+    return OptunaConfig(
+        n_trials=optuna_config["n_trials"],
+        n_estimators=IntRange(**optuna_config["n_estimators"]),
+        learning_rate=FloatRange(**optuna_config["learning_rate"]),
+        max_depth=IntRange(**optuna_config["max_depth"]),
+        num_leaves=IntRange(**optuna_config["num_leaves"]),
+        min_child_samples=IntRange(**optuna_config["min_child_samples"]),
+        subsample=FloatRange(**optuna_config["subsample"]),
+        colsample_bytree=FloatRange(**optuna_config["colsample_bytree"]),
+        n_workers=optuna_config.get("n_workers", 1),
+        threads_per_worker=optuna_config.get("threads_per_worker"),
+        storage_path=optuna_config.get("storage_path"),
+        extend_study=optuna_config.get("extend_study", False),
+        early_stopping_rounds=optuna_config.get("early_stopping_rounds"),
+        cv_folds=optuna_config.get("cv_folds"),
+        pruner=optuna_config.get("pruner"),
+        metric=optuna_config.get("metric", "accuracy"),
+        inference_cost=optuna_config.get("inference_cost"),
+        max_inference_cost=optuna_config.get("max_inference_cost"),
+        pareto_front_path=optuna_config.get("pareto_front_path"),
+        fidelities=optuna_config.get("fidelities"),
+        fidelity_reduction_factor=optuna_config.get("fidelity_reduction_factor", 3),
+    )
 
 
 def load_config(path: str) -> Config:
@@ -62,15 +260,77 @@ def load_config(path: str) -> Config:
         random_state=config_file["random_state"],
         data=DataConfig(**config_file["data"]),
         dataset=DatasetConfig(**config_file["dataset"]),
-        optuna=OptunaConfig(
-            n_trials=config_file["optuna"]["n_trials"],
-            n_estimators=IntRange(**config_file["optuna"]["n_estimators"]),
-            learning_rate=FloatRange(**config_file["optuna"]["learning_rate"]),
-            max_depth=IntRange(**config_file["optuna"]["max_depth"]),
-            num_leaves=IntRange(**config_file["optuna"]["num_leaves"]),
-            min_child_samples=IntRange(**config_file["optuna"]["min_child_samples"]),
-            subsample=FloatRange(**config_file["optuna"]["subsample"]),
-            colsample_bytree=FloatRange(**config_file["optuna"]["colsample_bytree"]),
-        ),
+        optuna=_load_optuna_config(config_file["optuna"]),
         model=ModelConfig(**config_file["model"]),
+        serving=ServingConfig(**config_file.get("serving", {})),
+        incremental=IncrementalConfig(**config_file.get("incremental", {})),
+        cache=CacheConfig(**config_file.get("cache", {})),
+        profiling=ProfilingConfig(**config_file.get("profiling", {})),
+        resources=ResourcesConfig(**config_file.get("resources", {})),
+        logging=LoggingConfig(**config_file.get("logging", {})),
     )
+
+
+def validate_config(config: Config) -> list[str]:
+    """Problems of a loaded config beyond its structure; empty if it is valid."""
+    errors = []
+
+    def check_choice(name: str, value: str | None, choices: tuple[str, ...]):
+        if value is not None and value not in choices:
+            errors.append(f"{name}: {value!r} is not one of {choices}")
+
+    check_choice("data.dataset_format", config.data.dataset_format, DATASET_FORMATS)
+    check_choice("dataset.encoding", config.dataset.encoding, ENCODINGS)
+    check_choice("optuna.pruner", config.optuna.pruner, PRUNERS)
+    check_choice("optuna.metric", config.optuna.metric, METRICS)
+    check_choice("optuna.inference_cost", config.optuna.inference_cost, INFERENCE_COSTS)
+    check_choice("profiling.mode", config.profiling.mode, PROFILING_MODES)
+    check_choice("incremental.mode", config.incremental.mode, UPDATE_MODES)
+    check_choice("logging.level", config.logging.level, LOG_LEVELS)
+    check_choice("logging.console", config.logging.console, CONSOLE_FORMATS)
+    check_choice("incremental.gate_metric", config.incremental.gate_metric, METRICS)
+
+    if not 0 < config.dataset.test_size < 1:
+        errors.append(f"dataset.test_size: {config.dataset.test_size} not in (0, 1)")
+    if config.dataset.chunk_size < 1:
+        errors.append(f"dataset.chunk_size: {config.dataset.chunk_size} < 1")
+    if config.optuna.n_trials < 1:
+        errors.append(f"optuna.n_trials: {config.optuna.n_trials} < 1")
+    if config.optuna.n_workers < 1:
+        errors.append(f"optuna.n_workers: {config.optuna.n_workers} < 1")
+    if config.optuna.cv_folds is not None and config.optuna.cv_folds < 2:
+        errors.append(f"optuna.cv_folds: {config.optuna.cv_folds} < 2")
+    if config.optuna.fidelities:
+        fidelities = config.optuna.fidelities
+        if not all(0 < fraction < 1 for fraction in fidelities):
+            errors.append(f"optuna.fidelities: {fidelities} not all in (0, 1)")
+        if sorted(set(fidelities)) != list(fidelities):
+            errors.append(f"optuna.fidelities: {fidelities} not increasing")
+        if config.optuna.cv_folds or config.optuna.inference_cost:
+            errors.append(
+                "optuna.fidelities: not supported with cv_folds or inference_cost"
+            )
+    if config.optuna.fidelity_reduction_factor < 2:
+        errors.append(
+            "optuna.fidelity_reduction_factor: "
+            f"{config.optuna.fidelity_reduction_factor} < 2"
+        )
+    if config.resources.num_threads is not None and config.resources.num_threads < 1:
+        errors.append(f"resources.num_threads: {config.resources.num_threads} < 1")
+    if config.incremental.num_boost_round < 1:
+        errors.append(
+            f"incremental.num_boost_round: {config.incremental.num_boost_round} < 1"
+        )
+    if not 0 <= config.incremental.decay_rate <= 1:
+        errors.append(
+            f"incremental.decay_rate: {config.incremental.decay_rate} not in [0, 1]"
+        )
+    if config.incremental.max_updates < 1:
+        errors.append(f"incremental.max_updates: {config.incremental.max_updates} < 1")
+    for name in SEARCH_SPACE:
+        value_range = getattr(config.optuna, name)
+        if value_range.min > value_range.max:
+            errors.append(
+                f"optuna.{name}: min {value_range.min} > max {value_range.max}"
+            )
+    return errors
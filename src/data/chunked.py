@@ -0,0 +1,204 @@
+"""Out-of-core preparation of datasets larger than memory.
+
+The source is only ever read in chunks: rows are assigned to the train or test
+split by a seeded random draw per row (reproducible on every pass), training
+chunks are encoded on the fly and pushed to LightGBM through `lightgbm.Sequence`
+into a binned Dataset saved in LightGBM's binary format. Only the current chunk,
+a bin sample, the labels and the binned data are held in memory.
+"""
+
+import os
+from collections.abc import Iterator
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from data.encoder import FeatureEncoder, to_model_input
+from data.etl import DataPreparation
+from data.formats import iter_dataset, resolve_format
+from utils.custom_logger import logger
+from utils.seed import DEFAULT_SEED
+
+
+class ChunkedDataset:
+    """Train/test split of a dataset file, streamed chunk by chunk."""
+
+    def __init__(
+        self,
+        dataset_path: str,
+        dataset_format: str | None = None,
+        chunk_size: int = 100_000,
+        test_size: float = 0.2,
+        random_state: int = DEFAULT_SEED,
+        columns: list[str] | None = None,
+    ):
+        self.dataset_path = dataset_path
+        self.dataset_format = resolve_format(dataset_path, dataset_format)
+        self.chunk_size = chunk_size
+        self.test_size = test_size
+        self.random_state = random_state
+        self.columns = columns
+
+    def iter_train(self) -> Iterator[tuple[pd.DataFrame, pd.Series]]:
+        return self._iter_split(test=False)
+
+    def iter_test(self) -> Iterator[tuple[pd.DataFrame, pd.Series]]:
+        return self._iter_split(test=True)
+
+    def _iter_split(self, test: bool) -> Iterator[tuple[pd.DataFrame, pd.Series]]:
+        rng = np.random.default_rng(self.random_state)
+        for chunk in iter_dataset(
+            self.dataset_path, self.dataset_format, self.chunk_size, self.columns
+        ):
+            chunk = DataPreparation.build_target(chunk)
+            is_test = rng.random(len(chunk)) < self.test_size
+            rows = chunk[is_test if test else ~is_test]
+            yield (
+                rows.drop(columns=DataPreparation.TARGET_COLUMN),
+                rows[DataPreparation.TARGET_COLUMN],
+            )
+
+    def save_binary(
+        self,
+        output_path: str,
+        encoding: str = "onehot",
+        params: dict | None = None,
+        bin_sample_rows: int = 50_000,
+    ) -> FeatureEncoder:
+        """Encode and bin the training rows into a LightGBM binary Dataset file.
+
+        The first pass fits the encoder, collects the labels and draws a uniform
+        sample of `bin_sample_rows` rows; bin boundaries are computed from that
+        sample (a small reference Dataset), so the second pass only pushes encoded
+        chunks into the binned Dataset. Returns the fitted encoder.
+        """
+        encoder = DataPreparation.create_encoder(encoding)
+        labels = []
+        sample, sample_keys = None, np.empty(0)
+        rng = np.random.default_rng(self.random_state)
+        for X, y in self.iter_train():
+            encoder.partial_fit(X)
+            labels.append(y.to_numpy(dtype=np.int8))
+            # Rows with the smallest random keys form a uniform sample
+            rows = X.assign(**{DataPreparation.TARGET_COLUMN: y})
+            sample = rows if sample is None else pd.concat([sample, rows])
+            sample_keys = np.concatenate([sample_keys, rng.random(len(rows))])
+            keep = np.argsort(sample_keys)[:bin_sample_rows]
+            sample, sample_keys = sample.iloc[keep], sample_keys[keep]
+        labels = np.concatenate(labels)
+
+        logger.debug(
+            "Build binary training dataset of %s rows, bins from %s sampled rows",
+            len(labels),
+            len(sample),
+        )
+        categorical_feature = "auto"
+        if encoding == "category":
+            categorical_feature = encoder.categorical_columns
+        y_sample = sample.pop(DataPreparation.TARGET_COLUMN)
+        # Encoded chunk by chunk into CSR: one-hot samples are mostly zeros
+        sample_data = sparse.vstack(
+            [
+                sparse.csr_matrix(
+                    to_array(encoder.transform(sample[i : i + self.chunk_size]))
+                )
+                for i in range(0, len(sample), self.chunk_size)
+            ],
+            format="csr",
+        )
+        reference = lgb.Dataset(
+            sample_data,
+            label=y_sample,
+            feature_name=encoder.feature_names,
+            categorical_feature=categorical_feature,
+            params=params,
+            free_raw_data=True,
+        ).construct()
+        dataset = lgb.Dataset(
+            _EncodedSequence(self, encoder, len(labels)),
+            label=labels,
+            reference=reference,
+            feature_name=encoder.feature_names,
+            params=params,
+            free_raw_data=True,
+        )
+
+        tmp_path = f"{output_path}.part"
+        try:
+            dataset.save_binary(tmp_path)
+            os.replace(tmp_path, output_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        logger.debug("Saved binary training dataset to path: %s", output_path)
+        return encoder
+
+
+class _EncodedSequence(lgb.Sequence):
+    """Encoded training rows of a ChunkedDataset, read in row order.
+
+    One encoded chunk is buffered; an index before the buffer restarts the
+    stream from the beginning of the source.
+    """
+
+    def __init__(self, chunks: ChunkedDataset, encoder: FeatureEncoder, n_rows: int):
+        self.chunks = chunks
+        self.encoder = encoder
+        self.n_rows = n_rows
+        self.batch_size = chunks.chunk_size
+        self._restart()
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    def __getitem__(self, idx: int | slice) -> np.ndarray:
+        if isinstance(idx, slice):
+            return self._rows(idx.start or 0, min(idx.stop, self.n_rows))
+        return self._rows(idx, idx + 1)[0]
+
+    def _restart(self):
+        self._stream = self.chunks.iter_train()
+        self._block_start = 0
+        self._block = np.empty((0, len(self.encoder.feature_names)), np.float32)
+
+    def _rows(self, start: int, stop: int) -> np.ndarray:
+        if start < self._block_start:
+            self._restart()
+
+        parts = []
+        while True:
+            block_end = self._block_start + len(self._block)
+            if start < block_end:
+                parts.append(
+                    self._block[
+                        start - self._block_start : min(stop, block_end)
+                        - self._block_start
+                    ]
+                )
+                if stop <= block_end:
+                    break
+                start = block_end
+            self._block_start = block_end
+            self._block = to_array(self.encoder.transform(next(self._stream)[0]))
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+
+def to_array(X: pd.DataFrame) -> np.ndarray:
+    """Encoded features as a dense float32 array; categories as codes (NaN unknown).
+
+    Matches how LightGBM converts a DataFrame with `category` columns.
+    """
+    model_input = to_model_input(X)
+    if sparse.issparse(model_input):
+        return model_input.toarray()
+
+    array = np.empty(X.shape, dtype=np.float32)
+    for i, (_, values) in enumerate(X.items()):
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = values.cat.codes.to_numpy()
+            array[:, i] = np.where(codes >= 0, codes, np.nan)
+        else:
+            array[:, i] = values.to_numpy(dtype=np.float32)
+    return array
@@ -1,22 +1,51 @@
 import io
+from pathlib import Path
 
 import rdata
 import requests
 
-from pathlib import Path
+from data.download_cache import DownloadCache
+from data.formats import resolve_format, write_dataset
+from utils.custom_logger import logger
 
-class DataDownloader:
 
+class DataDownloader:
     @staticmethod
-    def download_data(url: str, output_path: str, dataset_name: str):
-        """Download an R .rda dataset from `url` and save it as CSV to `output_path`.
+    def download_data(
+        url: str,
+        output_path: str,
+        dataset_name: str,
+        cache_dir: str | None = None,
+        cache_ttl_seconds: float = 0,
+        dataset_format: str | None = None,
+    ):
+        """Download an R .rda dataset from `url` and save it to `output_path`.
 
-        `output_path` may be a relative path including filename (e.g. "data/raw/pg15training.csv").
+        `output_path` may be a relative path including filename
+        (e.g. "data/raw/pg15training.csv"). The file format (CSV, Parquet or
+        Feather) is `dataset_format` or inferred from the extension.
+
+        With `cache_dir` set, the .rda is kept in a `DownloadCache` and revalidated
+        with conditional requests (or not at all within `cache_ttl_seconds`); the
+        output is rebuilt only when the downloaded content changed.
         """
         out_path = Path(output_path)
         out_path.parent.mkdir(parents=True, exist_ok=True)
+        dataset_format = resolve_format(output_path, dataset_format)
+
+        if cache_dir is None:
+            data_response = requests.get(url)
+            data_file = io.BytesIO(data_response.content)
+            r_data = rdata.read_rda(data_file)[dataset_name]
+            write_dataset(r_data, output_path, dataset_format)
+            return
+
+        cache = DownloadCache(cache_dir, ttl_seconds=cache_ttl_seconds)
+        entry = cache.fetch(url)
+        if cache.is_output_current(entry, output_path):
+            logger.debug("Dataset is up to date, skip conversion: %s", output_path)
+            return
 
-        data_response = requests.get(url)
-        data_file = io.BytesIO(data_response.content)
-        r_data = rdata.read_rda(data_file)[dataset_name]
-        r_data.to_csv(out_path, index=False)
+        r_data = rdata.read_rda(cache.blob_path(entry))[dataset_name]
+        write_dataset(r_data, output_path, dataset_format)
+        cache.record_output(entry, output_path)
@@ -1,18 +1,47 @@
-import pandas as pd
 from pathlib import Path
 
-from pathlib import Path
+import pandas as pd
+
+from data.formats import read_dataset, resolve_format
+from data.schema import compact, default_dtypes_bytes, read_dtypes
 from utils.custom_logger import logger
 
-class DataLoader:
 
+class DataLoader:
     @staticmethod
-    def load_data(dataset_path: str) -> pd.DataFrame:
-        logger.debug(f"Load dataset from path: {dataset_path}")
+    def load_data(
+        dataset_path: str,
+        dataset_format: str | None = None,
+        columns: list[str] | None = None,
+        schema: dict[str, str] | None = None,
+    ) -> pd.DataFrame:
+        """Load a CSV, Parquet or Feather dataset, optionally only `columns`.
+
+        The format is `dataset_format` or inferred from the file extension. With a
+        `schema` (see data.schema) only its columns are loaded unless `columns`
+        are given, in their compact dtypes.
+        """
+        logger.debug("Load dataset from path: %s", dataset_path)
 
         path = Path(dataset_path)
 
         if not path.exists():
             raise FileNotFoundError(f"Dataset file does not exist: {dataset_path}")
 
-        return pd.read_csv(path)
+        dataset_format = resolve_format(dataset_path, dataset_format)
+        if schema is None:
+            return read_dataset(dataset_path, dataset_format, columns)
+
+        columns = columns or list(schema)
+        dataset = compact(
+            read_dataset(
+                dataset_path, dataset_format, columns, read_dtypes(schema, columns)
+            ),
+            schema,
+        )
+        logger.debug(
+            "Dataset memory: %.1f MB with default dtypes, %.1f MB compact",
+            default_dtypes_bytes(dataset) / 1024**2,
+            dataset.memory_usage(deep=True).sum() / 1024**2,
+        )
+        return dataset
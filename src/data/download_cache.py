@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import requests
+
+from utils.custom_logger import logger
+
+CHUNK_SIZE: int = 1024 * 1024
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    sha256: str
+    etag: str | None = None
+    last_modified: str | None = None
+    checked_at: float = 0.0
+    # Derived files built from this entry: output path -> {"sha256", "mtime_ns"}
+    outputs: dict[str, dict] = field(default_factory=dict)
+
+
+class DownloadCache:
+    """Local download cache keyed by URL, storing payloads by content hash.
+
+    Layout under `cache_dir`:
+      blobs/<sha256>        downloaded payloads (content addressed)
+      entries/<url-hash>.json  per-URL metadata (ETag, Last-Modified, sha256)
+    """
+
+    def __init__(self, cache_dir: str, ttl_seconds: float = 0):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        (self.cache_dir / "blobs").mkdir(parents=True, exist_ok=True)
+        (self.cache_dir / "entries").mkdir(parents=True, exist_ok=True)
+
+    def blob_path(self, entry: CacheEntry) -> Path:
+        return self.cache_dir / "blobs" / entry.sha256
+
+    def fetch(self, url: str) -> CacheEntry:
+        """Return the cache entry for `url`, downloading only if the source changed.
+
+        Entries checked within `ttl_seconds` are returned without any network call;
+        older ones are revalidated with If-None-Match / If-Modified-Since.
+        """
+        entry = self.get_entry(url)
+        if entry is not None and self.blob_path(entry).exists():
+            if time.time() - entry.checked_at < self.ttl_seconds:
+                logger.debug("Download cache hit (fresh): %s", url)
+                return entry
+            headers = {}
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        else:
+            entry = None
+            headers = {}
+
+        with requests.get(url, headers=headers, stream=True, timeout=60) as response:
+            if entry is not None and response.status_code == 304:
+                logger.debug("Download cache hit (not modified): %s", url)
+                entry.checked_at = time.time()
+                self.put_entry(entry)
+                return entry
+
+            response.raise_for_status()
+            sha256 = self._stream_to_blob(response)
+
+        logger.debug("Downloaded %s (sha256=%s)", url, sha256)
+        new_entry = CacheEntry(
+            url=url,
+            sha256=sha256,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            checked_at=time.time(),
+        )
+        if entry is not None and entry.sha256 == sha256:
+            new_entry.outputs = entry.outputs
+        self.put_entry(new_entry)
+        return new_entry
+
+    def get_entry(self, url: str) -> CacheEntry | None:
+        entry_path = self._entry_path(url)
+        if not entry_path.exists():
+            return None
+        with open(entry_path) as f:
+            return CacheEntry(**json.load(f))
+
+    def put_entry(self, entry: CacheEntry):
+        _atomic_write_text(self._entry_path(entry.url), json.dumps(asdict(entry)))
+
+    def is_output_current(self, entry: CacheEntry, output_path: str) -> bool:
+        """Whether `output_path` was built from this content and is unchanged."""
+        recorded = entry.outputs.get(str(Path(output_path).resolve()))
+        if recorded is None or not os.path.exists(output_path):
+            return False
+        return (
+            recorded["sha256"] == entry.sha256
+            and recorded["mtime_ns"] == os.stat(output_path).st_mtime_ns
+        )
+
+    def record_output(self, entry: CacheEntry, output_path: str):
+        entry.outputs[str(Path(output_path).resolve())] = {
+            "sha256": entry.sha256,
+            "mtime_ns": os.stat(output_path).st_mtime_ns,
+        }
+        self.put_entry(entry)
+
+    def _entry_path(self, url: str) -> Path:
+        url_hash = hashlib.sha256(url.encode()).hexdigest()
+        return self.cache_dir / "entries" / f"{url_hash}.json"
+
+    def _stream_to_blob(self, response: requests.Response) -> str:
+        digest = hashlib.sha256()
+        blobs_dir = self.cache_dir / "blobs"
+        fd, tmp_path = tempfile.mkstemp(dir=blobs_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    digest.update(chunk)
+                    f.write(chunk)
+            sha256 = digest.hexdigest()
+            os.replace(tmp_path, blobs_dir / sha256)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return sha256
+
+
+def _atomic_write_text(path: Path, text: str):
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".part")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -0,0 +1,195 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from utils.custom_logger import logger
+
+
+class FeatureEncoder:
+    """Categorical feature encoder fitted once on training data.
+
+    `fit` learns the vocabulary of every categorical column and the order of the
+    remaining (passthrough) columns; `transform` then encodes any batch to exactly
+    the same feature columns in one vectorized pass. Categories unseen during
+    fitting become all-zero dummies (onehot/sparse) or missing (category).
+
+    Encodings follow DataPreparation.ENCODINGS; onehot column names match
+    `pd.get_dummies` ("<column>_<category>").
+    """
+
+    ENCODINGS = ("onehot", "category", "sparse")
+
+    def __init__(self, categorical_columns: list[str], encoding: str = "onehot"):
+        if encoding not in self.ENCODINGS:
+            raise ValueError(
+                f"Unknown encoding: {encoding}, expected one of {self.ENCODINGS}"
+            )
+        self.categorical_columns = list(categorical_columns)
+        self.encoding = encoding
+        self.vocabularies: dict[str, list] | None = None
+        self.passthrough_columns: list[str] | None = None
+
+    @property
+    def input_columns(self) -> list[str]:
+        """Columns `transform` reads from its input."""
+        self._check_fitted()
+        return [*self.passthrough_columns, *self.categorical_columns]
+
+    @property
+    def feature_names(self) -> list[str]:
+        self._check_fitted()
+        if self.encoding == "category":
+            return [*self.passthrough_columns, *self.categorical_columns]
+        return [
+            *self.passthrough_columns,
+            *(
+                f"{column}_{category}"
+                for column in self.categorical_columns
+                for category in self.vocabularies[column]
+            ),
+        ]
+
+    def fit(self, dataset: pd.DataFrame) -> "FeatureEncoder":
+        logger.debug("Fit %s encoder on %s rows", self.encoding, len(dataset))
+        self.vocabularies = {
+            column: sorted(dataset[column].dropna().unique().tolist())
+            for column in self.categorical_columns
+        }
+        self.passthrough_columns = [
+            column
+            for column in dataset.columns
+            if column not in self.categorical_columns
+        ]
+        return self
+
+    def partial_fit(self, dataset: pd.DataFrame) -> "FeatureEncoder":
+        """Fit on one batch of many: vocabularies become the union of all batches."""
+        if self.vocabularies is None:
+            return self.fit(dataset)
+        for column in self.categorical_columns:
+            self.vocabularies[column] = sorted(
+                set(self.vocabularies[column]).union(
+                    dataset[column].dropna().unique().tolist()
+                )
+            )
+        return self
+
+    def transform(self, dataset: pd.DataFrame) -> pd.DataFrame:
+        self._check_fitted()
+        passthrough = dataset[self.passthrough_columns]
+        codes = {
+            column: _category_codes(dataset[column], self.vocabularies[column])
+            for column in self.categorical_columns
+        }
+
+        if self.encoding == "category":
+            categoricals = {
+                column: pd.Categorical.from_codes(
+                    codes[column], categories=self.vocabularies[column]
+                )
+                for column in self.categorical_columns
+            }
+            return pd.concat(
+                [passthrough, pd.DataFrame(categoricals, index=dataset.index)],
+                axis=1,
+            )
+
+        rows, cols = self._dummy_coordinates(codes)
+        n_dummies = sum(len(v) for v in self.vocabularies.values())
+
+        if self.encoding == "sparse":
+            dummies = sparse.csc_matrix(
+                (np.ones(len(rows), dtype=bool), (rows, cols)),
+                shape=(len(dataset), n_dummies),
+            )
+            dummy_frame = pd.DataFrame.sparse.from_spmatrix(
+                dummies,
+                index=dataset.index,
+                columns=self.feature_names[len(self.passthrough_columns) :],
+            )
+            passthrough = passthrough.astype(
+                {
+                    column: pd.SparseDtype(dtype, 0)
+                    for column, dtype in passthrough.dtypes.items()
+                    if not isinstance(dtype, pd.SparseDtype)
+                }
+            )
+            return pd.concat([passthrough, dummy_frame], axis=1)
+
+        # Filled column-major so pandas can wrap the array as one block without a copy
+        dummies = np.zeros((n_dummies, len(dataset)), dtype=bool)
+        dummies[cols, rows] = True
+        dummy_frame = pd.DataFrame(
+            dummies.T,
+            index=dataset.index,
+            columns=self.feature_names[len(self.passthrough_columns) :],
+        )
+        return pd.concat([passthrough, dummy_frame], axis=1)
+
+    def fit_transform(self, dataset: pd.DataFrame) -> pd.DataFrame:
+        return self.fit(dataset).transform(dataset)
+
+    def save(self, output_path: str):
+        self._check_fitted()
+        if os.path.dirname(output_path):
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+        logger.debug("Save feature encoder to path: %s", output_path)
+        with open(output_path, "w") as f:
+            json.dump(
+                {
+                    "encoding": self.encoding,
+                    "categorical_columns": self.categorical_columns,
+                    "passthrough_columns": self.passthrough_columns,
+                    "vocabularies": self.vocabularies,
+                },
+                f,
+            )
+
+    @staticmethod
+    def load(path: str) -> "FeatureEncoder":
+        with open(path) as f:
+            state = json.load(f)
+
+        encoder = FeatureEncoder(state["categorical_columns"], state["encoding"])
+        encoder.passthrough_columns = state["passthrough_columns"]
+        encoder.vocabularies = state["vocabularies"]
+        return encoder
+
+    def _dummy_coordinates(
+        self, codes: dict[str, np.ndarray]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Row and column indices of every set dummy; unknown categories skipped."""
+        rows, cols = [], []
+        offset = 0
+        for column in self.categorical_columns:
+            column_codes = codes[column]
+            known = column_codes >= 0
+            rows.append(np.flatnonzero(known))
+            cols.append(column_codes[known].astype(np.int64) + offset)
+            offset += len(self.vocabularies[column])
+        return np.concatenate(rows), np.concatenate(cols)
+
+    def _check_fitted(self):
+        if self.vocabularies is None:
+            raise ValueError("FeatureEncoder is not fitted")
+
+
+def to_model_input(X: pd.DataFrame) -> pd.DataFrame | sparse.csr_matrix:
+    """Convert all-sparse frames ("sparse" encoding) to CSR for LightGBM."""
+    if len(X.columns) and all(isinstance(dtype, pd.SparseDtype) for dtype in X.dtypes):
+        return X.sparse.to_coo().tocsr().astype(np.float32)
+    return X
+
+
+def _category_codes(values: pd.Series, vocabulary: list) -> np.ndarray:
+    """Positions of `values` in `vocabulary`; -1 for missing or unknown values.
+
+    Factorizing first means only the distinct values are looked up.
+    """
+    codes, uniques = pd.factorize(values)
+    mapping = pd.Index(vocabulary).get_indexer(uniques)
+    return np.where(codes >= 0, mapping[codes], -1)
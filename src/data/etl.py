@@ -1,26 +1,78 @@
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
+
+from data.encoder import FeatureEncoder
 from utils.custom_logger import logger
 from utils.seed import DEFAULT_SEED
 
+
 class DataPreparation:
 
     TARGET_COLUMN = 'target'
     CATEGORICAL_COLUMNS = ['CalYear', 'Gender', 'Type', 'Category', 'Occupation', 'SubGroup2', 'Group2', 'Group1']
     NUMERICAL_COLUMNS = ['Numtppd', 'Numtpbi', 'Indtppd', 'Indtpbi']
 
+    # Encodings of CATEGORICAL_COLUMNS (see FeatureEncoder):
+    #   onehot   - dense boolean dummy columns (as pd.get_dummies)
+    #   category - pandas `category` dtype, handled natively by LightGBM
+    #   sparse   - all features as pandas SparseDtype, trained on as scipy CSR
+    ENCODINGS = FeatureEncoder.ENCODINGS
+
     @staticmethod
-    def transform_dataset(dataset: pd.DataFrame) -> pd.DataFrame:
-      logger.debug("Transform dataset..")
-      dataset[DataPreparation.TARGET_COLUMN] = dataset['Numtppd'].apply(lambda x: 1 if x != 0 else 0)
+    def required_columns(feature_columns: list[str]) -> list[str]:
+      """`feature_columns` plus the columns transform_dataset always reads."""
+      return list(dict.fromkeys([
+        *feature_columns,
+        *DataPreparation.CATEGORICAL_COLUMNS,
+        *DataPreparation.NUMERICAL_COLUMNS,
+      ]))
+
+    @staticmethod
+    def build_target(dataset: pd.DataFrame) -> pd.DataFrame:
+      """Add the binary target and drop the claim columns it is derived from."""
+      target = (dataset['Numtppd'] != 0).astype('int8')
       dataset = dataset.drop(columns=DataPreparation.NUMERICAL_COLUMNS)
-      dataset = pd.get_dummies(dataset, columns=DataPreparation.CATEGORICAL_COLUMNS)
+      dataset[DataPreparation.TARGET_COLUMN] = target.to_numpy()
+      return dataset
+
+    @staticmethod
+    def create_encoder(encoding: str = 'onehot') -> FeatureEncoder:
+      return FeatureEncoder(DataPreparation.CATEGORICAL_COLUMNS, encoding)
+
+    @staticmethod
+    def transform_dataset(
+      dataset: pd.DataFrame, encoding: str = 'onehot'
+    ) -> pd.DataFrame:
+      """Build the target and encode the whole dataset with a freshly fitted encoder.
+
+      For training pipelines prefer fitting the encoder on the training split only
+      (see `create_encoder`), so it can be saved and reused for inference.
+      """
+      logger.debug("Transform dataset with encoding=%s..", encoding)
+      dataset = DataPreparation.build_target(dataset)
+      target = dataset.pop(DataPreparation.TARGET_COLUMN)
+      dataset = DataPreparation.create_encoder(encoding).fit_transform(dataset)
+      dataset[DataPreparation.TARGET_COLUMN] = target.to_numpy()
       return dataset
 
     @staticmethod
     def train_test_split(dataset: pd.DataFrame, test_size: float = 0.2, random_state: int = DEFAULT_SEED) -> tuple[pd.DataFrame, pd.DataFrame]:
-      logger.debug(f"Split dataset into train-test with params: test_size={test_size}, random_state={random_state}")
+      logger.debug("Split dataset into train-test with params: test_size=%s, random_state=%s", test_size, random_state)
       X = dataset.drop(DataPreparation.TARGET_COLUMN, axis=1)
       y = dataset[DataPreparation.TARGET_COLUMN]
       X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state)
-      return X_train, X_test, y_train, y_test
\ No newline at end of file
+      return X_train, X_test, y_train, y_test
+
+    @staticmethod
+    def split_rows(
+      n_rows: int, test_size: float = 0.2, random_state: int = DEFAULT_SEED
+    ) -> tuple[np.ndarray, np.ndarray]:
+      """Positions of the train and test rows of `train_test_split`.
+
+      Lets a memory-mapped dataset be split without copying its rows.
+      """
+      train_rows, test_rows = train_test_split(
+        np.arange(n_rows), test_size=test_size, random_state=random_state
+      )
+      return train_rows, test_rows
@@ -0,0 +1,122 @@
+"""On-disk dataset formats: CSV and the columnar Parquet / Feather (Arrow IPC).
+
+Columnar formats need `pyarrow` (install the `parquet` extra).
+"""
+
+import os
+import tempfile
+from collections.abc import Iterator
+from pathlib import Path
+
+import pandas as pd
+
+CSV: str = "csv"
+PARQUET: str = "parquet"
+FEATHER: str = "feather"
+
+EXTENSION_FORMATS: dict[str, str] = {
+    ".csv": CSV,
+    ".parquet": PARQUET,
+    ".pq": PARQUET,
+    ".feather": FEATHER,
+    ".arrow": FEATHER,
+}
+
+
+def resolve_format(path: str, dataset_format: str | None = None) -> str:
+    """Return `dataset_format` if given, otherwise infer it from the extension."""
+    if dataset_format is not None:
+        if dataset_format not in (CSV, PARQUET, FEATHER):
+            raise ValueError(f"Unsupported dataset format: {dataset_format}")
+        return dataset_format
+
+    suffix = Path(path).suffix.lower()
+    if suffix not in EXTENSION_FORMATS:
+        raise ValueError(f"Cannot infer dataset format from extension: {path}")
+    return EXTENSION_FORMATS[suffix]
+
+
+def read_dataset(
+    path: str,
+    dataset_format: str,
+    columns: list[str] | None = None,
+    dtype: dict[str, str] | None = None,
+) -> pd.DataFrame:
+    """Read `path`, loading only `columns` when given (memory-mapped for Arrow).
+
+    `dtype` is declared to the CSV parser; columnar files keep their stored types.
+    """
+    if dataset_format == CSV:
+        return pd.read_csv(path, usecols=columns, dtype=dtype)
+    if dataset_format == PARQUET:
+        return pd.read_parquet(path, columns=columns, memory_map=True)
+
+    from pyarrow import feather
+
+    return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+
+def iter_dataset(
+    path: str,
+    dataset_format: str,
+    chunk_size: int,
+    columns: list[str] | None = None,
+) -> Iterator[pd.DataFrame]:
+    """Yield `path` in chunks of at most `chunk_size` rows.
+
+    Both columnar formats are read one stored record batch at a time: Parquet
+    through its batch iterator, Feather from a memory map (without copying when
+    uncompressed; a compressed batch is decompressed on its own). Only the
+    current batch and chunk are held in memory, whatever the file size.
+    """
+    if dataset_format == CSV:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunk_size)
+        return
+
+    if dataset_format == PARQUET:
+        from pyarrow import parquet
+
+        parquet_file = parquet.ParquetFile(path, memory_map=True)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+        return
+
+    import pyarrow as pa
+
+    with pa.memory_map(path) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if columns is not None:
+                batch = batch.select(columns)
+            for offset in range(0, batch.num_rows, chunk_size):
+                yield batch.slice(offset, chunk_size).to_pandas()
+
+
+def write_dataset(dataset: pd.DataFrame, path: str, dataset_format: str):
+    """Write atomically via a temporary file next to `path`.
+
+    For columnar formats string columns are converted to `category`, which is
+    stored dictionary-encoded and read back as `category`. Feather is written
+    uncompressed: compressed buffers must be decompressed into memory, while
+    uncompressed ones are read from the memory map without copying.
+    """
+    if dataset_format != CSV:
+        string_columns = dataset.select_dtypes(include=["object", "string"]).columns
+        dataset = dataset.astype(dict.fromkeys(string_columns, "category"))
+
+    fd, tmp_path = tempfile.mkstemp(dir=Path(path).parent, suffix=".part")
+    os.close(fd)
+    try:
+        if dataset_format == CSV:
+            dataset.to_csv(tmp_path, index=False)
+        elif dataset_format == PARQUET:
+            dataset.to_parquet(tmp_path, index=False)
+        else:
+            dataset.reset_index(drop=True).to_feather(
+                tmp_path, compression="uncompressed"
+            )
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
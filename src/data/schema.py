@@ -0,0 +1,112 @@
+"""Column schema of the pg15training dataset for compact loading.
+
+Categorical columns are read as pandas `category` (a small integer code per row
+instead of a Python string object), floats as float32, and integers are downcast
+to the narrowest type holding their values. Integers are downcast after parsing
+rather than declared narrow up front: the CSV parser silently wraps values that
+overflow a declared integer type.
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+CATEGORY: str = "category"
+INTEGER: str = "integer"
+FLOAT: str = "float"
+
+# Every column DataPreparation uses: categorical features, passthrough features
+# and the claim columns the target is built from
+PG15_SCHEMA: dict[str, str] = {
+    "PolNum": INTEGER,
+    "CalYear": CATEGORY,
+    "Gender": CATEGORY,
+    "Type": CATEGORY,
+    "Category": CATEGORY,
+    "Occupation": CATEGORY,
+    "Age": INTEGER,
+    "Group1": CATEGORY,
+    "Bonus": INTEGER,
+    "Poldur": INTEGER,
+    "Value": INTEGER,
+    "Adind": INTEGER,
+    "SubGroup2": CATEGORY,
+    "Group2": CATEGORY,
+    "Density": FLOAT,
+    "Exppdays": INTEGER,
+    "Numtppd": INTEGER,
+    "Numtpbi": INTEGER,
+    "Indtppd": FLOAT,
+    "Indtpbi": FLOAT,
+}
+
+
+def read_dtypes(schema: dict[str, str], columns: list[str]) -> dict[str, str]:
+    """dtypes declared to the parser for `columns`: categories and float32."""
+    dtypes = {CATEGORY: "category", FLOAT: "float32"}
+    return {
+        column: dtypes[schema[column]]
+        for column in columns
+        if schema.get(column) in dtypes
+    }
+
+
+def compact(dataset: pd.DataFrame, schema: dict[str, str]) -> pd.DataFrame:
+    """Convert the columns of `dataset` in `schema` to their compact dtypes."""
+    for column, kind in schema.items():
+        if column not in dataset.columns:
+            continue
+        values = dataset[column]
+        if kind == CATEGORY:
+            if not isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.astype("category")
+            dataset[column] = _numeric_categories(values)
+        elif kind == FLOAT and values.dtype != "float32":
+            dataset[column] = values.astype("float32")
+        elif kind == INTEGER:
+            dataset[column] = pd.to_numeric(values, downcast="integer")
+    return dataset
+
+
+def _numeric_categories(values: pd.Series) -> pd.Series:
+    """Numeric categories for columns the CSV parser read as strings.
+
+    Category columns are parsed as strings; values such as CalYear must keep the
+    numeric type an unparameterized read (e.g. at inference) gives them.
+    """
+    categories = values.cat.categories
+    if pd.api.types.is_numeric_dtype(categories.dtype):
+        return values
+    numeric = pd.to_numeric(categories, errors="coerce")
+    if len(categories) == 0 or numeric.isna().any():
+        return values
+    return values.cat.rename_categories(numeric)
+
+
+def default_dtypes_bytes(dataset: pd.DataFrame) -> int:
+    """Memory `dataset` would take with the dtypes of a plain `pd.read_csv`.
+
+    Estimated without loading the data again: numbers as 64-bit, and every row
+    of a category column as a value of the default string dtype (a pointer and a
+    Python string object when that is `object`, as before pandas 3).
+    """
+    object_strings = pd.Series(["value"]).dtype == object
+    total = dataset.index.memory_usage()
+    for _, values in dataset.items():
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            if pd.api.types.is_numeric_dtype(values.cat.categories.dtype):
+                total += 8 * len(values)
+                continue
+            counts = values.value_counts(sort=False)
+            if object_strings:
+                sizes = [8 + sys.getsizeof(value) for value in counts.index]
+            else:
+                # Arrow strings: a 64-bit offset and the UTF-8 bytes
+                sizes = [8 + len(str(value).encode()) for value in counts.index]
+            total += int(np.dot(sizes, counts.to_numpy()))
+        elif pd.api.types.is_numeric_dtype(values.dtype):
+            total += 8 * len(values)
+        else:
+            total += values.memory_usage(index=False, deep=True)
+    return total
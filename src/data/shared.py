@@ -0,0 +1,95 @@
+"""Encoded datasets shared between processes as memory-mapped .npy files.
+
+`save_shared` writes every column of an encoded frame (category codes, dense
+values, or the CSR arrays of an all-sparse frame) to its own .npy file;
+`load_shared` opens them with `mmap_mode="r"` and wraps them in a DataFrame
+without copying. Processes loading the same directory share one copy of the
+data in the page cache (RAM-backed when the directory is on /dev/shm) instead
+of each parsing and encoding the source file or unpickling its own copy.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from utils.custom_logger import logger
+
+# Preferred parent of shared directories: memory-backed on Linux
+SHARED_MEMORY_DIR: str = "/dev/shm"
+
+
+def save_shared(X: pd.DataFrame, y: pd.Series, directory: str):
+    """Write encoded features `X` and labels `y` to `directory`."""
+    os.makedirs(directory, exist_ok=True)
+    columns = []
+    is_sparse = len(X.columns) > 0 and all(
+        isinstance(dtype, pd.SparseDtype) for dtype in X.dtypes
+    )
+    if is_sparse:
+        matrix = X.sparse.to_coo().tocsr()
+        for name in ("data", "indices", "indptr"):
+            np.save(os.path.join(directory, f"csr_{name}.npy"), getattr(matrix, name))
+    else:
+        for i, (name, values) in enumerate(X.items()):
+            column = {"name": name}
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                column["categories"] = values.cat.categories.tolist()
+                array = values.cat.codes.to_numpy()
+            else:
+                array = values.to_numpy()
+            np.save(os.path.join(directory, f"{i}.npy"), array)
+            columns.append(column)
+    np.save(os.path.join(directory, "y.npy"), y.to_numpy())
+
+    meta = {
+        "columns": columns
+        if not is_sparse
+        else [
+            {
+                "name": name,
+                "subtype": str(dtype.subtype),
+                "fill_value": dtype.fill_value,
+            }
+            for name, dtype in X.dtypes.items()
+        ],
+        "sparse": is_sparse,
+        "shape": list(X.shape),
+        "target": y.name,
+    }
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    logger.debug("Saved shared dataset %s to %s", X.shape, directory)
+
+
+def load_shared(directory: str) -> tuple[pd.DataFrame, pd.Series]:
+    """Open a directory written by `save_shared`; dense columns stay memory-mapped."""
+    with open(os.path.join(directory, "meta.json")) as f:
+        meta = json.load(f)
+    names = [column["name"] for column in meta["columns"]]
+
+    def mapped(name: str) -> np.ndarray:
+        return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+
+    if meta["sparse"]:
+        matrix = sparse.csr_matrix(
+            (mapped("csr_data"), mapped("csr_indices"), mapped("csr_indptr")),
+            shape=meta["shape"],
+        )
+        X = pd.DataFrame.sparse.from_spmatrix(matrix, columns=names).astype(
+            {
+                column["name"]: pd.SparseDtype(column["subtype"], column["fill_value"])
+                for column in meta["columns"]
+            }
+        )
+    else:
+        data = {}
+        for i, column in enumerate(meta["columns"]):
+            array = mapped(str(i))
+            if "categories" in column:
+                array = pd.Categorical.from_codes(array, column["categories"])
+            data[column["name"]] = array
+        X = pd.DataFrame(data, columns=names, copy=False)
+    return X, pd.Series(mapped("y"), name=meta["target"], copy=False)
@@ -1,53 +1,164 @@
-import argparse
+"""Command line entry point: train, predict, sweep, validate-config and benchmark.
 
-import pandas as pd
+Subcommands import pandas, LightGBM, Optuna etc. only when they run, so parsing
+arguments and validating a config start in milliseconds. Logging (console and
+training.log) is configured by the subcommands that log.
+"""
 
-from config import Config, load_config
-from data.data_downloader import DataDownloader
-from data.data_loader import DataLoader
-from data.etl import DataPreparation
-from model.model_trainer import ModelTrainer
-from utils.custom_logger import logger
-from utils.seed import set_seed
-from utils.statistics import ModelStatistics
+import argparse
+import runpy
+import sys
+from dataclasses import asdict
+from pathlib import Path
 
+import predict as predict_command
+from config import load_config, validate_config
+from utils.custom_logger import configure_logging, logger
 
-def ml_pipeline(config: Config):
-    # Data preparation
-    DataDownloader.download_data(
-        config.data.url, config.data.dataset_file_path, config.data.dataset_name
-    )
-    dataset: pd.DataFrame = DataLoader.load_data(config.data.dataset_file_path)
+COMMANDS: tuple[str, ...] = (
+    "train",
+    "predict",
+    "sweep",
+    "validate-config",
+    "benchmark",
+)
 
-    transformed_dataset: pd.DataFrame = DataPreparation.transform_dataset(dataset)
-    X_train, X_test, y_train, y_test = DataPreparation.train_test_split(
-        transformed_dataset, random_state=config.random_state
-    )
+BENCHMARK_SCRIPT: Path = Path(__file__).resolve().parents[1] / "benchmarks" / "suite.py"
 
-    # Model training
-    model_trainer = ModelTrainer(X_train, y_train, random_state=config.random_state)
-    model_trainer.run_optimization(config.dataset.test_size, config.optuna)
-    model_trainer.save(config.model.output_params_path, config.model.output_path)
 
-    # Model evaluation
-    y_pred = model_trainer.evaluate(X_test, y_test)
-    ModelStatistics.calculate_metrics(y_test, y_pred, config.model.metrics_path)
+def train(args: argparse.Namespace) -> int:
+    from utils.resources import configure_resources
 
+    config = load_config(args.config_path)
+    if args.full:
+        config.incremental.enabled = False
+    configure_logging(**asdict(config.logging))
+    logger.debug("%s", config)
+    # Thread limits first: OpenMP and BLAS read them when NumPy & co. are loaded
+    configure_resources(config.resources)
 
-def main(config_path: str):
-    config: Config = load_config(config_path)
-    logger.debug(config)
+    from pipeline import ml_pipeline
+    from utils.seed import set_seed
 
     set_seed(config.random_state)
     ml_pipeline(config)
+    return 0
 
 
-if __name__ == "__main__":
+def predict(args: argparse.Namespace) -> int:
+    predict_command.main(args)
+    return 0
+
+
+def sweep(args: argparse.Namespace) -> int:
+    from sweep import expand_config_paths, run_sweep
+
+    configure_logging()
+    results = run_sweep(
+        expand_config_paths(args.configs), args.output, n_workers=args.workers
+    )
+    columns = [
+        column
+        for column in ("config", "test_accuracy", "test_roc_auc", "seconds", "error")
+        if column in results
+    ]
+    print(results[columns].to_string(index=False))
+    return 1 if "error" in results and results["error"].notna().any() else 0
+
+
+def validate(args: argparse.Namespace) -> int:
+    """Load the config and report every problem found; non-zero exit if any."""
+    errors = validate_config(load_config(args.config_path))
+    for error in errors:
+        print(f"{args.config_path}: {error}", file=sys.stderr)
+    if not errors:
+        print(f"{args.config_path}: OK")
+    return 1 if errors else 0
+
+
+def benchmark(args: argparse.Namespace) -> int:
+    if not BENCHMARK_SCRIPT.exists():
+        print(f"Benchmark suite not found: {BENCHMARK_SCRIPT}", file=sys.stderr)
+        return 1
+    # As `python benchmarks/suite.py`: its directory first on the import path
+    sys.path.insert(0, str(BENCHMARK_SCRIPT.parent))
+    sys.argv = [str(BENCHMARK_SCRIPT), *args.benchmark_args]
+    runpy.run_path(str(BENCHMARK_SCRIPT), run_name="__main__")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Run ML pipeline")
-    parser.add_argument(
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = subparsers.add_parser("train", help="Train, save and evaluate")
+    train_parser.add_argument(
         "config_path",
         type=str,
         help="Path to the configuration YAML file",
     )
-    args = parser.parse_args()
-    main(args.config_path)
+    train_parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Train from scratch even if incremental.enabled is set",
+    )
+    train_parser.set_defaults(handler=train)
+
+    predict_parser = subparsers.add_parser(
+        "predict", help="Score a dataset with the saved model"
+    )
+    predict_command.add_arguments(predict_parser)
+    predict_parser.set_defaults(handler=predict)
+
+    sweep_parser = subparsers.add_parser(
+        "sweep", help="Run many configs on one shared copy of their dataset"
+    )
+    sweep_parser.add_argument(
+        "configs", nargs="+", help="Configuration YAML files or glob patterns"
+    )
+    sweep_parser.add_argument(
+        "--output",
+        type=str,
+        default="data/output/sweep.csv",
+        help="Results table (CSV, one row per config)",
+    )
+    sweep_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Configs run in parallel (default: cores, at most one per config)",
+    )
+    sweep_parser.set_defaults(handler=sweep)
+
+    validate_parser = subparsers.add_parser(
+        "validate-config", help="Check a configuration file without running it"
+    )
+    validate_parser.add_argument(
+        "config_path", type=str, help="Path to the configuration YAML file"
+    )
+    validate_parser.set_defaults(handler=validate)
+
+    # Further arguments go to benchmarks/suite.py (see main)
+    benchmark_parser = subparsers.add_parser(
+        "benchmark", help="Run benchmarks/suite.py (arguments are passed through)"
+    )
+    benchmark_parser.set_defaults(handler=benchmark)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    parser = build_parser()
+    # `main.py <config_path>` (no subcommand) still trains
+    if argv and not argv[0].startswith("-") and argv[0] not in COMMANDS:
+        argv = ["train", *argv]
+    args, unknown = parser.parse_known_args(argv)
+    if args.command == "benchmark":
+        args.benchmark_args = unknown
+    elif unknown:
+        parser.error(f"unrecognized arguments: {' '.join(unknown)}")
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
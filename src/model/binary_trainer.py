@@ -0,0 +1,87 @@
+from typing import Any
+
+import lightgbm as lgb
+import numpy as np
+from sklearn.model_selection import StratifiedKFold, train_test_split
+
+from model.booster_trainer import BoosterTrainer
+from model.model_trainer import _Fold
+from utils.custom_logger import logger
+from utils.resources import ResourceBudget
+from utils.seed import DEFAULT_SEED
+
+
+class BinaryDatasetTrainer(BoosterTrainer):
+    """ModelTrainer reading its training data from a LightGBM binary Dataset file.
+
+    Used by the out-of-core pipeline (see data.chunked): the search and the final
+    model train on the binned data only, never on a raw feature DataFrame.
+    Validation rows are `subset`s of the same binned Dataset and trials are
+    scored with LightGBM's validation error instead of predictions on raw rows.
+    The fitted model is a `lightgbm.Booster`.
+    """
+
+    def __init__(
+        self,
+        dataset_path: str,
+        random_state: int = DEFAULT_SEED,
+        resources: ResourceBudget | None = None,
+    ):
+        super().__init__(None, None, random_state=random_state, resources=resources)
+        self.dataset_path = dataset_path
+
+    def _load_train_set(self) -> lgb.Dataset:
+        logger.debug("Load binary training dataset from path: %s", self.dataset_path)
+        return lgb.Dataset(
+            self.dataset_path,
+            params={**self.DATASET_PARAMS, "seed": self.random_state},
+            free_raw_data=True,
+        ).construct()
+
+    def _prepare_hold_out(self, test_size: float):
+        dataset = self._load_train_set()
+        train_index, valid_index = train_test_split(
+            np.arange(dataset.num_data()),
+            test_size=test_size,
+            random_state=self.random_state,
+        )
+        self._train_set = dataset.subset(np.sort(train_index)).construct()
+        self._valid_set = dataset.subset(np.sort(valid_index)).construct()
+
+    def _prepare_folds(self, n_folds: int):
+        self._train_set = self._load_train_set()
+        labels = self._train_set.get_label()
+        splitter = StratifiedKFold(
+            n_splits=n_folds, shuffle=True, random_state=self.random_state
+        )
+        self._folds = [
+            _Fold(
+                train_set=self._train_set.subset(train_index).construct(),
+                valid_set=self._train_set.subset(valid_index).construct(),
+                X_val=None,
+                y_val=None,
+            )
+            for train_index, valid_index in splitter.split(
+                np.zeros(len(labels)), labels
+            )
+        ]
+
+    def _update_data_digest(self, digest):
+        with open(self.dataset_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+
+    def fit(self, params: dict[str, Any]) -> lgb.Booster:
+        """Train the final booster with `params` on the whole binary Dataset."""
+        self.best_params = params
+        train_params = {
+            "objective": "binary",
+            **self.resources.lgb_params(),
+            **params,
+            **self.DATASET_PARAMS,
+        }
+        num_boost_round = train_params.pop("n_estimators")
+        self.best_model = lgb.train(
+            train_params, self._load_train_set(), num_boost_round=num_boost_round
+        )
+        return self.best_model
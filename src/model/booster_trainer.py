@@ -0,0 +1,15 @@
+import lightgbm as lgb
+
+from model.model_trainer import ModelTrainer
+
+
+class BoosterTrainer(ModelTrainer):
+    """ModelTrainer whose fitted model is a `lightgbm.Booster` from `lgb.train`.
+
+    Scoring and saving go through `booster`, so they are shared with ModelTrainer;
+    only the way the booster is trained differs between the subclasses.
+    """
+
+    @property
+    def booster(self) -> lgb.Booster:
+        return self.best_model
@@ -0,0 +1,304 @@
+"""A LightGBM model flattened to NumPy arrays and scored without LightGBM.
+
+`CompiledModel.from_booster` walks `Booster.dump_model()` once and stores every
+tree node in flat arrays (split feature, threshold, children, missing-value
+handling, categorical bitsets, leaf values). Scoring moves all rows through all
+trees at once, one tree level per step, with vectorized NumPy indexing. The
+children of a node are adjacent (right = left + 1) and a leaf is its own left
+child with an infinite threshold, so every row simply takes `max_depth` steps of
+`node = left[node] + (not go_left)`.
+
+The arrays are saved as an uncompressed .npz, which loads in milliseconds
+instead of parsing the text model. Predictions match `Booster.predict` (same
+split rules as LightGBM's `NumericalDecision` / `CategoricalDecision`). Without
+per-call overhead of the Booster this is faster for single rows and small
+batches; large batches remain faster on LightGBM's multi-threaded predictor.
+"""
+
+import json
+import os
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from data.encoder import to_model_input
+from utils.custom_logger import logger
+
+# |value| <= K_ZERO_THRESHOLD counts as zero (LightGBM's kZeroThreshold)
+K_ZERO_THRESHOLD: float = 1e-35
+# Rows scored per block: bounds the (rows x trees) working arrays to ~2M cells
+BLOCK_CELLS: int = 1 << 21
+
+_ARRAYS = (
+    "roots",
+    "feature",
+    "threshold",
+    "left",
+    "default_left",
+    "nan_left",
+    "zero_missing",
+    "categorical",
+    "cat_start",
+    "cat_words",
+    "cat_bitsets",
+    "value",
+)
+
+
+class CompiledModel:
+    """Tree ensemble as flat node arrays; see the module docstring."""
+
+    def __init__(
+        self, arrays: dict[str, np.ndarray], feature_names: list[str], objective: str
+    ):
+        for name in _ARRAYS:
+            setattr(self, name, arrays[name])
+        self.feature_names = feature_names
+        self.objective = objective
+        self.max_depth = int(arrays["max_depth"])
+        self.has_categorical = bool(self.categorical.any())
+        self.has_zero_missing = bool(self.zero_missing.any())
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @staticmethod
+    def from_booster(booster: lgb.Booster) -> "CompiledModel":
+        """Flatten the trees of `booster` (up to its best iteration)."""
+        model = booster.dump_model()
+        if model["num_tree_per_iteration"] != 1:
+            raise ValueError("Only single-output (binary/regression) models compile")
+
+        builder = _TreeBuilder()
+        roots = [builder.add(tree["tree_structure"]) for tree in model["tree_info"]]
+        arrays = builder.arrays()
+        arrays["roots"] = np.asarray(roots, dtype=np.int32)
+        arrays["max_depth"] = np.asarray(builder.max_depth)
+        return CompiledModel(arrays, model["feature_names"], model["objective"])
+
+    @staticmethod
+    def load(path: str) -> "CompiledModel":
+        logger.debug("Load compiled model from %s", path)
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in (*_ARRAYS, "max_depth")}
+            meta = json.loads(str(data["meta"]))
+        return CompiledModel(arrays, meta["feature_names"], meta["objective"])
+
+    def save(self, path: str):
+        logger.debug("Save compiled model (%s trees) to path: %s", self.n_trees, path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        meta = {"feature_names": self.feature_names, "objective": self.objective}
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                max_depth=np.asarray(self.max_depth),
+                meta=np.asarray(json.dumps(meta)),
+                **{name: getattr(self, name) for name in _ARRAYS},
+            )
+
+    def predict(
+        self,
+        X: pd.DataFrame | sparse.csr_matrix | np.ndarray,
+        raw_score: bool = False,
+        num_threads: int = 0,
+    ) -> np.ndarray:
+        """Scores like `Booster.predict`: probabilities for binary objectives.
+
+        `num_threads` is accepted for drop-in use in place of a Booster and ignored.
+        """
+        if isinstance(X, pd.DataFrame):
+            X = to_model_input(X)
+        raw = self.predict_raw(_feature_matrix(X))
+        if raw_score or not self.objective.startswith("binary"):
+            return raw
+        return 1.0 / (1.0 + np.exp(-_sigmoid_scale(self.objective) * raw))
+
+    def predict_raw(self, X: np.ndarray) -> np.ndarray:
+        """Sum of leaf values over all trees for a float64 feature matrix."""
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if X.shape[1] != len(self.feature_names):
+            raise ValueError(
+                f"Expected {len(self.feature_names)} features, got {X.shape[1]}"
+            )
+        block = max(1, BLOCK_CELLS // max(self.n_trees, 1))
+        return np.concatenate(
+            [self._raw_block(X[i : i + block]) for i in range(0, len(X), block)]
+            or [np.empty(0)]
+        )
+
+    def _raw_block(self, X: np.ndarray) -> np.ndarray:
+        has_nan = bool(np.isnan(X).any())
+        # Flat indices: row offset + feature
+        offsets = (np.arange(len(X)) * X.shape[1])[:, None]
+        X = X.ravel()
+        node = np.broadcast_to(self.roots, (len(offsets), self.n_trees))
+        for _ in range(self.max_depth):
+            fval = X[offsets + self.feature[node]]
+            go_left = fval <= self.threshold[node]
+            if has_nan:
+                go_left = np.where(np.isnan(fval), self.nan_left[node], go_left)
+            if self.has_zero_missing:
+                is_zero = self.zero_missing[node] & (np.abs(fval) <= K_ZERO_THRESHOLD)
+                go_left = np.where(is_zero, self.default_left[node], go_left)
+            if self.has_categorical:
+                is_category = self.categorical[node]
+                if is_category.any():
+                    go_left[is_category] = self._in_category(
+                        node[is_category], fval[is_category]
+                    )
+            node = self.left[node] + ~go_left
+        return self.value[node].sum(axis=1)
+
+    def _in_category(self, node: np.ndarray, fval: np.ndarray) -> np.ndarray:
+        """Categorical splits: categories in the node's bitset go left, others
+        (including NaN and negative codes) right."""
+        valid = fval >= 0
+        code = np.where(valid, fval, 0).astype(np.int64)
+        word = code >> 5
+        in_range = valid & (word < self.cat_words[node])
+        bits = self.cat_bitsets[np.where(in_range, self.cat_start[node] + word, 0)]
+        return in_range & ((bits >> (code & 31).astype(np.uint32)) & 1).astype(bool)
+
+
+class _TreeBuilder:
+    """Appends `dump_model` tree structures to flat node lists."""
+
+    def __init__(self):
+        self.nodes: dict[str, list] = {
+            name: [] for name in _ARRAYS if name not in ("roots", "cat_bitsets")
+        }
+        # Word 0 stays empty: out-of-range lookups read it
+        self.cat_bitsets: list[int] = [0]
+        self.max_depth = 0
+
+    def add(self, tree: dict) -> int:
+        """Append one tree; return the index of its root node."""
+        root = self._new_node()
+        stack = [(tree, root, 0)]
+        while stack:
+            structure, index, depth = stack.pop()
+            self.max_depth = max(self.max_depth, depth)
+            if "leaf_value" in structure:
+                self._set(index, value=structure["leaf_value"])
+                continue
+
+            left = self._new_node()
+            right = self._new_node()
+            fields = {
+                "feature": structure["split_feature"],
+                "left": left,
+                "default_left": structure["default_left"],
+            }
+            if structure["decision_type"] == "==":
+                words = _bitset(structure["threshold"])
+                fields.update(
+                    categorical=True,
+                    nan_left=False,
+                    cat_start=len(self.cat_bitsets),
+                    cat_words=len(words),
+                )
+                self.cat_bitsets.extend(words)
+            else:
+                threshold = structure["threshold"]
+                missing_type = structure["missing_type"]
+                fields.update(
+                    threshold=threshold,
+                    # Without a NaN/Zero branch NaN is compared as 0
+                    nan_left=(
+                        structure["default_left"]
+                        if missing_type in ("NaN", "Zero")
+                        else 0.0 <= threshold
+                    ),
+                    zero_missing=missing_type == "Zero",
+                )
+            self._set(index, **fields)
+            stack.append((structure["left_child"], left, depth + 1))
+            stack.append((structure["right_child"], right, depth + 1))
+        return root
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        dtypes = {
+            "feature": np.int32,
+            "threshold": np.float64,
+            "left": np.int32,
+            "default_left": np.bool_,
+            "nan_left": np.bool_,
+            "zero_missing": np.bool_,
+            "categorical": np.bool_,
+            "cat_start": np.int32,
+            "cat_words": np.int32,
+            "value": np.float64,
+        }
+        arrays = {
+            name: np.asarray(values, dtype=dtypes[name])
+            for name, values in self.nodes.items()
+        }
+        arrays["cat_bitsets"] = np.asarray(self.cat_bitsets, dtype=np.uint32)
+        return arrays
+
+    def _new_node(self) -> int:
+        """A leaf with value 0: every row goes "left", to the node itself."""
+        index = len(self.nodes["value"])
+        defaults = {"threshold": np.inf, "left": index, "nan_left": True}
+        for name, values in self.nodes.items():
+            values.append(defaults.get(name, 0))
+        return index
+
+    def _set(self, index: int, **fields):
+        for name, value in fields.items():
+            self.nodes[name][index] = value
+
+
+def _bitset(threshold: str) -> list[int]:
+    """32-bit words with the bits of the categories in "1||3||5" set."""
+    categories = [int(category) for category in str(threshold).split("||")]
+    words = [0] * (max(categories) // 32 + 1)
+    for category in categories:
+        words[category // 32] |= 1 << (category % 32)
+    return words
+
+
+def _sigmoid_scale(objective: str) -> float:
+    """The `sigmoid:` parameter of a binary objective string ("binary sigmoid:1")."""
+    for token in objective.split():
+        if token.startswith("sigmoid:"):
+            return float(token.split(":", 1)[1])
+    return 1.0
+
+
+def _feature_matrix(X: pd.DataFrame | sparse.csr_matrix | np.ndarray) -> np.ndarray:
+    """Model input as float64, rounded like LightGBM's own conversion.
+
+    LightGBM scores frames in the common dtype of their columns and float32
+    (categories as codes, NaN unknown), and other arrays as float32 unless already
+    float64; values are rounded the same way here before widening to float64.
+    """
+    if sparse.issparse(X):
+        return X.toarray().astype(np.float64)
+    if isinstance(X, pd.DataFrame):
+        dtypes = list(X.dtypes)
+        codes = {
+            i: X.iloc[:, i].array.codes
+            for i, dtype in enumerate(dtypes)
+            if isinstance(dtype, pd.CategoricalDtype)
+        }
+        dtype = np.result_type(
+            np.float32,
+            *{dtype for i, dtype in enumerate(dtypes) if i not in codes},
+            *(np.float64 if (c < 0).any() else c.dtype for c in codes.values()),
+        )
+        if not codes:
+            return X.to_numpy(dtype=dtype).astype(np.float64, copy=False)
+        numeric = [i for i in range(len(dtypes)) if i not in codes]
+        matrix = np.empty(X.shape, dtype=np.float64)
+        matrix[:, numeric] = X.iloc[:, numeric].to_numpy(dtype=dtype)
+        for i, column in codes.items():
+            matrix[:, i] = np.where(column >= 0, column, np.nan).astype(dtype)
+        return matrix
+    X = np.asarray(X)
+    if X.dtype not in (np.float32, np.float64):
+        X = X.astype(np.float32)
+    return X.astype(np.float64)
@@ -0,0 +1,129 @@
+from typing import Any
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+
+from data.encoder import to_model_input
+from model.booster_trainer import BoosterTrainer
+from model.model_trainer import METRICS
+from utils.custom_logger import logger
+from utils.resources import ResourceBudget
+from utils.seed import DEFAULT_SEED
+from utils.statistics import ModelStatistics
+
+
+class IncrementalTrainer(BoosterTrainer):
+    """ModelTrainer updating a previously saved booster with new rows only.
+
+    `X_train`/`y_train` hold only the newly arrived rows, encoded with the saved
+    encoder so the feature layout matches the saved model. `update` either
+    continues boosting from the saved model (`init_model`) or refits its leaf
+    values; no hyperparameter search runs. The fitted model is a
+    `lightgbm.Booster`.
+    """
+
+    UPDATE_MODES = ("boost", "refit")
+
+    def __init__(
+        self,
+        X_train: pd.DataFrame,
+        y_train: pd.Series,
+        init_model_path: str,
+        random_state: int = DEFAULT_SEED,
+        resources: ResourceBudget | None = None,
+    ):
+        super().__init__(
+            X_train, y_train, random_state=random_state, resources=resources
+        )
+        logger.debug("Load initial model from path: %s", init_model_path)
+        self.init_model = lgb.Booster(model_file=init_model_path)
+
+    def update(
+        self,
+        params: dict[str, Any],
+        mode: str = "boost",
+        num_boost_round: int = 50,
+        decay_rate: float = 0.9,
+    ) -> lgb.Booster:
+        """Update the initial model on the new rows with the saved `params`.
+
+        "boost" adds `num_boost_round` trees fitted to the residuals of the
+        initial model; "refit" keeps the trees and sets each leaf value to
+        `decay_rate * old + (1 - decay_rate) * new`.
+        """
+        if mode not in self.UPDATE_MODES:
+            raise ValueError(f"Unknown update mode: {mode}")
+        logger.debug(
+            "Update model (%s) on %s new rows starting from %s trees",
+            mode,
+            len(self.X_train),
+            self.init_model.num_trees(),
+        )
+        self.best_params = params
+        features = to_model_input(self.X_train)
+        if mode == "refit":
+            self.best_model = self.init_model.refit(
+                features,
+                self.y_train,
+                decay_rate=decay_rate,
+                n_jobs=self.resources.num_threads,
+            )
+            return self.best_model
+
+        train_params = {
+            "objective": "binary",
+            "verbosity": -1,
+            **self.resources.lgb_params(),
+            **params,
+        }
+        train_params.pop("n_estimators", None)
+        self.best_model = lgb.train(
+            train_params,
+            lgb.Dataset(
+                features, self.y_train, feature_name=list(self.X_train.columns)
+            ),
+            num_boost_round=num_boost_round,
+            init_model=self.init_model,
+        )
+        return self.best_model
+
+    def gate(
+        self,
+        X_test: pd.DataFrame,
+        y_test: pd.Series,
+        metric: str,
+        max_metric_drop: float = 0.0,
+    ) -> tuple[bool, dict[str, float], dict[str, float]]:
+        """Compare the updated and the initial model on held-out new rows.
+
+        `metric` is one of the search metrics (see METRICS). Returns whether the
+        update is accepted (`metric` at most `max_metric_drop` worse) and the
+        ModelStatistics metrics of the initial and of the updated model.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric}, expected one of {METRICS}")
+        features = to_model_input(X_test)
+        y_true = np.asarray(y_test)
+        scores, metrics = [], []
+        for y_proba in (
+            self.init_model.predict(features),
+            self.best_model.predict(features),
+        ):
+            scores.append(METRICS[metric].score(y_true, y_proba)[0])
+            metrics.append(
+                ModelStatistics.calculate_metrics(
+                    y_test, (y_proba > 0.5).astype(int), y_proba=y_proba
+                )
+            )
+        change = scores[1] - scores[0]
+        if METRICS[metric].direction == "minimize":
+            change = -change
+        accepted = bool(change >= -max_metric_drop)
+        logger.info(
+            "Incremental update %s: %s %.4f -> %.4f",
+            "accepted" if accepted else "rejected",
+            metric,
+            *scores,
+        )
+        return accepted, metrics[0], metrics[1]
@@ -0,0 +1,74 @@
+import hashlib
+import json
+import os
+from datetime import UTC, datetime
+from typing import Any
+
+from utils.custom_logger import logger
+
+
+class ModelLineage:
+    """Append-only history of the models saved to one output path.
+
+    Every full training and every incremental update (accepted or not) adds an
+    entry with the SHA-256 of the model file it produced and of the model it
+    started from. A saved model that is not the last one recorded, or a long
+    chain of updates, tells the pipeline to retrain from scratch.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: list[dict[str, Any]] = []
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def record(self, kind: str, **fields: Any) -> dict[str, Any]:
+        """Append a "full" or "incremental" entry and write the file."""
+        entry = {
+            "kind": kind,
+            "time": datetime.now(UTC).isoformat(timespec="seconds"),
+            **fields,
+        }
+        self.entries.append(entry)
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        logger.debug("Record %s training in model lineage: %s", kind, self.path)
+        with open(self.path, "w") as f:
+            json.dump(self.entries, f, indent=2)
+        return entry
+
+    def since_full(self) -> list[dict[str, Any]]:
+        """The last full training and the accepted updates after it."""
+        accepted = [
+            entry
+            for entry in self.entries
+            if entry["kind"] == "full" or entry.get("accepted")
+        ]
+        starts = [i for i, entry in enumerate(accepted) if entry["kind"] == "full"]
+        return accepted[starts[-1] :] if starts else []
+
+    def current_model_sha256(self) -> str | None:
+        """SHA-256 of the model file the lineage ends with."""
+        chain = self.since_full()
+        return chain[-1]["model_sha256"] if chain else None
+
+    def trained_partitions(self) -> set[str]:
+        """Partition values the current model was trained on."""
+        return {
+            partition
+            for entry in self.since_full()
+            for partition in entry.get("partitions") or []
+        }
+
+    def updates_since_full(self) -> int:
+        return len(self.since_full()[1:])
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
@@ -1,42 +1,262 @@
+import hashlib
 import json
+import multiprocessing
 import os
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, replace
 from typing import Any
 
+import lightgbm as lgb
+import numpy as np
 import optuna
 import pandas as pd
 from lightgbm import LGBMClassifier
-from sklearn.metrics import accuracy_score
-from sklearn.model_selection import train_test_split
+from scipy import sparse
+from sklearn.model_selection import StratifiedKFold, train_test_split
 
-from config import OptunaConfig
-from utils.custom_logger import logger
+from config import INFERENCE_COSTS, SEARCH_SPACE, OptunaConfig
+from data.encoder import to_model_input
+from utils.custom_logger import log_event, logger, worker_logging
+from utils.profiler import Measurement, measure
+from utils.resources import ResourceBudget
 from utils.seed import DEFAULT_SEED
+from utils.statistics import ModelStatistics
+
+
+@dataclass(frozen=True)
+class _Metric:
+    """An objective metric of the search (see METRICS)."""
+
+    direction: str
+    # Objective value from validation labels and probabilities, and the decision
+    # threshold it was taken at (None for threshold-free metrics)
+    score: Callable[[np.ndarray, np.ndarray], tuple[float, float | None]]
+    # LightGBM validation metric tracked per iteration for pruning
+    lgb_metric: str
+    # Objective value from a LightGBM metric value (pruning, binned-only data)
+    from_lgb: Callable[[float], float] = lambda value: value
+    # Custom LightGBM eval scoring binned-only validation data when no built-in
+    # metric matches the objective
+    feval: Callable | None = None
+
+
+def _accuracy(y_val: np.ndarray, y_proba: np.ndarray) -> tuple[float, None]:
+    return float(np.mean((y_proba > 0.5) == y_val)), None
+
+
+def _roc_auc(y_val: np.ndarray, y_proba: np.ndarray) -> tuple[float, None]:
+    return ModelStatistics.probability_metrics(y_val, y_proba)["roc_auc"], None
+
+
+def _log_loss(y_val: np.ndarray, y_proba: np.ndarray) -> tuple[float, None]:
+    return ModelStatistics.probability_metrics(y_val, y_proba)["log_loss"], None
+
+
+def _pr_auc(y_val: np.ndarray, y_proba: np.ndarray) -> tuple[float, None]:
+    return ModelStatistics.probability_metrics(y_val, y_proba)["pr_auc"], None
+
+
+def _best_f1(y_val: np.ndarray, y_proba: np.ndarray) -> tuple[float, float]:
+    curve = ModelStatistics.threshold_curve(y_val, y_proba)
+    best = curve["f1"].to_numpy().argmax()
+    return float(curve["f1"].iloc[best]), float(curve["threshold"].iloc[best])
+
+
+def _best_f1_eval(y_proba: np.ndarray, data: lgb.Dataset) -> tuple[str, float, bool]:
+    return "best_f1", _best_f1(data.get_label(), y_proba)[0], True
+
+
+METRICS: dict[str, _Metric] = {
+    # Accuracy at the 0.5 threshold
+    "accuracy": _Metric(
+        "maximize", _accuracy, "binary_error", from_lgb=lambda error: 1.0 - error
+    ),
+    "auc": _Metric("maximize", _roc_auc, "auc"),
+    "logloss": _Metric("minimize", _log_loss, "binary_logloss"),
+    # F1 at the threshold maximizing it on the validation set; pruning follows
+    # average precision, the threshold-free counterpart
+    "f1": _Metric("maximize", _best_f1, "average_precision", feval=_best_f1_eval),
+    # Area under the precision-recall curve (average precision)
+    "pr_auc": _Metric("maximize", _pr_auc, "average_precision"),
+}
+
+
+@dataclass
+class _Fold:
+    train_set: lgb.Dataset
+    valid_set: lgb.Dataset
+    # None when only binned data is available (see BinaryDatasetTrainer)
+    X_val: pd.DataFrame | sparse.csr_matrix | None
+    y_val: np.ndarray | None
 
 
 class ModelTrainer:
+    # Parameters fixed at Dataset construction; every trial trains against the same
+    # binned data, so per-trial values such as min_child_samples must not trigger
+    # LightGBM's feature pre-filtering (which would require re-binning).
+    DATASET_PARAMS: dict[str, Any] = {"verbosity": -1, "feature_pre_filter": False}
+    # Validation rows predicted (single-threaded) to measure latency inference cost
+    LATENCY_ROWS: int = 1_000
+
     def __init__(
         self,
         X_train: pd.DataFrame,
         y_train: pd.Series,
         random_state: int = DEFAULT_SEED,
+        resources: ResourceBudget | None = None,
+        rows: np.ndarray | None = None,
     ):
         self.X_train = X_train
         self.y_train = y_train
+        # Positions of the training rows in X_train/y_train (all if None): a
+        # shared, memory-mapped frame is gathered only where a Dataset is built
+        self.rows = rows
         self.random_state = random_state
+        # Threads of the search and the final fit; all cores unless configured
+        self.resources = resources or ResourceBudget(os.cpu_count() or 1)
         self.best_params: dict[str, Any] | None = None
         self.best_model: LGBMClassifier | None = None
+        self._train_set: lgb.Dataset | None = None
+        self._valid_set: lgb.Dataset | None = None
+        self._X_val: pd.DataFrame | sparse.csr_matrix | None = None
+        self._y_val: np.ndarray | None = None
+        self._folds: list[_Fold] | None = None
+        # Training row samples of a multi-fidelity search, smallest first
+        self._fidelity_sets: list[lgb.Dataset] | None = None
+        # Wall/CPU time and peak RSS of the trials run by the last `optimize`
+        self.trial_profiles: list[dict[str, Any]] = []
+        # Pareto-optimal trials of the last multi-objective `optimize`
+        self.pareto_front: list[dict[str, Any]] = []
+        self.num_threads: int = -1
+
+    def _prepare_datasets(self, test_size: float, config: OptunaConfig):
+        if config.cv_folds:
+            self._prepare_folds(config.cv_folds)
+            return
+        self._prepare_hold_out(test_size)
+        if config.fidelities:
+            self._prepare_fidelities(config.fidelities)
+
+    def _prepare_hold_out(self, test_size: float):
+        """Split off the validation set and bin the training part once per study.
+
+        The training Dataset is constructed eagerly with `free_raw_data=True`, so
+        only its binned representation is kept; the validation Dataset reuses its
+        bin mappers through `reference`. Raw validation features are kept for
+        scoring.
+        """
+        logger.debug("Prepare train/validation datasets with test_size=%s", test_size)
+
+        rows = np.arange(len(self.y_train)) if self.rows is None else self.rows
+        train_rows, val_rows = train_test_split(
+            rows, test_size=test_size, random_state=self.random_state
+        )
+        X_train_sub, y_train_sub = self._gather(train_rows)
+        X_val, y_val = self._gather(val_rows)
+
+        dataset_params = {**self.DATASET_PARAMS, "seed": self.random_state}
+        feature_name = list(self.X_train.columns)
+        X_val = to_model_input(X_val)
+        self._train_set = lgb.Dataset(
+            to_model_input(X_train_sub),
+            label=y_train_sub,
+            feature_name=feature_name,
+            params=dataset_params,
+            free_raw_data=True,
+        ).construct()
+        self._valid_set = lgb.Dataset(
+            X_val,
+            label=y_val,
+            feature_name=feature_name,
+            params=dataset_params,
+            reference=self._train_set,
+            free_raw_data=True,
+        ).construct()
+        self._X_val = X_val
+        self._y_val = y_val.to_numpy()
+
+    def _prepare_folds(self, n_folds: int):
+        """Bin the whole training set once and cut stratified folds from it.
+
+        Fold Datasets are `subset`s of one constructed Dataset, so they share its
+        bins and no fold is binned again; stratification keeps the class ratio of
+        the imbalanced target in every fold.
+        """
+        logger.debug("Prepare %s stratified cross-validation folds", n_folds)
 
-    def _objective(self, trial, test_size: int, config: OptunaConfig) -> float:
-        X_train_sub, X_val, y_train_sub, y_val = train_test_split(
-            self.X_train,
-            self.y_train,
-            test_size=test_size,
-            random_state=self.random_state,
+        X_train, y_train = self._training_data()
+        X = to_model_input(X_train)
+        y = y_train.to_numpy()
+        self._train_set = lgb.Dataset(
+            X,
+            label=y,
+            feature_name=list(self.X_train.columns),
+            params={**self.DATASET_PARAMS, "seed": self.random_state},
+            free_raw_data=True,
+        ).construct()
+
+        splitter = StratifiedKFold(
+            n_splits=n_folds, shuffle=True, random_state=self.random_state
         )
+        self._folds = [
+            _Fold(
+                train_set=self._train_set.subset(train_index).construct(),
+                valid_set=self._train_set.subset(valid_index).construct(),
+                X_val=X[valid_index] if sparse.issparse(X) else X.iloc[valid_index],
+                y_val=y[valid_index],
+            )
+            for train_index, valid_index in splitter.split(np.zeros(len(y)), y)
+        ]
+
+    def _training_data(self) -> tuple[pd.DataFrame, pd.Series]:
+        if self.rows is None:
+            return self.X_train, self.y_train
+        return self._gather(self.rows)
+
+    def _gather(self, rows: np.ndarray) -> tuple[pd.DataFrame, pd.Series]:
+        return self.X_train.iloc[rows], self.y_train.iloc[rows]
+
+    def _prepare_fidelities(self, fidelities: list[float]):
+        """Cut nested, stratified row samples of the binned training set.
+
+        The samples are index `subset`s of the training Dataset, built once per
+        study: every trial reuses them and nothing is binned again. Each sample is
+        drawn from the next larger one, so a promoted trial sees a superset of its
+        earlier rows.
+        """
+        logger.debug("Prepare multi-fidelity training samples: %s", fidelities)
+
+        labels = self._train_set.get_label()
+        index = np.arange(self._train_set.num_data())
+        indices = []
+        for fraction in sorted(fidelities, reverse=True):
+            index, _ = train_test_split(
+                index,
+                train_size=max(1, round(fraction * len(labels))),
+                stratify=labels[index],
+                random_state=self.random_state,
+            )
+            indices.append(np.sort(index))
+        self._fidelity_sets = [
+            self._train_set.subset(index).construct() for index in reversed(indices)
+        ]
+
+    def _release_datasets(self):
+        self._fidelity_sets = None
+        self._folds = None
+        self._train_set = None
+        self._valid_set = None
+        self._X_val = None
+        self._y_val = None
 
-        param: dict[str, Any] = {
+    def _suggest_params(self, trial, config: OptunaConfig) -> dict[str, Any]:
+        return {
             "objective": "binary",
-            "n_jobs": -1,
+            **self.resources.lgb_params(self.num_threads),
             "random_state": self.random_state,
             "n_estimators": trial.suggest_int(
                 "n_estimators", config.n_estimators.min, config.n_estimators.max
@@ -68,39 +288,568 @@ class ModelTrainer:
             ),
         }
 
-        model = LGBMClassifier(**param, verbosity=-1)
-        model.fit(X_train_sub, y_train_sub)
+    def _objective(self, trial, config: OptunaConfig) -> float | tuple[float, float]:
+        """Validation score of `config.metric`, plus the inference cost when the
+        search is multi-objective."""
+        param = self._suggest_params(trial, config)
+        if self._folds is not None:
+            return self._cross_validate(trial, param, config)
 
-        y_pred = model.predict(X_val)
-        accuracy = accuracy_score(y_val, y_pred)
-        return accuracy
+        num_boost_round = param.pop("n_estimators")
+        param["metric"] = _lgb_metrics(METRICS[config.metric])
+        if self._fidelity_sets:
+            self._promote_through_fidelities(trial, param, num_boost_round, config)
+
+        booster, best_iteration = self._train_hold_out(
+            param, num_boost_round, self._train_set, config, trial=trial
+        )
+        trial.set_user_attr("best_iteration", best_iteration)
+
+        score, threshold, cost = self._score_booster(
+            booster, best_iteration, self._X_val, self._y_val, config
+        )
+        if threshold is not None:
+            trial.set_user_attr("threshold", threshold)
+        if cost is None:
+            return score
+        trial.set_user_attr("inference_cost", cost)
+        return score, cost
+
+    def _train_hold_out(
+        self,
+        param: dict[str, Any],
+        num_boost_round: int,
+        train_set: lgb.Dataset,
+        config: OptunaConfig,
+        trial: optuna.Trial | None = None,
+    ) -> tuple[lgb.Booster, int]:
+        """Booster trained on `train_set` and its best iteration on the hold-out.
+
+        Iterations are reported to the pruner only when `trial` is given.
+        """
+        metric = METRICS[config.metric]
+        callbacks = []
+        if config.early_stopping_rounds:
+            callbacks.append(
+                lgb.early_stopping(
+                    config.early_stopping_rounds, first_metric_only=True, verbose=False
+                )
+            )
+        if trial is not None and _prunes(config):
+            callbacks.append(_pruning_callback(trial, metric))
+
+        valid_sets = {}
+        if callbacks or self._X_val is None:
+            valid_sets = {
+                "valid_sets": [self._valid_set],
+                "valid_names": ["valid"],
+                "feval": metric.feval if self._X_val is None else None,
+            }
+
+        booster = lgb.train(
+            {**param, **self.DATASET_PARAMS},
+            train_set,
+            num_boost_round=num_boost_round,
+            callbacks=callbacks,
+            **valid_sets,
+        )
+        return booster, booster.best_iteration or booster.current_iteration()
+
+    def _promote_through_fidelities(
+        self,
+        trial: optuna.Trial,
+        param: dict[str, Any],
+        num_boost_round: int,
+        config: OptunaConfig,
+    ):
+        """Train on the growing row samples; prune once the trial ranks too low.
+
+        Successive halving over data size: on every sample the trial must rank in
+        the top 1 / fidelity_reduction_factor of all trials scored on it (any trial
+        passes while fewer than fidelity_reduction_factor were). Scores are kept in
+        the "fidelity_scores" user attr, so trials of parallel workers compete too.
+        Iteration pruning applies only to the final training on all rows.
+        """
+        scores = []
+        for rung, train_set in enumerate(self._fidelity_sets):
+            booster, best_iteration = self._train_hold_out(
+                param, num_boost_round, train_set, config
+            )
+            score, _, _ = self._score_booster(
+                booster, best_iteration, self._X_val, self._y_val, config
+            )
+            scores.append(score)
+            trial.set_user_attr("fidelity_scores", scores)
+            if not _promoted(trial, rung, score, config):
+                raise optuna.TrialPruned(
+                    f"Trial pruned on {train_set.num_data()} rows "
+                    f"(fidelity {config.fidelities[rung]})"
+                )
+
+    def _score_booster(
+        self,
+        booster: lgb.Booster,
+        best_iteration: int,
+        X_val: pd.DataFrame | sparse.csr_matrix | None,
+        y_val: np.ndarray | None,
+        config: OptunaConfig,
+    ) -> tuple[float, float | None, float | None]:
+        """Validation score, its decision threshold and the inference cost (None
+        unless `config.inference_cost` is set)."""
+        metric = METRICS[config.metric]
+        cost = None
+        if config.inference_cost:
+            cost = self._inference_cost(booster, best_iteration, X_val, config)
+        if X_val is None:
+            # Only binned validation data: LightGBM's metric at the best iteration
+            name = "best_f1" if metric.feval else metric.lgb_metric
+            return metric.from_lgb(booster.best_score["valid"][name]), None, cost
+        y_proba = booster.predict(X_val, num_iteration=best_iteration)
+        return *metric.score(y_val, y_proba), cost
+
+    def _inference_cost(
+        self,
+        booster: lgb.Booster,
+        best_iteration: int,
+        X_val: pd.DataFrame | sparse.csr_matrix | None,
+        config: OptunaConfig,
+    ) -> float:
+        """Leaves of all trees ("complexity") or single-threaded predict time in
+        microseconds per row ("latency", best of 3 runs)."""
+        if config.inference_cost == "complexity":
+            trees = booster.dump_model(num_iteration=best_iteration)["tree_info"]
+            return float(sum(tree["num_leaves"] for tree in trees))
+        if X_val is None:
+            raise ValueError(
+                "inference_cost latency needs raw validation rows, use complexity"
+            )
+
+        rows = (
+            X_val[: self.LATENCY_ROWS]
+            if sparse.issparse(X_val)
+            else X_val.iloc[: self.LATENCY_ROWS]
+        )
+        timings = []
+        for _ in range(3):
+            start = time.perf_counter()
+            booster.predict(rows, num_iteration=best_iteration, num_threads=1)
+            timings.append(time.perf_counter() - start)
+        return min(timings) / rows.shape[0] * 1e6
+
+    def _measured_objective(
+        self, trial: optuna.Trial, config: OptunaConfig
+    ) -> float | tuple[float, float]:
+        """`_objective` with its measurements stored in the "profile" user attr.
+
+        User attrs live in the study storage, so this also covers trials run in
+        worker processes.
+        """
+        record = Measurement(f"trial {trial.number}")
+        try:
+            with measure(record):
+                record.set_shape(self._train_set)
+                return self._objective(trial, config)
+        finally:
+            trial.set_user_attr("profile", record.as_dict())
+
+    def _cross_validate(
+        self, trial: optuna.Trial, param: dict[str, Any], config: OptunaConfig
+    ) -> float:
+        """Mean validation score (and inference cost) over the prepared folds.
+
+        Folds train concurrently on threads sharing the trial's thread budget. The
+        running mean is reported to the pruner after each fold (in fold order, so
+        pruning does not depend on thread timing); a pruned trial cancels folds
+        that have not started and stops the running ones at their next iteration.
+        """
+        num_boost_round = param.pop("n_estimators")
+        n_parallel = min(len(self._folds), self.num_threads)
+        param["n_jobs"] = max(1, self.num_threads // n_parallel)
+        param["metric"] = _lgb_metrics(METRICS[config.metric])
+        stop = threading.Event()
+
+        scores, best_iterations, thresholds, costs = [], [], [], []
+        with ThreadPoolExecutor(max_workers=n_parallel) as executor:
+            futures = [
+                executor.submit(
+                    self._train_fold, fold, param, num_boost_round, config, stop
+                )
+                for fold in self._folds
+            ]
+            try:
+                for step, future in enumerate(futures, start=1):
+                    score, best_iteration, threshold, cost = future.result()
+                    scores.append(score)
+                    best_iterations.append(best_iteration)
+                    thresholds.append(threshold)
+                    costs.append(cost)
+                    if config.inference_cost:
+                        continue
+                    trial.report(float(np.mean(scores)), step=step)
+                    if step < len(futures) and trial.should_prune():
+                        raise optuna.TrialPruned(f"Trial pruned after {step} folds")
+            finally:
+                stop.set()
+                for future in futures:
+                    future.cancel()
+
+        trial.set_user_attr("best_iteration", round(np.mean(best_iterations)))
+        trial.set_user_attr("fold_scores", scores)
+        if None not in thresholds:
+            trial.set_user_attr("threshold", float(np.mean(thresholds)))
+        if not config.inference_cost:
+            return float(np.mean(scores))
+        trial.set_user_attr("inference_cost", float(np.mean(costs)))
+        return float(np.mean(scores)), float(np.mean(costs))
+
+    def _train_fold(
+        self,
+        fold: "_Fold",
+        param: dict[str, Any],
+        num_boost_round: int,
+        config: OptunaConfig,
+        stop: threading.Event,
+    ) -> tuple[float, int, float | None, float | None]:
+        """Score, best iteration, threshold and inference cost of one fold."""
+        # Callbacks keep per-training state, so every fold gets its own
+        callbacks = [_stop_callback(stop)]
+        valid_sets = {}
+        if config.early_stopping_rounds:
+            callbacks.append(
+                lgb.early_stopping(
+                    config.early_stopping_rounds, first_metric_only=True, verbose=False
+                )
+            )
+        if config.early_stopping_rounds or fold.X_val is None:
+            valid_sets = {
+                "valid_sets": [fold.valid_set],
+                "valid_names": ["valid"],
+                "feval": METRICS[config.metric].feval if fold.X_val is None else None,
+            }
+
+        booster = lgb.train(
+            {**param, **self.DATASET_PARAMS},
+            fold.train_set,
+            num_boost_round=num_boost_round,
+            callbacks=callbacks,
+            **valid_sets,
+        )
+        best_iteration = booster.best_iteration or booster.current_iteration()
+        score, threshold, cost = self._score_booster(
+            booster, best_iteration, fold.X_val, fold.y_val, config
+        )
+        return score, best_iteration, threshold, cost
 
     def run_optimization(
         self, test_size: int, config: OptunaConfig
     ) -> tuple[LGBMClassifier, dict[str, Any]]:
-        logger.debug(f"Starting optimization for n_trials={config.n_trials}")
+        best_params = self.optimize(test_size, config)
+        return self.fit(best_params), self.best_params
+
+    def optimize(self, test_size: int, config: OptunaConfig) -> dict[str, Any]:
+        """Run the Optuna search and return the best params (incl. random_state).
+
+        With `config.storage_path` the study is persisted in a journal file under a
+        name derived from the training data and search space: a rerun resumes it
+        (up to `n_trials` finished trials, or `n_trials` more with `extend_study`),
+        and a new study is warm-started with the best params of the latest other
+        study in the same file. Each finished trial is appended to the journal
+        immediately, so an interrupted run loses at most the running trials.
+
+        Trials maximize (or minimize) `config.metric`. With `config.inference_cost`
+        they also minimize the model's inference cost; the returned params are those
+        of the best-scoring Pareto-optimal trial within `max_inference_cost`, and
+        the whole front is kept in `pareto_front` (and written to
+        `pareto_front_path`).
+        """
+        _validate_objective(config)
+        logger.debug(
+            "Starting optimization for n_trials=%s, n_workers=%s",
+            config.n_trials,
+            config.n_workers,
+        )
 
         optuna.logging.set_verbosity(optuna.logging.WARNING)
+        self.num_threads = (
+            config.threads_per_worker
+            or self.resources.split(config.n_workers).num_threads
+        )
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            storage_path = config.storage_path
+            if storage_path is None and config.n_workers > 1:
+                storage_path = os.path.join(tmp_dir, "study.log")
+
+            study = self._create_study(test_size, config, storage_path)
+            n_trials = self._remaining_trials(study, config)
+            n_existing = len(study.trials)
+            seed = self.random_state + n_existing
+            logger.debug(
+                "Study %s: %s existing trials, running %s more",
+                study.study_name,
+                len(study.trials),
+                n_trials,
+            )
+
+            if n_trials and config.n_workers > 1:
+                self._optimize_parallel(
+                    study.study_name, storage_path, seed, test_size, config, n_trials
+                )
+                study = optuna.load_study(
+                    study_name=study.study_name, storage=_journal_storage(storage_path)
+                )
+            elif n_trials:
+                study.sampler = optuna.samplers.TPESampler(seed=seed)
+                self._optimize(study, test_size, config, n_trials)
+
+            best_params = self._best_trial_params(
+                self._select_trial(study, config), config
+            )
+            self.trial_profiles = [
+                {
+                    "number": trial.number,
+                    "state": trial.state.name,
+                    "value": trial.values[0] if trial.values else None,
+                    "inference_cost": trial.user_attrs.get("inference_cost"),
+                    **trial.user_attrs.get("profile", {}),
+                }
+                for trial in study.trials[n_existing:]
+            ]
+            if config.inference_cost:
+                self.pareto_front = self._pareto_front(study, config)
+
+        best_params["random_state"] = self.random_state
+        return best_params
+
+    def _create_study(
+        self, test_size: float, config: OptunaConfig, storage_path: str | None
+    ) -> optuna.Study:
+        storage = None
+        study_name = None
+        if storage_path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(storage_path)), exist_ok=True)
+            storage = _journal_storage(storage_path)
+        if config.storage_path is not None:
+            study_name = self._study_name(test_size, config)
 
         study = optuna.create_study(
-            direction="maximize",
+            directions=_directions(config),
+            storage=storage,
+            study_name=study_name,
+            load_if_exists=True,
             sampler=optuna.samplers.TPESampler(seed=self.random_state),
+            pruner=_create_pruner(config),
+        )
+        if config.storage_path is not None and not study.trials:
+            self._warm_start(study, storage, config)
+        return study
+
+    @staticmethod
+    def _remaining_trials(study: optuna.Study, config: OptunaConfig) -> int:
+        if config.storage_path is None or config.extend_study:
+            return config.n_trials
+        finished = study.get_trials(
+            deepcopy=False,
+            states=(optuna.trial.TrialState.COMPLETE, optuna.trial.TrialState.PRUNED),
+        )
+        return max(0, config.n_trials - len(finished))
+
+    def _study_name(self, test_size: float, config: OptunaConfig) -> str:
+        """Name keyed by a fingerprint of the training data and the search space."""
+        digest = hashlib.sha256()
+        self._update_data_digest(digest)
+        search_space = {
+            "ranges": {name: asdict(getattr(config, name)) for name in SEARCH_SPACE},
+            "test_size": test_size,
+            "random_state": self.random_state,
+            "early_stopping_rounds": config.early_stopping_rounds,
+            "cv_folds": config.cv_folds,
+            "metric": config.metric,
+            "inference_cost": config.inference_cost,
+            "fidelities": config.fidelities,
+            "fidelity_reduction_factor": config.fidelity_reduction_factor,
+        }
+        digest.update(json.dumps(search_space, sort_keys=True).encode())
+        return f"lightgbm-{digest.hexdigest()[:16]}"
+
+    def _update_data_digest(self, digest):
+        for data in self._training_data():
+            _update_digest(digest, data)
+
+    @staticmethod
+    def _warm_start(
+        study: optuna.Study, storage: optuna.storages.BaseStorage, config: OptunaConfig
+    ):
+        """Enqueue the best params of the most recent other study in `storage`."""
+        previous = [
+            summary
+            for summary in optuna.get_all_study_summaries(storage)
+            if summary.study_name != study.study_name and summary.best_trial
+        ]
+        if not previous:
+            return
+
+        latest = max(previous, key=lambda summary: summary.datetime_start or 0)
+        params = {
+            name: value
+            for name, value in latest.best_trial.params.items()
+            if name in SEARCH_SPACE
+            and getattr(config, name).min <= value <= getattr(config, name).max
+        }
+        logger.debug("Warm start from study %s with %s", latest.study_name, params)
+        study.enqueue_trial(params, user_attrs={"warm_start_from": latest.study_name})
+
+    def fit(self, params: dict[str, Any]) -> LGBMClassifier:
+        """Fit the final model with `params` on the whole training set."""
+        self.best_params = params
+        self.best_model = LGBMClassifier(**{**self.resources.lgb_params(), **params})
+        X_train, y_train = self._training_data()
+        self.best_model.fit(
+            to_model_input(X_train),
+            y_train,
+            feature_name=list(self.X_train.columns),
+        )
+        return self.best_model
+
+    def _optimize(
+        self, study: optuna.Study, test_size: float, config: OptunaConfig, n_trials: int
+    ):
+        self._prepare_datasets(test_size, config)
+        try:
+            study.optimize(
+                lambda trial: self._measured_objective(trial, config),
+                n_trials=n_trials,
+                callbacks=[_log_trial],
+            )
+        finally:
+            self._release_datasets()
+
+    def _optimize_parallel(
+        self,
+        study_name: str,
+        storage_path: str,
+        seed: int,
+        test_size: float,
+        config: OptunaConfig,
+        n_trials: int,
+    ):
+        """Run `config.n_workers` processes against one journal-file backed study.
+
+        Trials are split evenly between workers; worker `i` samples with
+        `TPESampler(seed=seed + i)`, so every worker is reproducible on its own
+        while LightGBM models keep `random_state`.
+        """
+        n_workers = config.n_workers
+        trials_per_worker = [
+            n_trials // n_workers + (i < n_trials % n_workers) for i in range(n_workers)
+        ]
+        logger.debug(
+            "Run %s workers x %s threads on study storage: %s",
+            n_workers,
+            self.num_threads,
+            storage_path,
         )
-        study.optimize(
-            lambda trial: self._objective(trial, test_size, config),
-            n_trials=config.n_trials,
+
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            **worker_logging(),
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _optimization_worker,
+                    self,
+                    study_name,
+                    storage_path,
+                    seed + worker_index,
+                    worker_n_trials,
+                    test_size,
+                    config,
+                )
+                for worker_index, worker_n_trials in enumerate(trials_per_worker)
+                if worker_n_trials
+            ]
+            for future in futures:
+                future.result()
+
+    @staticmethod
+    def _select_trial(
+        study: optuna.Study, config: OptunaConfig
+    ) -> optuna.trial.FrozenTrial:
+        """Best trial, or the best-scoring Pareto-optimal one within the cost limit
+        (the cheapest if none is) for a multi-objective study."""
+        if not config.inference_cost:
+            return study.best_trial
+
+        front = study.best_trials
+        if config.max_inference_cost is not None:
+            affordable = [
+                trial for trial in front if trial.values[1] <= config.max_inference_cost
+            ]
+            front = affordable or [min(front, key=lambda trial: trial.values[1])]
+        sign = 1.0 if METRICS[config.metric].direction == "maximize" else -1.0
+        selected = max(front, key=lambda trial: sign * trial.values[0])
+        logger.debug(
+            "Selected trial %s: %s=%s, %s=%s",
+            selected.number,
+            config.metric,
+            selected.values[0],
+            config.inference_cost,
+            selected.values[1],
         )
+        return selected
 
-        self.best_params = study.best_params
-        self.best_params["random_state"] = self.random_state
-        self.best_model = LGBMClassifier(**self.best_params)
-        self.best_model.fit(self.X_train, self.y_train)
+    def _pareto_front(
+        self, study: optuna.Study, config: OptunaConfig
+    ) -> list[dict[str, Any]]:
+        front = sorted(
+            (
+                {
+                    "number": trial.number,
+                    config.metric: trial.values[0],
+                    config.inference_cost: trial.values[1],
+                    "threshold": trial.user_attrs.get("threshold"),
+                    "params": self._best_trial_params(trial, config),
+                }
+                for trial in study.best_trials
+            ),
+            key=lambda row: row[config.inference_cost],
+        )
+        if config.pareto_front_path:
+            if os.path.dirname(config.pareto_front_path):
+                os.makedirs(os.path.dirname(config.pareto_front_path), exist_ok=True)
+            logger.debug("Save Pareto front to path: %s", config.pareto_front_path)
+            with open(config.pareto_front_path, "w") as f:
+                json.dump(front, f, indent=2)
+        return front
 
-        return self.best_model, self.best_params
+    @staticmethod
+    def _best_trial_params(
+        trial: optuna.trial.FrozenTrial, config: OptunaConfig
+    ) -> dict[str, Any]:
+        """Best trial params, with n_estimators cut to the early-stopped iteration."""
+        params = dict(trial.params)
+        if config.early_stopping_rounds and "best_iteration" in trial.user_attrs:
+            params["n_estimators"] = trial.user_attrs["best_iteration"]
+        return params
 
     def evaluate(self, X_test: pd.DataFrame, y_test: pd.Series) -> float:
         logger.debug("Start evaluation..")
-        return self.best_model.predict(X_test)
+        return (self.predict_proba(X_test) > 0.5).astype(int)
+
+    def predict_proba(self, X_test: pd.DataFrame) -> np.ndarray:
+        """Positive-class probabilities of the fitted model.
+
+        Scored by the booster, as BatchPredictor does: the sklearn wrapper, fitted
+        with feature names, warns about the unnamed CSR matrix of the sparse
+        encoding.
+        """
+        return self.booster.predict(to_model_input(X_test))
+
+    @property
+    def booster(self) -> lgb.Booster:
+        """LightGBM booster of the fitted model."""
+        return self.best_model.booster_
 
     def save(self, output_param_path: str, output_model_path: str):
         self._save_params(output_param_path)
@@ -109,13 +858,13 @@ class ModelTrainer:
     def _save_params(self, output_param_path: str):
         if not output_param_path:
             raise Exception(
-                "Parameter output_param_path is empty or None: ${output_param_path}"
+                f"Parameter output_param_path is empty or None: {output_param_path}"
             )
 
         if not os.path.exists(output_param_path):
             os.makedirs(os.path.dirname(output_param_path), exist_ok=True)
 
-        logger.debug(f"Save model params to path: ${output_param_path}")
+        logger.debug("Save model params to path: %s", output_param_path)
 
         with open(output_param_path, "w") as f:
             json.dump(self.best_params, f)
@@ -123,11 +872,170 @@ class ModelTrainer:
     def _save_model(self, output_model_path: str):
         if not output_model_path:
             raise Exception(
-                "Parameter output_model_path is empty or None: ${output_model_path}"
+                f"Parameter output_model_path is empty or None: {output_model_path}"
             )
 
         if not os.path.exists(output_model_path):
             os.makedirs(os.path.dirname(output_model_path), exist_ok=True)
 
-        logger.debug(f"Save model to path: ${output_model_path}")
-        self.best_model.booster_.save_model(output_model_path)
+        logger.debug("Save model to path: %s", output_model_path)
+        self.booster.save_model(output_model_path)
+
+
+def _update_digest(digest, data: pd.DataFrame | pd.Series):
+    """Feed column names and row-wise content hashes of `data` into `digest`."""
+    if isinstance(data, pd.DataFrame):
+        digest.update(json.dumps(list(map(str, data.columns))).encode())
+        model_input = to_model_input(data)
+        if sparse.issparse(model_input):
+            for array in (model_input.data, model_input.indices, model_input.indptr):
+                digest.update(np.ascontiguousarray(array).tobytes())
+            return
+    digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+
+
+def _journal_storage(storage_path: str) -> optuna.storages.JournalStorage:
+    return optuna.storages.JournalStorage(
+        optuna.storages.journal.JournalFileBackend(storage_path)
+    )
+
+
+def _validate_objective(config: OptunaConfig):
+    if config.metric not in METRICS:
+        raise ValueError(f"Unknown metric: {config.metric}, expected one of {METRICS}")
+    if config.inference_cost and config.inference_cost not in INFERENCE_COSTS:
+        raise ValueError(
+            f"Unknown inference_cost: {config.inference_cost}, "
+            f"expected one of {INFERENCE_COSTS}"
+        )
+    if config.fidelities and (config.cv_folds or config.inference_cost):
+        raise ValueError("fidelities are not supported with cv_folds or inference_cost")
+
+
+def _directions(config: OptunaConfig) -> list[str]:
+    directions = [METRICS[config.metric].direction]
+    if config.inference_cost:
+        directions.append("minimize")
+    return directions
+
+
+def _prunes(config: OptunaConfig) -> bool:
+    # Optuna does not prune multi-objective studies
+    return bool(config.pruner) and not config.inference_cost
+
+
+def _promoted(
+    trial: optuna.Trial, rung: int, score: float, config: OptunaConfig
+) -> bool:
+    """Whether `score` on fidelity `rung` ranks high enough to train on more rows."""
+    scores = [score] + [
+        other.user_attrs["fidelity_scores"][rung]
+        for other in trial.study.get_trials(deepcopy=False)
+        if other.number != trial.number
+        and len(other.user_attrs.get("fidelity_scores", [])) > rung
+    ]
+    n_promoted = len(scores) // config.fidelity_reduction_factor
+    if n_promoted == 0:
+        return True
+    sign = 1.0 if METRICS[config.metric].direction == "maximize" else -1.0
+    n_better = sum(sign * other > sign * score for other in scores)
+    return n_better < n_promoted
+
+
+def _lgb_metrics(metric: _Metric) -> list[str]:
+    """Validation metrics: logloss first (early stopping), then the pruning one."""
+    return list(dict.fromkeys(["binary_logloss", metric.lgb_metric]))
+
+
+def _create_pruner(config: OptunaConfig) -> optuna.pruners.BasePruner:
+    """Pruner over boosting iterations, or over folds with cross-validation."""
+    if not _prunes(config):
+        return optuna.pruners.NopPruner()
+    min_steps = 1 if config.cv_folds else config.n_estimators.min
+    max_steps = config.cv_folds or config.n_estimators.max
+    if config.pruner == "median":
+        return optuna.pruners.MedianPruner(n_warmup_steps=min_steps)
+    if config.pruner == "successive_halving":
+        return optuna.pruners.SuccessiveHalvingPruner()
+    if config.pruner == "hyperband":
+        return optuna.pruners.HyperbandPruner(min_resource=1, max_resource=max_steps)
+    raise ValueError(f"Unknown pruner: {config.pruner}")
+
+
+def _pruning_callback(trial: optuna.Trial, metric: _Metric):
+    """LightGBM callback reporting the validation metric to Optuna every iteration."""
+
+    def _callback(env: lgb.callback.CallbackEnv):
+        for data_name, eval_name, value, _ in env.evaluation_result_list:
+            if data_name == "valid" and eval_name == metric.lgb_metric:
+                trial.report(metric.from_lgb(value), step=env.iteration)
+                if trial.should_prune():
+                    raise optuna.TrialPruned(
+                        f"Trial pruned at iteration {env.iteration}"
+                    )
+
+    return _callback
+
+
+def _log_trial(study: optuna.Study, trial: optuna.trial.FrozenTrial):
+    """Optuna callback logging a "trial" event for every finished trial."""
+    profile = trial.user_attrs.get("profile", {})
+    duration = trial.duration.total_seconds() if trial.duration else None
+    log_event(
+        "trial",
+        "Trial %d %s: values=%s, params=%s",
+        trial.number,
+        trial.state.name,
+        trial.values,
+        trial.params,
+        study=study.study_name,
+        number=trial.number,
+        state=trial.state.name,
+        values=trial.values,
+        params=trial.params,
+        duration_seconds=duration,
+        cpu_seconds=profile.get("cpu_seconds"),
+        peak_rss_mb=profile.get("peak_rss_mb"),
+        **{
+            name: trial.user_attrs[name]
+            for name in (
+                "best_iteration",
+                "threshold",
+                "inference_cost",
+                "fidelity_scores",
+            )
+            if name in trial.user_attrs
+        },
+    )
+
+
+def _stop_callback(stop: threading.Event):
+    """LightGBM callback ending training at the next iteration once `stop` is set."""
+
+    def _callback(env: lgb.callback.CallbackEnv):
+        if stop.is_set():
+            raise lgb.callback.EarlyStopException(
+                env.iteration, env.evaluation_result_list or []
+            )
+
+    return _callback
+
+
+def _optimization_worker(
+    trainer: ModelTrainer,
+    study_name: str,
+    storage_path: str,
+    seed: int,
+    n_trials: int,
+    test_size: float,
+    config: OptunaConfig,
+):
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    replace(trainer.resources, num_threads=trainer.num_threads).apply()
+    study = optuna.load_study(
+        study_name=study_name,
+        storage=_journal_storage(storage_path),
+        sampler=optuna.samplers.TPESampler(seed=seed),
+        pruner=_create_pruner(config),
+    )
+    trainer._optimize(study, test_size, config, n_trials)
@@ -0,0 +1,126 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+
+from data.encoder import FeatureEncoder, to_model_input
+from data.formats import iter_dataset, resolve_format
+from model.compiled import CompiledModel
+from utils.custom_logger import logger
+
+
+class BatchPredictor:
+    """Scores raw rows with a saved model and its fitted encoder.
+
+    The model is a LightGBM booster or, for low-latency scoring of small batches,
+    the same model compiled to NumPy arrays (see model.compiled).
+    """
+
+    def __init__(self, booster: lgb.Booster | CompiledModel, encoder: FeatureEncoder):
+        self.booster = booster
+        self.encoder = encoder
+
+    @staticmethod
+    def load(
+        model_path: str, encoder_path: str, compiled_path: str | None = None
+    ) -> "BatchPredictor":
+        """Load the booster from `model_path`, or the compiled model if given."""
+        logger.debug("Load model from %s and encoder from %s", model_path, encoder_path)
+        booster = (
+            CompiledModel.load(compiled_path)
+            if compiled_path
+            else lgb.Booster(model_file=model_path)
+        )
+        return BatchPredictor(booster, FeatureEncoder.load(encoder_path))
+
+    def predict_proba(self, dataset: pd.DataFrame, num_threads: int = 0) -> np.ndarray:
+        """Encode raw rows and return positive-class probabilities.
+
+        `num_threads=0` lets LightGBM use its default (all cores).
+        """
+        features = to_model_input(self.encoder.transform(dataset))
+        return self.booster.predict(features, num_threads=num_threads)
+
+    def predict_file(
+        self,
+        input_path: str,
+        output_path: str,
+        chunk_size: int = 100_000,
+        n_threads: int | None = None,
+        threshold: float = 0.5,
+        id_column: str | None = None,
+        dataset_format: str | None = None,
+    ) -> dict[str, float]:
+        """Stream `input_path` through the model and write predictions as CSV.
+
+        Chunks are scored on `n_threads` threads (one LightGBM thread each) while
+        the calling thread reads input and appends results in input order. At most
+        2 * n_threads chunks are in flight, which bounds memory use regardless of
+        the input size.
+        """
+        n_threads = n_threads or os.cpu_count() or 1
+        columns = self.encoder.input_columns
+        if id_column and id_column not in columns:
+            columns = [id_column, *columns]
+        chunks = iter_dataset(
+            input_path,
+            resolve_format(input_path, dataset_format),
+            chunk_size,
+            columns,
+        )
+
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        n_rows = 0
+        start = time.perf_counter()
+        with (
+            ThreadPoolExecutor(max_workers=n_threads) as executor,
+            open(output_path, "w", newline="") as output,
+        ):
+            pending: deque[Future] = deque()
+            for chunk in chunks:
+                pending.append(
+                    executor.submit(self._score_chunk, chunk, threshold, id_column)
+                )
+                if len(pending) >= 2 * n_threads:
+                    n_rows += _write_chunk(pending.popleft().result(), output, n_rows)
+            while pending:
+                n_rows += _write_chunk(pending.popleft().result(), output, n_rows)
+
+        elapsed = time.perf_counter() - start
+        stats = {
+            "rows": n_rows,
+            "seconds": elapsed,
+            "rows_per_second": n_rows / elapsed if elapsed else 0.0,
+        }
+        logger.info(
+            "Scored %s rows in %.2fs (%.0f rows/s) to %s",
+            n_rows,
+            elapsed,
+            stats["rows_per_second"],
+            output_path,
+        )
+        return stats
+
+    def _score_chunk(
+        self, chunk: pd.DataFrame, threshold: float, id_column: str | None
+    ) -> pd.DataFrame:
+        probability = self.predict_proba(chunk, num_threads=1)
+        result = pd.DataFrame(
+            {
+                "probability": probability,
+                "prediction": (probability > threshold).astype(np.int8),
+            }
+        )
+        if id_column:
+            result.insert(0, id_column, chunk[id_column].to_numpy())
+        return result
+
+
+def _write_chunk(result: pd.DataFrame, output, rows_written: int) -> int:
+    result.to_csv(output, header=rows_written == 0, index=False)
+    return len(result)
@@ -0,0 +1,418 @@
+"""The training pipeline: download, prepare, search, fit, save and evaluate."""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from data.chunked import ChunkedDataset
+from data.data_downloader import DataDownloader
+from data.data_loader import DataLoader
+from data.encoder import FeatureEncoder
+from data.etl import DataPreparation
+from data.formats import iter_dataset, resolve_format
+from data.schema import PG15_SCHEMA, compact
+from model.binary_trainer import BinaryDatasetTrainer
+from model.compiled import CompiledModel
+from model.incremental_trainer import IncrementalTrainer
+from model.lineage import ModelLineage, file_sha256
+from model.model_trainer import ModelTrainer
+from utils.custom_logger import logger
+from utils.profiler import PipelineProfiler
+from utils.resources import ResourceBudget
+from utils.stage_cache import StageCache
+from utils.statistics import ModelStatistics
+
+
+def ml_pipeline(config: Config):
+    """Run the pipeline and write its profiling report next to metrics.json."""
+    profiler = PipelineProfiler(config.profiling.mode)
+    with profiler.run():
+        model_trainer = _train_pipeline(config, profiler)
+
+    report_path = config.profiling.report_path or os.path.join(
+        os.path.dirname(config.model.metrics_path), "profile.json"
+    )
+    profiler.write_report(report_path, model_trainer.trial_profiles)
+
+
+def _train_pipeline(config: Config, profiler: PipelineProfiler) -> ModelTrainer:
+    # Data preparation
+    with profiler.stage("download"):
+        download_dataset(config)
+
+    # Every later stage is cached under a key chained from its inputs' keys, so a
+    # cached stage skips all stages before it.
+    stages = StageCache(config.cache.dir, config.cache.max_size_mb * 1024**2)
+    load_key = stages.key(
+        "load",
+        stages.file_fingerprint(config.data.dataset_file_path),
+        config.data,
+        PG15_SCHEMA,
+    )
+    if config.incremental.enabled:
+        model_trainer = incremental_pipeline(config, stages, load_key, profiler)
+        if model_trainer is not None:
+            return model_trainer
+    if config.dataset.out_of_core:
+        return out_of_core_pipeline(config, stages, load_key, profiler)
+
+    transform_key = stages.key("transform", load_key)
+    split_key = stages.key("split", transform_key, config.random_state, config.dataset)
+    optimize_key = stages.key(
+        "optimize",
+        split_key,
+        config.random_state,
+        config.dataset,
+        config.optuna,
+        config.resources.deterministic,
+    )
+
+    def load() -> pd.DataFrame:
+        with profiler.stage("load") as stage:
+            dataset = stages.cached(
+                load_key,
+                lambda: load_dataset(config),
+            )
+            stage.set_shape(dataset)
+        return dataset
+
+    def transform() -> pd.DataFrame:
+        with profiler.stage("transform") as stage:
+            dataset = stages.cached(
+                transform_key, lambda: DataPreparation.build_target(load())
+            )
+            stage.set_shape(dataset)
+        return dataset
+
+    def split() -> tuple:
+        X_train, X_test, y_train, y_test = DataPreparation.train_test_split(
+            transform(), random_state=config.random_state
+        )
+        # The encoder is fitted on the training split only and saved for inference
+        encoder = DataPreparation.create_encoder(config.dataset.encoding).fit(X_train)
+        return (
+            encoder.transform(X_train),
+            encoder.transform(X_test),
+            y_train,
+            y_test,
+            encoder,
+        )
+
+    # Split and encode; load and transform run (nested) only on a cache miss
+    with profiler.stage("split") as stage:
+        X_train, X_test, y_train, y_test, encoder = stages.cached(split_key, split)
+        stage.set_shape(X_train)
+
+    # Model training
+    model_trainer = ModelTrainer(
+        X_train,
+        y_train,
+        random_state=config.random_state,
+        resources=ResourceBudget.from_config(config.resources),
+    )
+    with profiler.stage("optimize") as stage:
+        best_params = cached_optimize(stages, optimize_key, config, model_trainer)
+        stage.set_shape(X_train)
+    with profiler.stage("fit") as stage:
+        fit_key = stages.key(
+            "fit", split_key, best_params, config.resources.deterministic
+        )
+        model_trainer.best_params = best_params
+        model_trainer.best_model = stages.cached(
+            fit_key, lambda: model_trainer.fit(best_params)
+        )
+        stage.set_shape(X_train)
+    with profiler.stage("save"):
+        model_trainer.save(config.model.output_params_path, config.model.output_path)
+        encoder.save(config.model.encoder_path)
+        CompiledModel.from_booster(model_trainer.booster).save(
+            config.model.compiled_path
+        )
+
+    # Model evaluation
+    with profiler.stage("evaluate") as stage:
+        y_proba = model_trainer.predict_proba(X_test)
+        metrics = ModelStatistics.calculate_metrics(
+            y_test,
+            (y_proba > 0.5).astype(int),
+            config.model.metrics_path,
+            y_proba=y_proba,
+        )
+        stage.set_shape(X_test)
+    _record_full_training(config, encoder, metrics, rows=len(X_train))
+    return model_trainer
+
+
+def out_of_core_pipeline(
+    config: Config, stages: StageCache, load_key: str, profiler: PipelineProfiler
+) -> BinaryDatasetTrainer:
+    """Train from a dataset file without ever loading it as a whole.
+
+    Training rows are streamed into a LightGBM binary Dataset (reused while the
+    source and dataset config are unchanged); test rows are scored chunk by chunk.
+    """
+    chunks = ChunkedDataset(
+        config.data.dataset_file_path,
+        config.data.dataset_format,
+        config.dataset.chunk_size,
+        random_state=config.random_state,
+        columns=_required_columns(config),
+    )
+    binary_key = stages.key("binary", load_key, config.random_state, config.dataset)
+    binary_path = os.path.join(config.dataset.binary_dir, f"{binary_key}.bin")
+    binary_encoder_path = os.path.join(config.dataset.binary_dir, f"{binary_key}.json")
+    with profiler.stage("binary_dataset"):
+        if os.path.exists(binary_path) and os.path.exists(binary_encoder_path):
+            logger.debug("Reuse binary training dataset: %s", binary_path)
+            encoder = FeatureEncoder.load(binary_encoder_path)
+        else:
+            os.makedirs(config.dataset.binary_dir, exist_ok=True)
+            encoder = chunks.save_binary(
+                binary_path,
+                config.dataset.encoding,
+                params={**ModelTrainer.DATASET_PARAMS, "seed": config.random_state},
+            )
+            encoder.save(binary_encoder_path)
+
+    # Model training
+    model_trainer = BinaryDatasetTrainer(
+        binary_path,
+        random_state=config.random_state,
+        resources=ResourceBudget.from_config(config.resources),
+    )
+    with profiler.stage("optimize"):
+        best_params = cached_optimize(
+            stages,
+            stages.key(
+                "optimize",
+                binary_key,
+                config.random_state,
+                config.optuna,
+                config.resources.deterministic,
+            ),
+            config,
+            model_trainer,
+        )
+    with profiler.stage("fit"):
+        model_trainer.fit(best_params)
+    with profiler.stage("save"):
+        model_trainer.save(config.model.output_params_path, config.model.output_path)
+        encoder.save(config.model.encoder_path)
+        CompiledModel.from_booster(model_trainer.booster).save(
+            config.model.compiled_path
+        )
+
+    # Model evaluation
+    with profiler.stage("evaluate") as stage:
+        y_test, y_proba = [], []
+        for X_test, y in chunks.iter_test():
+            y_test.append(y)
+            y_proba.append(model_trainer.predict_proba(encoder.transform(X_test)))
+        y_proba = np.concatenate(y_proba)
+        metrics = ModelStatistics.calculate_metrics(
+            pd.concat(y_test),
+            (y_proba > 0.5).astype(int),
+            config.model.metrics_path,
+            y_proba=y_proba,
+        )
+        stage.rows = sum(len(y) for y in y_test)
+    _record_full_training(config, encoder, metrics)
+    return model_trainer
+
+
+def incremental_pipeline(
+    config: Config, stages: StageCache, load_key: str, profiler: PipelineProfiler
+) -> IncrementalTrainer | None:
+    """Update the saved model with the rows of new partition values only.
+
+    New rows are those whose `incremental.partition_column` value the saved model
+    was not trained on (per the encoder vocabulary and the lineage). They are split
+    into train and hold-out, encoded with the saved encoder, and the saved model is
+    updated on the train part. The update replaces the saved model only if it
+    passes the metric gate on the hold-out part. Returns None when the model has
+    to be trained from scratch instead.
+    """
+    incremental = config.incremental
+    lineage = ModelLineage(config.model.lineage_path)
+    reason = _full_training_reason(config, lineage)
+    if reason:
+        logger.info("Full training instead of an incremental update: %s", reason)
+        return None
+
+    encoder = FeatureEncoder.load(config.model.encoder_path)
+    trained = lineage.trained_partitions() | {
+        str(value)
+        for value in encoder.vocabularies.get(incremental.partition_column, [])
+    }
+    with profiler.stage("load") as stage:
+        dataset = stages.cached(
+            stages.key("incremental_load", load_key, sorted(trained)),
+            lambda: load_new_partitions(config, trained),
+        )
+        stage.set_shape(dataset)
+
+    new_partitions = sorted(
+        dataset[incremental.partition_column].astype(str).unique().tolist()
+    )
+    if not new_partitions:
+        logger.info(
+            "No new %s partition to train on; the saved model is unchanged",
+            incremental.partition_column,
+        )
+        return IncrementalTrainer(
+            dataset, None, config.model.output_path, config.random_state
+        )
+
+    with profiler.stage("transform") as stage:
+        new_rows = DataPreparation.build_target(dataset)
+        X_train, X_test, y_train, y_test = DataPreparation.train_test_split(
+            new_rows, config.dataset.test_size, config.random_state
+        )
+        X_train, X_test = encoder.transform(X_train), encoder.transform(X_test)
+        stage.set_shape(X_train)
+
+    model_trainer = IncrementalTrainer(
+        X_train,
+        y_train,
+        config.model.output_path,
+        config.random_state,
+        resources=ResourceBudget.from_config(config.resources),
+    )
+    with open(config.model.output_params_path) as f:
+        params = json.load(f)
+    with profiler.stage("fit") as stage:
+        model_trainer.update(
+            params,
+            incremental.mode,
+            incremental.num_boost_round,
+            incremental.decay_rate,
+        )
+        stage.set_shape(X_train)
+    with profiler.stage("evaluate") as stage:
+        accepted, baseline, metrics = model_trainer.gate(
+            X_test, y_test, incremental.gate_metric, incremental.max_metric_drop
+        )
+        stage.set_shape(X_test)
+
+    base_model_sha256 = file_sha256(config.model.output_path)
+    if accepted:
+        with profiler.stage("save"):
+            model_trainer.save(
+                config.model.output_params_path, config.model.output_path
+            )
+            CompiledModel.from_booster(model_trainer.booster).save(
+                config.model.compiled_path
+            )
+            ModelStatistics._save_metrics(metrics, config.model.metrics_path)
+    lineage.record(
+        "incremental",
+        mode=incremental.mode,
+        partitions=new_partitions,
+        rows=len(X_train),
+        accepted=accepted,
+        base_model_sha256=base_model_sha256,
+        model_sha256=file_sha256(config.model.output_path) if accepted else None,
+        baseline_metrics=ModelStatistics.to_json(baseline),
+        metrics=ModelStatistics.to_json(metrics),
+    )
+    return model_trainer
+
+
+def _full_training_reason(config: Config, lineage: ModelLineage) -> str | None:
+    """Why the saved model cannot be updated incrementally, if it cannot."""
+    model = config.model
+    for path in (model.output_path, model.encoder_path, model.output_params_path):
+        if not os.path.exists(path):
+            return f"{path} not found"
+    if lineage.current_model_sha256() != file_sha256(model.output_path):
+        return f"{model.output_path} is not the last model in {model.lineage_path}"
+    if lineage.updates_since_full() >= config.incremental.max_updates:
+        return f"{lineage.updates_since_full()} updates since the last full training"
+    return None
+
+
+def _record_full_training(
+    config: Config,
+    encoder: FeatureEncoder,
+    metrics: dict[str, float],
+    rows: int | None = None,
+):
+    """Start a new lineage chain with the model just saved."""
+    partition_column = config.incremental.partition_column
+    ModelLineage(config.model.lineage_path).record(
+        "full",
+        partitions=[
+            str(value) for value in encoder.vocabularies.get(partition_column, [])
+        ],
+        rows=rows,
+        model_sha256=file_sha256(config.model.output_path),
+        metrics=ModelStatistics.to_json(metrics),
+    )
+
+
+def cached_optimize(
+    stages: StageCache, key: str, config: Config, model_trainer: ModelTrainer
+) -> dict:
+    """Best params of the search, from the stage cache unless the study grows.
+
+    With a persistent study and `extend_study` every run adds `n_trials` trials, so
+    a cached result would hide them: the search always runs.
+    """
+
+    def optimize() -> dict:
+        return model_trainer.optimize(config.dataset.test_size, config.optuna)
+
+    if config.optuna.storage_path is not None and config.optuna.extend_study:
+        return optimize()
+    return stages.cached(key, optimize)
+
+
+def download_dataset(config: Config):
+    DataDownloader.download_data(
+        config.data.url,
+        config.data.dataset_file_path,
+        config.data.dataset_name,
+        cache_dir=config.data.cache_dir,
+        cache_ttl_seconds=config.data.cache_ttl_seconds,
+        dataset_format=config.data.dataset_format,
+    )
+
+
+def load_dataset(config: Config) -> pd.DataFrame:
+    """The downloaded dataset with the pipeline's columns and compact dtypes."""
+    return DataLoader.load_data(
+        config.data.dataset_file_path,
+        config.data.dataset_format,
+        _required_columns(config),
+        schema=PG15_SCHEMA,
+    )
+
+
+def load_new_partitions(config: Config, trained: set[str]) -> pd.DataFrame:
+    """Rows whose partition value is not in `trained`, in compact dtypes.
+
+    The dataset is streamed in `dataset.chunk_size` chunks and filtered chunk by
+    chunk, so only the new rows are ever held in memory.
+    """
+    path = config.data.dataset_file_path
+    column = config.incremental.partition_column
+    chunks = [
+        compact(chunk[~chunk[column].astype(str).isin(trained).to_numpy()], PG15_SCHEMA)
+        for chunk in iter_dataset(
+            path,
+            resolve_format(path, config.data.dataset_format),
+            config.dataset.chunk_size,
+            _required_columns(config) or list(PG15_SCHEMA),
+        )
+    ]
+    # Chunks may differ in categories and integer widths: compact them again
+    return compact(pd.concat(chunks, ignore_index=True), PG15_SCHEMA)
+
+
+def _required_columns(config: Config) -> list[str] | None:
+    if config.data.columns is None:
+        return None
+    return DataPreparation.required_columns(config.data.columns)
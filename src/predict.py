@@ -0,0 +1,71 @@
+import argparse
+from dataclasses import asdict
+
+from config import Config, load_config
+from utils.custom_logger import configure_logging
+from utils.resources import configure_resources
+
+
+def predict(
+    config: Config,
+    input_path: str,
+    output_path: str,
+    chunk_size: int = 100_000,
+    n_threads: int | None = None,
+    threshold: float = 0.5,
+    id_column: str | None = None,
+) -> dict[str, float]:
+    # Imported on use: `main.py predict --help` must not load LightGBM
+    from model.predictor import BatchPredictor
+
+    predictor = BatchPredictor.load(config.model.output_path, config.model.encoder_path)
+    return predictor.predict_file(
+        input_path,
+        output_path,
+        chunk_size=chunk_size,
+        n_threads=n_threads,
+        threshold=threshold,
+        id_column=id_column,
+    )
+
+
+def main(args: argparse.Namespace):
+    config: Config = load_config(args.config_path)
+    configure_logging(**asdict(config.logging))
+    resources = configure_resources(config.resources)
+    predict(
+        config,
+        args.input_path,
+        args.output_path,
+        chunk_size=args.chunk_size,
+        n_threads=args.threads or resources.num_threads,
+        threshold=args.threshold,
+        id_column=args.id_column,
+    )
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "config_path", type=str, help="Path to the configuration YAML file"
+    )
+    parser.add_argument(
+        "input_path", type=str, help="Raw rows to score (.csv, .parquet, .feather)"
+    )
+    parser.add_argument("output_path", type=str, help="Output CSV with predictions")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=None,
+        help="Scoring threads (default: resources.num_threads)",
+    )
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument(
+        "--id-column", type=str, default=None, help="Input column copied to output"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a dataset with a saved model")
+    add_arguments(parser)
+    main(parser.parse_args())
@@ -0,0 +1,39 @@
+import argparse
+import asyncio
+from dataclasses import asdict
+
+from config import Config, load_config
+from model.predictor import BatchPredictor
+from serving.batcher import MicroBatcher
+from serving.server import ScoringServer
+from utils.custom_logger import configure_logging
+
+
+def serve(config: Config):
+    predictor = BatchPredictor.load(
+        config.model.output_path,
+        config.model.encoder_path,
+        config.model.compiled_path if config.serving.compiled else None,
+    )
+    batcher = MicroBatcher(
+        predictor.predict_proba,
+        max_batch_size=config.serving.max_batch_size,
+        max_wait_ms=config.serving.max_wait_ms,
+    )
+    server = ScoringServer(
+        batcher, config.serving.host, config.serving.port, predictor.encoder
+    )
+    asyncio.run(server.serve_forever())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the saved model over HTTP")
+    parser.add_argument(
+        "config_path",
+        type=str,
+        help="Path to the configuration YAML file",
+    )
+    args = parser.parse_args()
+    config = load_config(args.config_path)
+    configure_logging(**asdict(config.logging))
+    serve(config)
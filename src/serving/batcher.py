@@ -0,0 +1,112 @@
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.custom_logger import logger
+
+
+class MicroBatcher:
+    """Coalesces concurrent scoring requests into one vectorized predict call.
+
+    A batch is closed once it holds `max_batch_size` rows or `max_wait_ms` passed
+    since its first request arrived; it is then scored by `predict_fn` on a single
+    worker thread, so the event loop keeps accepting requests meanwhile. If a
+    batch fails, its requests are scored one by one, so only the failing ones get
+    the error.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[pd.DataFrame], np.ndarray],
+        max_batch_size: int = 256,
+        max_wait_ms: float = 5.0,
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=True)
+
+    async def predict(self, rows: list[dict]) -> list[float]:
+        """Queue `rows` for the next batch and wait for their scores."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((rows, future))
+        return await future
+
+    async def _run(self):
+        while True:
+            requests = [await self._queue.get()]
+            n_rows = len(requests[0][0])
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+            while n_rows < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(self._queue.get(), timeout)
+                except TimeoutError:
+                    break
+                requests.append(request)
+                n_rows += len(request[0])
+
+            try:
+                scores = await self._score(
+                    [row for rows, _ in requests for row in rows]
+                )
+            except Exception as e:
+                if len(requests) == 1:
+                    logger.exception("Scoring a batch of %d rows failed", n_rows)
+                    _set_exception(requests[0][1], e)
+                    continue
+                # One bad request must not fail the others it was batched with
+                logger.warning(
+                    "Scoring a batch of %d rows failed (%s), scoring its %d "
+                    "requests one by one",
+                    n_rows,
+                    e,
+                    len(requests),
+                )
+                for rows, future in requests:
+                    try:
+                        _set_result(future, await self._score(rows))
+                    except Exception as request_error:
+                        _set_exception(future, request_error)
+                continue
+
+            offset = 0
+            for rows, future in requests:
+                _set_result(future, scores[offset : offset + len(rows)])
+                offset += len(rows)
+
+    async def _score(self, rows: list[dict]) -> np.ndarray:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.predict_fn, pd.DataFrame.from_records(rows)
+        )
+
+
+def _set_result(future: asyncio.Future, scores: np.ndarray):
+    if not future.done():
+        future.set_result(scores.tolist())
+
+
+def _set_exception(future: asyncio.Future, error: Exception):
+    if not future.done():
+        future.set_exception(error)
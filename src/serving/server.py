@@ -0,0 +1,135 @@
+import asyncio
+import json
+import numbers
+
+from data.encoder import FeatureEncoder
+from serving.batcher import MicroBatcher
+from utils.custom_logger import logger
+
+REASONS: dict[int, str] = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    500: "Internal Server Error",
+}
+
+
+class ScoringServer:
+    """Minimal asyncio HTTP/1.1 server (keep-alive) in front of a MicroBatcher.
+
+    Endpoints:
+      GET  /health   -> {"status": "ok"}
+      POST /predict  body: one raw row (JSON object) or a list of rows
+                     -> {"probabilities": [...]}
+
+    Given the model's `encoder`, rows are checked before they are queued: every
+    input column must be present and passthrough columns must hold numbers.
+    Invalid rows are rejected with 400 and never reach a batch.
+    """
+
+    def __init__(
+        self,
+        batcher: MicroBatcher,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        encoder: FeatureEncoder | None = None,
+    ):
+        self.batcher = batcher
+        self.host = host
+        self.port = port
+        self.encoder = encoder
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> asyncio.Server:
+        await self.batcher.start()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Scoring server listening on http://%s:%s", self.host, self.port)
+        return self._server
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.stop()
+
+    async def serve_forever(self):
+        server = await self.start()
+        try:
+            await server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, payload = await self._route(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                    f"\r\n".encode()
+                    + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes) -> tuple[int, dict]:
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok"}
+        if method != "POST" or path != "/predict":
+            return 404, {"error": f"Unknown endpoint: {method} {path}"}
+
+        try:
+            rows = json.loads(body)
+        except json.JSONDecodeError as e:
+            return 400, {"error": f"Invalid JSON: {e}"}
+        if isinstance(rows, dict):
+            rows = [rows]
+        if not isinstance(rows, list) or not rows:
+            return 400, {"error": "Expected a row object or a non-empty list of rows"}
+        for i, row in enumerate(rows):
+            error = self._row_error(row)
+            if error:
+                return 400, {"error": f"Invalid row {i}: {error}"}
+
+        try:
+            return 200, {"probabilities": await self.batcher.predict(rows)}
+        except Exception as e:
+            return 500, {"error": str(e)}
+
+    def _row_error(self, row) -> str | None:
+        if not isinstance(row, dict):
+            return "expected an object"
+        if self.encoder is None:
+            return None
+        missing = [c for c in self.encoder.input_columns if c not in row]
+        if missing:
+            return f"missing fields {missing}"
+        for column in self.encoder.passthrough_columns:
+            value = row[column]
+            if not isinstance(value, numbers.Real) or isinstance(value, bool):
+                return f"{column} must be a number, got {value!r}"
+        return None
@@ -0,0 +1,181 @@
+"""Run many pipeline configs over one shared copy of their dataset.
+
+Configs with the same `data` section and encoding share a dataset: it is
+downloaded, loaded and encoded once, in this process, and saved as memory-mapped
+arrays (see data.shared) under /dev/shm when available. Every config then runs
+as one job on a process pool: its own split (test_size, random_state), Optuna
+search, final fit and test metrics. `n_workers` jobs run at a time and every
+job's LightGBM, OpenMP and BLAS use resources.num_threads // n_workers threads
+of its config's budget (all cores by default, see utils.resources), so the pool
+never oversubscribes the cores. One row per config is written to a CSV results
+table.
+
+As in `main.py train`, 20% of the rows are held out for the test metrics and
+`dataset.test_size` is the validation fraction of the search.
+
+Unlike `main.py train`, the encoder is fitted on all rows of the shared dataset
+(not on each config's training split), the stage cache is not used and no model
+artifacts are written: train the chosen config to get them.
+"""
+
+import glob
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any
+
+import pandas as pd
+
+from config import Config, load_config, validate_config
+from data.etl import DataPreparation
+from data.schema import PG15_SCHEMA
+from data.shared import SHARED_MEMORY_DIR, load_shared, save_shared
+from model.model_trainer import ModelTrainer
+from pipeline import download_dataset, load_dataset
+from utils.custom_logger import logger, worker_logging
+from utils.resources import ResourceBudget
+from utils.stage_cache import StageCache
+from utils.statistics import ModelStatistics
+
+
+@dataclass(frozen=True)
+class SweepJob:
+    config_path: str
+    data_dir: str
+    resources: ResourceBudget
+
+
+def expand_config_paths(patterns: list[str]) -> list[str]:
+    """Config paths and glob patterns as a list of unique paths, in given order."""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern))
+        if not matches:
+            raise FileNotFoundError(f"No config file matches: {pattern}")
+        paths.extend(matches)
+    return list(dict.fromkeys(paths))
+
+
+def run_sweep(
+    config_paths: list[str],
+    output_path: str,
+    n_workers: int | None = None,
+    shared_dir: str | None = None,
+) -> pd.DataFrame:
+    """Run every config (see the module docstring) and write the results table.
+
+    A failing job does not stop the sweep: its row holds the error instead.
+    """
+    configs = {path: load_config(path) for path in config_paths}
+    errors = [
+        f"{path}: {error}"
+        for path, config in configs.items()
+        for error in validate_config(config)
+    ]
+    if errors:
+        raise ValueError("Invalid sweep configs:\n" + "\n".join(errors))
+
+    n_workers = min(n_workers or os.cpu_count() or 1, len(configs))
+    if shared_dir is None and os.access(SHARED_MEMORY_DIR, os.W_OK):
+        shared_dir = SHARED_MEMORY_DIR
+
+    with tempfile.TemporaryDirectory(prefix="sweep-", dir=shared_dir) as tmp_dir:
+        data_dirs: dict[str, str] = {}
+        jobs = []
+        for path, config in configs.items():
+            key = StageCache.key(
+                "sweep", config.data, config.dataset.encoding, PG15_SCHEMA
+            )
+            if key not in data_dirs:
+                data_dirs[key] = os.path.join(tmp_dir, key)
+                _prepare_shared_dataset(config, data_dirs[key])
+            resources = ResourceBudget.from_config(config.resources).split(n_workers)
+            jobs.append(SweepJob(path, data_dirs[key], resources))
+
+        logger.info(
+            "Sweep %s configs over %s shared datasets on %s workers, threads: %s",
+            len(jobs),
+            len(data_dirs),
+            n_workers,
+            sorted({job.resources.num_threads for job in jobs}),
+        )
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            **worker_logging(),
+        ) as executor:
+            futures = [executor.submit(run_job, job) for job in jobs]
+            rows = []
+            for job, future in zip(jobs, futures, strict=True):
+                try:
+                    rows.append(future.result())
+                except Exception as error:
+                    logger.error("Sweep job %s failed: %r", job.config_path, error)
+                    rows.append({"config": job.config_path, "error": repr(error)})
+
+    results = pd.DataFrame(rows)
+    if os.path.dirname(output_path):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    results.to_csv(output_path, index=False)
+    logger.info("Saved sweep results to %s", output_path)
+    return results
+
+
+def run_job(job: SweepJob) -> dict[str, Any]:
+    """Search, fit and evaluate one config on the shared dataset (worker process)."""
+    start = time.perf_counter()
+    config = load_config(job.config_path)
+    resources = job.resources.apply()
+    X, y = load_shared(job.data_dir)
+    train_rows, test_rows = DataPreparation.split_rows(
+        len(y), random_state=config.random_state
+    )
+    # The trainer gathers training rows from the shared frame only to build its
+    # Datasets; no copy of the training split is kept
+    X_test, y_test = X.iloc[test_rows], y.iloc[test_rows]
+    # Parallelism comes from the pool; per-config output files would collide
+    optuna_config = replace(
+        config.optuna,
+        n_workers=1,
+        threads_per_worker=resources.num_threads,
+        pareto_front_path=None,
+    )
+
+    trainer = ModelTrainer(
+        X, y, random_state=config.random_state, resources=resources, rows=train_rows
+    )
+    best_params = trainer.optimize(config.dataset.test_size, optuna_config)
+    trainer.fit(best_params)
+    y_proba = trainer.predict_proba(X_test)
+    metrics = ModelStatistics.calculate_metrics(
+        y_test, (y_proba > 0.5).astype(int), y_proba=y_proba
+    )
+    return {
+        "config": job.config_path,
+        "random_state": config.random_state,
+        "test_size": config.dataset.test_size,
+        "encoding": config.dataset.encoding,
+        "metric": config.optuna.metric,
+        "num_threads": resources.num_threads,
+        "n_trials": len(trainer.trial_profiles),
+        **{
+            f"param_{name}": value
+            for name, value in best_params.items()
+            if name != "random_state"
+        },
+        **{f"test_{name}": value for name, value in metrics.items()},
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def _prepare_shared_dataset(config: Config, directory: str):
+    """Download, load, build the target and encode once; save for the workers."""
+    logger.debug("Prepare shared dataset of %s", config.data.dataset_file_path)
+    download_dataset(config)
+    dataset = DataPreparation.build_target(load_dataset(config))
+    y = dataset.pop(DataPreparation.TARGET_COLUMN)
+    X = DataPreparation.create_encoder(config.dataset.encoding).fit_transform(dataset)
+    save_shared(X, y, directory)
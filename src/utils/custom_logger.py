@@ -1,28 +1,171 @@
+"""The pipeline logger, logging through a queue to a background thread.
+
+`configure_logging` attaches a single QueueHandler to the logger: a log call only
+puts its record on a queue, and a QueueListener thread formats it and writes it to
+the console, the log file and the events file. Records are not formatted on the
+calling thread, so message arguments (e.g. `logger.debug("%s", config)`) are
+only turned into text by the listener, and only for enabled levels. Spawned
+worker processes put their records on a process queue served by the same
+handlers (see `worker_logging`).
+
+Events (`log_event`) are records carrying structured fields, such as one per
+Optuna trial with its params, score and duration; they are also written to the
+JSON-lines events file.
+"""
+
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
+import multiprocessing
+import os
+import queue
+from datetime import UTC, datetime
+from typing import Any
 
 CMD_LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+DEFAULT_LOG_PATH: str = "training.log"
+# Console output: human-readable lines or one JSON object per record
+CONSOLE_FORMATS: tuple[str, ...] = ("text", "json")
+
+# Handlers are attached by configure_logging, called by the entry points; until
+# then (e.g. when modules are imported by tests or benchmarks) records propagate to
+# the root logger and no log file is opened. Configured, they no longer propagate.
+logger = logging.getLogger(__name__)
+
+# Listeners of the configured queues: this process's first, then the one serving
+# worker processes (created on demand by worker_logging)
+_listeners: list[logging.handlers.QueueListener] = []
+_worker_queue: Any = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; events add their fields at the top level."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if hasattr(record, "event"):
+            entry["event"] = record.event
+            entry.update(record.fields)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler leaving message formatting to the listener thread.
+
+    The standard handler formats the record before queueing it so it can be
+    pickled; records of this process stay in memory, so only a shallow copy is
+    queued. Arguments must not be mutated after the log call.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return copy.copy(record)
 
 
-def get_logger() -> logging.Logger:
+def configure_logging(
+    log_path: str | None = DEFAULT_LOG_PATH,
+    level: int | str = logging.DEBUG,
+    console: str = "text",
+    events_path: str | None = None,
+) -> logging.Logger:
     """
-    Configure common logger with console handler, file logger, level and format.
+    Configure common logger with a queue, console, file and events handlers.
+    Repeated calls replace the handlers of earlier ones.
+    :param log_path: log file, None for console only
+    :param level: logger level (number or name, e.g. "INFO")
+    :param console: console format, "text" (human-readable) or "json"
+    :param events_path: JSON-lines file of structured events, None for no file
     :return: configured logger
     """
-    log_level = logging.DEBUG
-    custom_logger = logging.getLogger(__name__)
-    custom_logger.setLevel(log_level)
+    if console not in CONSOLE_FORMATS:
+        raise ValueError(f"Unknown console format: {console}")
+    _stop_listeners()
+    logger.setLevel(level)
+    formatter = logging.Formatter(CMD_LOG_FORMAT)
 
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(log_level)
-    formatter = logging.Formatter(CMD_LOG_FORMAT)
-    console_handler.setFormatter(formatter)
+    console_handler.setFormatter(formatter if console == "text" else JsonFormatter())
+    handlers: list[logging.Handler] = [console_handler]
+
+    for path in (log_path, events_path):
+        if path and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+    if log_path:
+        fh = logging.FileHandler(log_path)
+        fh.setFormatter(formatter)
+        handlers.append(fh)
+    if events_path:
+        events_handler = logging.FileHandler(events_path)
+        events_handler.setFormatter(JsonFormatter())
+        events_handler.addFilter(lambda record: hasattr(record, "event"))
+        handlers.append(events_handler)
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    logger.addHandler(_DeferredQueueHandler(records))
+    # Root handlers would format on the calling thread again
+    logger.propagate = False
+    _listeners.append(logging.handlers.QueueListener(records, *handlers))
+    _listeners[0].start()
+    return logger
+
+
+def log_event(event: str, message: str, *args: Any, **fields: Any):
+    """Log an INFO record with structured `fields` (JSON-serializable values)."""
+    logger.info(message, *args, extra={"event": event, "fields": fields})
+
+
+def worker_logging() -> dict[str, Any]:
+    """ProcessPoolExecutor kwargs making spawned workers log through this process.
+
+    Workers get a QueueHandler on a process queue whose records the handlers of
+    `configure_logging` write; empty while logging is not configured.
+    """
+    global _worker_queue
+    if not _listeners:
+        return {}
+    if _worker_queue is None:
+        _worker_queue = multiprocessing.get_context("spawn").Queue()
+        handlers = _listeners[0].handlers
+        _listeners.append(logging.handlers.QueueListener(_worker_queue, *handlers))
+        _listeners[-1].start()
+    return {
+        "initializer": _configure_worker,
+        "initargs": (_worker_queue, logger.level),
+    }
+
+
+def _configure_worker(records, level: int):
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.setLevel(level)
+    # Records cross processes pickled, so they are formatted before queueing
+    logger.addHandler(logging.handlers.QueueHandler(records))
+    logger.propagate = False
 
-    fh = logging.FileHandler("training.log")
-    fh.setLevel(logging.DEBUG)
 
-    custom_logger.addHandler(fh)
-    custom_logger.addHandler(console_handler)
-    return custom_logger
+def _stop_listeners():
+    """Write out the queued records and detach the handlers of configure_logging."""
+    global _worker_queue
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    logger.propagate = True
+    while _listeners:
+        listener = _listeners.pop()
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+    if _worker_queue is not None:
+        _worker_queue.close()
+        _worker_queue = None
 
 
-logger = get_logger()
+atexit.register(_stop_listeners)
@@ -0,0 +1,217 @@
+"""Per-stage and per-trial timing and memory instrumentation.
+
+`measure` records wall time, CPU time (all threads of the process) and peak RSS
+of a block. On Linux the kernel's RSS high-water mark is reset at the start of
+every measured block, so the peak belongs to that block alone; nested blocks
+fold their peak into the enclosing ones. Elsewhere the peak is the process peak
+so far (an upper bound).
+
+`PipelineProfiler` collects stage measurements of one pipeline run, optionally
+under cProfile or tracemalloc, and writes them as a JSON report.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import resource
+import sys
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+from utils.custom_logger import logger
+
+MODES: tuple[str, ...] = ("cprofile", "tracemalloc")
+
+_PROC_STATUS: str = "/proc/self/status"
+_PROC_CLEAR_REFS: str = "/proc/self/clear_refs"
+
+# Measurements currently open in this process, innermost last
+_open: list["Measurement"] = []
+
+
+@dataclass
+class Measurement:
+    name: str
+    parent: str | None = None
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_rss_mb: float = 0.0
+    # Peak of Python allocations, only when tracemalloc is tracing
+    traced_peak_mb: float | None = None
+    rows: int | None = None
+    columns: int | None = None
+
+    def set_shape(self, data: Any):
+        """Rows and columns of a DataFrame, array or LightGBM Dataset."""
+        if hasattr(data, "num_data"):
+            self.rows, self.columns = data.num_data(), data.num_feature()
+        elif hasattr(data, "shape"):
+            self.rows = data.shape[0]
+            self.columns = data.shape[1] if len(data.shape) > 1 else 1
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@contextmanager
+def measure(record: Measurement) -> Iterator[Measurement]:
+    """Fill `record` with the wall/CPU time and peak memory of the block."""
+    if _open:
+        record.parent = record.parent or _open[-1].name
+        _fold_peaks()
+    _reset_peaks()
+    _open.append(record)
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield record
+    finally:
+        record.wall_seconds = time.perf_counter() - wall
+        record.cpu_seconds = time.process_time() - cpu
+        _fold_peaks()
+        _open.pop()
+
+
+class PipelineProfiler:
+    """Stage measurements of one pipeline run and their JSON report.
+
+    mode: None, "cprofile" (whole-run function profile, written as
+    `<report>.prof` with the top functions in the report) or "tracemalloc"
+    (Python allocation peaks per stage and the top allocation sites).
+    """
+
+    TOP_N: int = 20
+
+    def __init__(self, mode: str | None = None):
+        if mode is not None and mode not in MODES:
+            raise ValueError(f"Unknown profiling mode: {mode}, expected one of {MODES}")
+        self.mode = mode
+        self.stages: list[Measurement] = []
+        self.total = Measurement("pipeline")
+        self._profile: cProfile.Profile | None = None
+        self._started_at: str | None = None
+
+    @contextmanager
+    def run(self) -> Iterator["PipelineProfiler"]:
+        """Measure the whole run (and profile it in cprofile/tracemalloc mode)."""
+        self._started_at = datetime.now(UTC).isoformat()
+        if self.mode == "tracemalloc":
+            tracemalloc.start()
+        elif self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        try:
+            with measure(self.total):
+                yield self
+        finally:
+            if self._profile is not None:
+                self._profile.disable()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Measurement]:
+        record = Measurement(name)
+        try:
+            with measure(record):
+                yield record
+        finally:
+            logger.debug(
+                "Stage %s: %.3fs wall, %.3fs CPU, %.1f MB peak RSS",
+                name,
+                record.wall_seconds,
+                record.cpu_seconds,
+                record.peak_rss_mb,
+            )
+            self.stages.append(record)
+
+    def write_report(self, output_path: str, trials: list[dict[str, Any]] = ()):
+        report: dict[str, Any] = {
+            "started_at": self._started_at,
+            "mode": self.mode,
+            "python": sys.version.split()[0],
+            "cpu_count": os.cpu_count(),
+            "total": self.total.as_dict(),
+            "stages": [stage.as_dict() for stage in self.stages],
+            "trials": list(trials),
+        }
+        if self._profile is not None:
+            stats_path = f"{os.path.splitext(output_path)[0]}.prof"
+            self._profile.dump_stats(stats_path)
+            report["cprofile"] = {
+                "stats_path": stats_path,
+                "top_cumulative": _top_functions(self._profile, self.TOP_N),
+            }
+        if self.mode == "tracemalloc" and tracemalloc.is_tracing():
+            report["tracemalloc"] = {"top_allocations": _top_allocations(self.TOP_N)}
+            tracemalloc.stop()
+
+        if os.path.dirname(output_path):
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        logger.debug("Save profiling report to path: %s", output_path)
+        with open(output_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+def _fold_peaks():
+    """Raise the peaks of all open measurements to the current high-water marks."""
+    rss_mb = _peak_rss_mb()
+    traced_mb = None
+    if tracemalloc.is_tracing():
+        traced_mb = tracemalloc.get_traced_memory()[1] / 1024**2
+    for record in _open:
+        record.peak_rss_mb = max(record.peak_rss_mb, rss_mb)
+        if traced_mb is not None:
+            record.traced_peak_mb = max(record.traced_peak_mb or 0.0, traced_mb)
+
+
+def _reset_peaks():
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    try:
+        # Linux: "5" resets the RSS high-water mark (VmHWM) of the process
+        with open(_PROC_CLEAR_REFS, "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb() -> float:
+    try:
+        with open(_PROC_STATUS) as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / 1024**2 if sys.platform == "darwin" else max_rss / 1024
+
+
+def _top_functions(profile: cProfile.Profile, n: int) -> list[dict[str, Any]]:
+    stats = pstats.Stats(profile, stream=io.StringIO()).stats
+    top = [
+        {
+            "function": f"{filename}:{line}({function})",
+            "calls": calls,
+            "total_seconds": total,
+            "cumulative_seconds": cumulative,
+        }
+        for (filename, line, function), (_, calls, total, cumulative, _) in (
+            stats.items()
+        )
+    ]
+    return sorted(top, key=lambda row: row["cumulative_seconds"], reverse=True)[:n]
+
+
+def _top_allocations(n: int) -> list[dict[str, Any]]:
+    statistics = tracemalloc.take_snapshot().statistics("lineno")
+    return [
+        {"location": str(stat.traceback), "size_mb": stat.size / 1024**2}
+        for stat in statistics[:n]
+    ]
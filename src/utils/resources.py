@@ -0,0 +1,70 @@
+"""Thread budget of a run, shared by LightGBM, OpenMP and BLAS.
+
+LightGBM takes its thread count per call, while the OpenMP and BLAS pools of
+NumPy, SciPy and scikit-learn read OMP_NUM_THREADS and friends once, when their
+library is loaded. `ResourceBudget.apply` sets both kinds of limit: the
+environment variables (for libraries loaded later and for spawned worker
+processes, which inherit them) and threadpoolctl limits (for pools already
+loaded). The trainers take LightGBM's `n_jobs` and, in deterministic mode,
+`deterministic` and `force_row_wise` from the same budget, so the configured
+cores are not oversubscribed however the work is split between processes.
+"""
+
+import os
+from dataclasses import dataclass, replace
+from typing import Any
+
+from threadpoolctl import threadpool_limits
+
+from config import ResourcesConfig
+from utils.custom_logger import logger
+
+THREAD_LIMIT_VARS: tuple[str, ...] = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "BLIS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+# LightGBM params making training reproducible for a given number of threads:
+# row-wise histograms are built in a fixed order regardless of thread timing
+DETERMINISTIC_PARAMS: dict[str, Any] = {"deterministic": True, "force_row_wise": True}
+
+
+@dataclass(frozen=True)
+class ResourceBudget:
+    num_threads: int
+    deterministic: bool = False
+
+    @classmethod
+    def from_config(cls, config: ResourcesConfig) -> "ResourceBudget":
+        return cls(config.num_threads or os.cpu_count() or 1, config.deterministic)
+
+    def split(self, n_workers: int) -> "ResourceBudget":
+        """Budget of each of `n_workers` processes sharing this one."""
+        return replace(self, num_threads=max(1, self.num_threads // n_workers))
+
+    def lgb_params(self, num_threads: int | None = None) -> dict[str, Any]:
+        """LightGBM params using the budget's threads (or `num_threads` of them)."""
+        params = {"n_jobs": num_threads or self.num_threads}
+        if self.deterministic:
+            params.update(DETERMINISTIC_PARAMS)
+        return params
+
+    def apply(self) -> "ResourceBudget":
+        """Limit the OpenMP and BLAS pools of this process and its children."""
+        for name in THREAD_LIMIT_VARS:
+            os.environ[name] = str(self.num_threads)
+        threadpool_limits(limits=self.num_threads)
+        logger.debug(
+            "Thread budget: %s threads, deterministic=%s",
+            self.num_threads,
+            self.deterministic,
+        )
+        return self
+
+
+def configure_resources(config: ResourcesConfig) -> ResourceBudget:
+    """Apply the configured budget to this process; called by the entry points."""
+    return ResourceBudget.from_config(config).apply()
@@ -2,9 +2,12 @@
 
 import os
 import random
+import sys
 
 import numpy as np
 
+from utils.custom_logger import logger
+
 DEFAULT_SEED: int = 42
 
 
@@ -12,9 +15,21 @@ def set_seed(seed: int = DEFAULT_SEED) -> None:
     """
     Set random seeds for all libraries to ensure reproducibility.
 
+    str hashing (and so the iteration order of sets of strings) is seeded by
+    PYTHONHASHSEED when the interpreter starts; setting it here only reaches
+    child processes started afterwards (spawned Optuna and sweep workers). Run
+    with PYTHONHASHSEED set to make the current process reproducible too.
+
     Args:
         seed: Random seed value
     """
     random.seed(seed)
     np.random.seed(seed)
+    if sys.flags.hash_randomization and os.environ.get("PYTHONHASHSEED") != str(seed):
+        logger.warning(
+            "PYTHONHASHSEED is not %s in this process: str hashes stay "
+            "random here; start it with PYTHONHASHSEED=%s to fix them",
+            seed,
+            seed,
+        )
     os.environ["PYTHONHASHSEED"] = str(seed)
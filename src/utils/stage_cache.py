@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from collections.abc import Callable
+from dataclasses import asdict, is_dataclass
+from pathlib import Path
+from typing import Any, TypeVar
+
+from utils.custom_logger import logger
+
+T = TypeVar("T")
+
+# Bump to invalidate every cached stage after a change in stage code.
+CACHE_VERSION: int = 1
+
+
+class StageCache:
+    """Pipeline stage results cached on disk under a key derived from their inputs.
+
+    Stage keys are chained: each key hashes the stage name, the key of the stage it
+    consumes and the config it depends on, so keys of all stages are known before
+    any data is loaded and a cached late stage never needs its predecessors.
+    Values are pickled (protocol 5) to `<cache_dir>/<key>.pkl`; the total size is
+    capped at `max_size_bytes` by evicting least recently used entries.
+
+    With `cache_dir=None` the cache is disabled and every stage is computed.
+    """
+
+    def __init__(self, cache_dir: str | None, max_size_bytes: int = 2 * 1024**3):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_size_bytes = max_size_bytes
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(stage: str, *inputs: Any) -> str:
+        """Hash of the stage name and its JSON-serializable (or dataclass) inputs."""
+        payload = json.dumps(
+            [CACHE_VERSION, stage, *(_jsonable(value) for value in inputs)],
+            sort_keys=True,
+            default=str,
+        )
+        return f"{stage}-{hashlib.sha256(payload.encode()).hexdigest()[:32]}"
+
+    @staticmethod
+    def file_fingerprint(path: str) -> dict[str, Any]:
+        stat = os.stat(path)
+        return {
+            "path": str(Path(path).resolve()),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+
+    def cached(self, key: str, compute: Callable[[], T]) -> T:
+        """Return the value stored under `key`, computing and storing it on a miss."""
+        if self.cache_dir is None:
+            return compute()
+
+        path = self.cache_dir / f"{key}.pkl"
+        if path.exists():
+            logger.debug("Stage cache hit: %s", key)
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+            # mtime marks the last access for LRU eviction
+            os.utime(path)
+            return value
+
+        logger.debug("Stage cache miss: %s", key)
+        value = compute()
+        self._store(path, value)
+        self._evict()
+        return value
+
+    def _store(self, path: Path, value: Any):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=5)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _evict(self):
+        entries = [
+            (entry.stat().st_mtime_ns, entry.stat().st_size, entry)
+            for entry in self.cache_dir.glob("*.pkl")
+        ]
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total_size <= self.max_size_bytes:
+                break
+            logger.debug("Stage cache evict: %s", entry.name)
+            entry.unlink(missing_ok=True)
+            total_size -= size
+
+
+def _jsonable(value: Any) -> Any:
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    return value
@@ -1,36 +1,157 @@
 import json
+import math
 import os
 
+import numpy as np
 import pandas as pd
-from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
 
 from utils.custom_logger import logger
 
+# Probabilities are clipped to [EPSILON, 1 - EPSILON] for the log-loss
+EPSILON: float = 1e-15
+
 
 class ModelStatistics:
     @staticmethod
     def calculate_metrics(
-        y_test: pd.Series, y_pred: pd.Series, output_path: str = None
-    ) -> float:
+        y_test: pd.Series,
+        y_pred: pd.Series,
+        output_path: str = None,
+        y_proba: np.ndarray | None = None,
+    ) -> dict[str, float]:
+        """Label metrics of `y_pred`, plus ranking metrics when `y_proba` is given.
+
+        All label metrics come from one confusion matrix. With positive-class
+        probabilities `y_proba` the result also holds roc_auc, log_loss, pr_auc and
+        the threshold maximizing F1 (see `threshold_curve`).
+        """
+        y_true = ModelStatistics._as_labels(y_test)
+        tn, fp, fn, tp = ModelStatistics.confusion_matrix(
+            y_true, ModelStatistics._as_labels(y_pred)
+        )
         metrics = {
-            "accuracy": accuracy_score(y_test, y_pred),
-            "precision": precision_score(y_test, y_pred),
-            "recall": recall_score(y_test, y_pred),
-            "f1": f1_score(y_test, y_pred),
+            "accuracy": _divide(tp + tn, tp + tn + fp + fn),
+            "precision": _divide(tp, tp + fp),
+            "recall": _divide(tp, tp + fn),
+            "f1": _divide(2 * tp, 2 * tp + fp + fn),
         }
+        if y_proba is not None:
+            metrics.update(ModelStatistics.probability_metrics(y_true, y_proba))
 
-        logger.debug(f"Model metrics: {metrics}")
+        logger.debug("Model metrics: %s", metrics)
 
         if output_path:
             ModelStatistics._save_metrics(metrics, output_path)
 
         return metrics
 
+    @staticmethod
+    def confusion_matrix(
+        y_true: np.ndarray, y_pred: np.ndarray
+    ) -> tuple[int, int, int, int]:
+        """(tn, fp, fn, tp) of binary 0/1 labels, counted in one pass."""
+        counts = np.bincount(2 * y_true + y_pred, minlength=4)
+        return tuple(int(count) for count in counts)
+
+    @staticmethod
+    def probability_metrics(y_test: pd.Series, y_proba: np.ndarray) -> dict[str, float]:
+        """ROC-AUC, log-loss, PR-AUC (average precision) and the best-F1 threshold."""
+        y_true = ModelStatistics._as_labels(y_test)
+        y_proba = np.asarray(y_proba, dtype=np.float64)
+        curve = ModelStatistics.threshold_curve(y_true, y_proba)
+        tps, fps = curve["tp"].to_numpy(), curve["fp"].to_numpy()
+        positives, negatives = tps[-1], fps[-1]
+
+        # Trapezoids of the ROC curve, starting at (0, 0)
+        if positives and negatives:
+            tpr = np.concatenate([[0.0], tps / positives])
+            fpr = np.concatenate([[0.0], fps / negatives])
+            roc_auc = float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+        else:
+            roc_auc = float("nan")
+        # Step-wise area under the precision-recall curve
+        recall = np.concatenate([[0.0], curve["recall"].to_numpy()])
+        pr_auc = float(np.sum(np.diff(recall) * curve["precision"].to_numpy()))
+
+        clipped = np.clip(y_proba, EPSILON, 1 - EPSILON)
+        log_loss = -float(
+            np.mean(y_true * np.log(clipped) + (1 - y_true) * np.log(1 - clipped))
+        )
+
+        best = curve["f1"].to_numpy().argmax()
+        return {
+            "roc_auc": roc_auc,
+            "log_loss": log_loss,
+            "pr_auc": pr_auc,
+            "best_threshold": float(curve["threshold"].iloc[best]),
+            "best_threshold_f1": float(curve["f1"].iloc[best]),
+        }
+
+    @staticmethod
+    def threshold_curve(y_test: pd.Series, y_proba: np.ndarray) -> pd.DataFrame:
+        """Counts, precision, recall and F1 for every distinct probability threshold.
+
+        Row i predicts positive for `y_proba >= threshold[i]`; thresholds are in
+        decreasing order. Built from one sort and cumulative sums, so picking an
+        operating threshold needs no re-scoring.
+        """
+        y_true = ModelStatistics._as_labels(y_test)
+        y_proba = np.asarray(y_proba, dtype=np.float64)
+        if not len(y_proba):
+            raise ValueError("Cannot compute a threshold curve of no predictions")
+        if len(y_proba) != len(y_true):
+            raise ValueError(
+                f"Got {len(y_true)} labels and {len(y_proba)} probabilities"
+            )
+        order = np.argsort(y_proba, kind="stable")[::-1]
+        y_sorted, proba_sorted = y_true[order], y_proba[order]
+        # Last position of every run of equal probabilities
+        last = np.r_[np.flatnonzero(np.diff(proba_sorted)), len(proba_sorted) - 1]
+        tps = np.cumsum(y_sorted)[last]
+        fps = last + 1 - tps
+        positives = tps[-1]
+        return pd.DataFrame(
+            {
+                "threshold": proba_sorted[last],
+                "tp": tps,
+                "fp": fps,
+                "precision": _divide(tps, tps + fps),
+                "recall": _divide(tps, positives),
+                "f1": _divide(2 * tps, tps + fps + positives),
+            }
+        )
+
+    @staticmethod
+    def to_json(metrics: dict[str, float]) -> dict[str, float | None]:
+        """`metrics` with undefined (NaN) values as None, which JSON can hold."""
+        return {
+            name: None if isinstance(value, float) and math.isnan(value) else value
+            for name, value in metrics.items()
+        }
+
+    @staticmethod
+    def _as_labels(y: pd.Series | np.ndarray) -> np.ndarray:
+        return np.asarray(y).astype(np.int64, copy=False)
+
     @staticmethod
     def _save_metrics(metrics: dict, output_path: str):
-        logger.debug(f"Save model metrics to path: {output_path}")
+        logger.debug("Save model metrics to path: %s", output_path)
         if not os.path.exists(output_path):
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
         with open(output_path, "w") as f:
-            json.dump(metrics, f)
+            json.dump(ModelStatistics.to_json(metrics), f, allow_nan=False)
+
+
+def _divide(numerator, denominator):
+    """numerator / denominator, 0.0 where the denominator is 0 (as sklearn's
+    zero_division default, without the warning)."""
+    if np.ndim(numerator) == 0 and np.ndim(denominator) == 0:
+        return float(numerator / denominator) if denominator else 0.0
+    numerator = np.asarray(numerator, dtype=np.float64)
+    return np.divide(
+        numerator,
+        denominator,
+        out=np.zeros_like(numerator),
+        where=np.asarray(denominator) != 0,
+    )
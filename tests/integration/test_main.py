@@ -3,7 +3,7 @@ import os
 import pytest
 
 from config import load_config
-from main import ml_pipeline
+from pipeline import ml_pipeline
 
 TEST_YAML_CONFIG_PATH: str = "tests/integration/test.yaml"
 
@@ -0,0 +1,199 @@
+"""Unit tests for data.chunked and model.binary_trainer (out-of-core training)."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+import pytest
+from test_train import _make_optuna_config
+
+from data.chunked import ChunkedDataset
+from data.etl import DataPreparation
+from data.formats import resolve_format, write_dataset
+from model.binary_trainer import BinaryDatasetTrainer
+from model.model_trainer import ModelTrainer
+
+SRC_PATH = Path(__file__).parents[2] / "src"
+
+# Peak RSS of the in-memory path (load, encode, construct a Dataset), the
+# out-of-core path (chunks into a binary Dataset) or only the imports ("baseline"),
+# each in a fresh interpreter.
+PEAK_RSS_SCRIPT = """
+import resource, sys
+import lightgbm as lgb
+from data.chunked import ChunkedDataset
+from data.data_loader import DataLoader
+from data.encoder import to_model_input
+from data.etl import DataPreparation
+
+mode, dataset_path, binary_path = sys.argv[1:]
+params = {"verbosity": -1, "feature_pre_filter": False}
+if mode == "in_memory":
+    X_train, _, y_train, _ = DataPreparation.train_test_split(
+        DataPreparation.build_target(DataLoader.load_data(dataset_path))
+    )
+    X_train = DataPreparation.create_encoder().fit_transform(X_train)
+    lgb.Dataset(to_model_input(X_train), label=y_train, params=params).construct()
+elif mode == "out_of_core":
+    chunks = ChunkedDataset(dataset_path, chunk_size=5_000)
+    chunks.save_binary(binary_path, params=params, bin_sample_rows=20_000)
+    lgb.Dataset(binary_path, params=params).construct()
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def _make_raw_dataset(
+    n_samples: int = 2_000, n_groups: int = 20, seed: int = 0
+) -> pd.DataFrame:
+    """Raw rows with every column DataPreparation reads."""
+    rng = np.random.default_rng(seed)
+    dataset = pd.DataFrame(
+        {
+            "Age": rng.integers(18, 80, n_samples),
+            "Density": rng.uniform(14, 300, n_samples),
+            **{
+                column: rng.choice([f"{column}{i}" for i in range(n_groups)], n_samples)
+                for column in DataPreparation.CATEGORICAL_COLUMNS
+            },
+            **{
+                column: rng.poisson(0.2, n_samples)
+                for column in DataPreparation.NUMERICAL_COLUMNS
+            },
+        }
+    )
+    # Learnable target: claims depend on Age
+    dataset["Numtppd"] *= dataset["Age"] > 50
+    return dataset
+
+
+@pytest.fixture
+def dataset_path(tmp_path) -> str:
+    path = tmp_path / "dataset.csv"
+    _make_raw_dataset().to_csv(path, index=False)
+    return str(path)
+
+
+class TestChunkedDataset:
+    """Tests for ChunkedDataset."""
+
+    def test_train_and_test_chunks_partition_all_rows(self, dataset_path):
+        """Every row lands in exactly one split, identically on every pass."""
+        # given
+        chunks = ChunkedDataset(dataset_path, chunk_size=300, test_size=0.25)
+
+        # when
+        train = pd.concat([X for X, _ in chunks.iter_train()])
+        test = pd.concat([X for X, _ in chunks.iter_test()])
+
+        # then
+        assert len(train) + len(test) == 2_000
+        assert set(train.index).isdisjoint(test.index)
+        assert len(test) == pytest.approx(500, abs=60)
+        pd.testing.assert_frame_equal(
+            pd.concat([X for X, _ in chunks.iter_train()]), train
+        )
+
+    @pytest.mark.parametrize("encoding", ["onehot", "category", "sparse"])
+    def test_save_binary_bins_all_training_rows(self, dataset_path, tmp_path, encoding):
+        """The binary Dataset holds every training row with the encoder's features."""
+        # given
+        chunks = ChunkedDataset(dataset_path, chunk_size=300)
+        binary_path = str(tmp_path / "train.bin")
+
+        # when
+        encoder = chunks.save_binary(
+            binary_path, encoding, params=ModelTrainer.DATASET_PARAMS
+        )
+
+        # then
+        X_train = pd.concat([X for X, _ in chunks.iter_train()])
+        y_train = pd.concat([y for _, y in chunks.iter_train()])
+        expected = DataPreparation.create_encoder(encoding).fit(X_train)
+        assert encoder.vocabularies == expected.vocabularies
+        dataset = lgb.Dataset(binary_path, params=ModelTrainer.DATASET_PARAMS)
+        dataset.construct()
+        assert dataset.num_data() == len(X_train)
+        assert dataset.get_feature_name() == encoder.feature_names
+        np.testing.assert_array_equal(dataset.get_label(), y_train.to_numpy())
+
+    @pytest.mark.parametrize(
+        "file_name", ["large.csv", "large.parquet", "large.feather"]
+    )
+    def test_out_of_core_peak_rss_below_in_memory(self, tmp_path, file_name):
+        """Streaming into a binary Dataset needs a fraction of the in-memory RSS."""
+        # given
+        dataset_path = tmp_path / file_name
+        write_dataset(
+            _make_raw_dataset(n_samples=100_000, n_groups=60),
+            str(dataset_path),
+            resolve_format(str(dataset_path)),
+        )
+
+        # when
+        peak_rss = {
+            mode: int(
+                subprocess.run(
+                    [
+                        sys.executable,
+                        "-c",
+                        PEAK_RSS_SCRIPT,
+                        mode,
+                        str(dataset_path),
+                        str(tmp_path / "train.bin"),
+                    ],
+                    cwd=SRC_PATH,
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                ).stdout.split()[-1]
+            )
+            for mode in ("baseline", "in_memory", "out_of_core")
+        }
+
+        # then
+        in_memory = peak_rss["in_memory"] - peak_rss["baseline"]
+        out_of_core = peak_rss["out_of_core"] - peak_rss["baseline"]
+        assert out_of_core < in_memory / 3
+
+
+class TestBinaryDatasetTrainer:
+    """Tests for BinaryDatasetTrainer."""
+
+    @pytest.mark.parametrize(
+        "cv_folds, metric, fidelities",
+        [
+            (None, "accuracy", None),
+            (3, "accuracy", None),
+            (None, "f1", None),
+            (None, "accuracy", [0.5]),
+        ],
+    )
+    def test_run_optimization_trains_from_binary_file(
+        self, dataset_path, tmp_path, cv_folds, metric, fidelities
+    ):
+        """Search and final fit run on the binary file; test chunks are scored."""
+        # given
+        chunks = ChunkedDataset(dataset_path, chunk_size=300)
+        binary_path = str(tmp_path / "train.bin")
+        encoder = chunks.save_binary(binary_path, params=ModelTrainer.DATASET_PARAMS)
+        config = _make_optuna_config(n_trials=2)
+        config.cv_folds = cv_folds
+        config.metric = metric
+        config.fidelities = fidelities
+        trainer = BinaryDatasetTrainer(binary_path, random_state=42)
+
+        # when
+        booster, params = trainer.run_optimization(test_size=0.2, config=config)
+        trainer.save(str(tmp_path / "params.json"), str(tmp_path / "model.txt"))
+
+        # then
+        assert isinstance(booster, lgb.Booster)
+        assert booster.current_iteration() == params["n_estimators"]
+        X_test, y_test = next(chunks.iter_test())
+        y_pred = trainer.evaluate(encoder.transform(X_test), y_test)
+        assert y_pred.shape == (len(X_test),)
+        assert (y_pred == y_test.to_numpy()).mean() > 0.6
+        assert (tmp_path / "model.txt").exists()
@@ -0,0 +1,159 @@
+"""Unit tests for the main.py command line and config validation."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from test_train import _make_optuna_config
+
+import config
+from config import load_config, validate_config
+from data.encoder import FeatureEncoder
+from data.formats import EXTENSION_FORMATS
+from main import main
+from model.incremental_trainer import IncrementalTrainer
+from model.model_trainer import METRICS, _create_pruner
+from utils.custom_logger import CONSOLE_FORMATS
+from utils.profiler import MODES
+
+REPO_PATH = Path(__file__).parents[2]
+SRC_PATH = REPO_PATH / "src"
+BASE_CONFIG_PATH = REPO_PATH / "config" / "base.yaml"
+
+# Modules the CLI must not import before a subcommand needs them
+HEAVY_MODULES = (
+    "numpy",
+    "pandas",
+    "scipy",
+    "sklearn",
+    "lightgbm",
+    "optuna",
+    "rdata",
+    "requests",
+    "pyarrow",
+)
+# Generous bound on the cumulative import time of main.py (tens of ms locally)
+MAX_IMPORT_SECONDS = 0.5
+
+
+def _import_times(*args: str) -> tuple[subprocess.CompletedProcess, dict[str, float]]:
+    """Run python -X importtime and return cumulative seconds per module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=SRC_PATH,
+        capture_output=True,
+        text=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "cumulative" not in line:
+            _, cumulative, name = line.split("|")
+            times[name.strip()] = int(cumulative) / 1e6
+    return result, times
+
+
+def _write_config(tmp_path, **replacements: str) -> str:
+    text = BASE_CONFIG_PATH.read_text()
+    for old, new in replacements.items():
+        assert old in text
+        text = text.replace(old, new)
+    path = tmp_path / "config.yaml"
+    path.write_text(text)
+    return str(path)
+
+
+class TestStartup:
+    """Import-time regression tests (python -X importtime)."""
+
+    def test_importing_main_skips_heavy_dependencies(self):
+        """main.py imports no data/ML library and stays fast."""
+        # when
+        result, times = _import_times("-c", "import main")
+
+        # then
+        assert result.returncode == 0, result.stderr
+        assert not [name for name in times if name.split(".")[0] in HEAVY_MODULES]
+        assert times["main"] < MAX_IMPORT_SECONDS
+
+    def test_validate_config_skips_heavy_dependencies(self):
+        """validate-config runs without importing data/ML libraries or logging."""
+        # when
+        result, times = _import_times(
+            "main.py", "validate-config", str(BASE_CONFIG_PATH)
+        )
+
+        # then
+        assert result.returncode == 0, result.stderr
+        assert "OK" in result.stdout
+        assert not [name for name in times if name.split(".")[0] in HEAVY_MODULES]
+        assert not (SRC_PATH / "training.log").exists()
+
+
+class TestMain:
+    """Tests for main.main."""
+
+    def test_validate_config_reports_every_problem(self, tmp_path, capsys):
+        """Invalid choices and ranges are listed and give a non-zero exit code."""
+        # given
+        config_path = _write_config(
+            tmp_path,
+            **{
+                "encoding: onehot": "encoding: ordinal",
+                "metric: auc": "metric: precision",
+                "max_depth:\n    min: 3": "max_depth:\n    min: 30",
+                "# fidelities: [0.1, 0.3]": "fidelities: [0.3, 1.5]",
+                "# num_threads: 8": "num_threads: 0",
+            },
+        )
+
+        # when
+        exit_code = main(["validate-config", config_path])
+
+        # then
+        assert exit_code == 1
+        errors = capsys.readouterr().err
+        assert "dataset.encoding: 'ordinal'" in errors
+        assert "optuna.metric: 'precision'" in errors
+        assert "optuna.max_depth: min 30 > max 10" in errors
+        assert "optuna.fidelities: [0.3, 1.5] not all in (0, 1)" in errors
+        assert "resources.num_threads: 0 < 1" in errors
+
+    def test_config_path_without_subcommand_trains(self, monkeypatch):
+        """`main.py <config>` keeps working as `main.py train <config>`."""
+        # given
+        calls = []
+        monkeypatch.setattr("main.train", lambda args: calls.append(args) or 0)
+
+        # when
+        exit_code = main(["config/base.yaml"])
+
+        # then
+        assert exit_code == 0
+        assert [args.config_path for args in calls] == ["config/base.yaml"]
+
+    def test_options_without_subcommand_are_rejected(self):
+        """Options that are not a subcommand are not taken for a config path."""
+        with pytest.raises(SystemExit):
+            main(["--config", "config/base.yaml"])
+
+
+class TestValidateConfig:
+    """Tests for config.validate_config."""
+
+    def test_base_config_is_valid(self):
+        """The shipped config passes validation."""
+        assert validate_config(load_config(str(BASE_CONFIG_PATH))) == []
+
+    def test_choices_match_implementations(self):
+        """The allowed values in config match what the modules accept."""
+        assert config.ENCODINGS == FeatureEncoder.ENCODINGS
+        assert set(config.DATASET_FORMATS) == set(EXTENSION_FORMATS.values())
+        assert config.METRICS == tuple(METRICS)
+        assert config.PROFILING_MODES == MODES
+        assert config.UPDATE_MODES == IncrementalTrainer.UPDATE_MODES
+        assert config.CONSOLE_FORMATS == CONSOLE_FORMATS
+        for name in config.PRUNERS:
+            optuna_config = _make_optuna_config()
+            optuna_config.pruner = name
+            _create_pruner(optuna_config)
@@ -0,0 +1,151 @@
+"""Unit tests for model.compiled."""
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.encoder import FeatureEncoder, to_model_input
+from model.compiled import CompiledModel
+
+
+def _make_dataset(n_samples: int = 2000, seed: int = 0):
+    """Numeric features with NaNs and zeros, and a many-valued categorical."""
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(
+        {
+            "Age": rng.normal(45, 15, n_samples),
+            "Bonus": rng.integers(-50, 150, n_samples),
+            "Group1": rng.choice([f"G{i}" for i in range(40)], n_samples),
+            "Density": np.where(
+                rng.random(n_samples) < 0.3, 0.0, rng.random(n_samples)
+            ),
+        }
+    )
+    X.loc[rng.random(n_samples) < 0.1, "Age"] = np.nan
+    y = pd.Series(
+        (
+            (X["Age"].fillna(0) > 40)
+            ^ X["Group1"].isin(["G1", "G7", "G33"])
+            ^ (X["Density"] == 0)
+        ).astype(int)
+    )
+    return X, y
+
+
+def _fit(X: pd.DataFrame, y: pd.Series, encoding: str, **params):
+    encoder = FeatureEncoder(["Group1"], encoding=encoding).fit(X)
+    model = lgb.LGBMClassifier(
+        n_estimators=60, num_leaves=15, random_state=42, verbosity=-1, **params
+    )
+    model.fit(to_model_input(encoder.transform(X)), y)
+    return model.booster_, encoder
+
+
+class TestCompiledModel:
+    """Tests for CompiledModel."""
+
+    @pytest.mark.parametrize("encoding", FeatureEncoder.ENCODINGS)
+    def test_predict_matches_booster_on_held_out_data(self, encoding):
+        """Probabilities and raw scores equal Booster.predict for every encoding,
+        with missing values, zeros and unseen categories."""
+        # given
+        X, y = _make_dataset()
+        booster, encoder = _fit(X, y, encoding)
+        X_test, _ = _make_dataset(n_samples=500, seed=1)
+        X_test.loc[:9, "Group1"] = "unseen"
+        features = encoder.transform(X_test)
+
+        # when
+        compiled = CompiledModel.from_booster(booster)
+
+        # then
+        assert compiled.n_trees == booster.num_trees()
+        assert compiled.has_categorical == (encoding == "category")
+        np.testing.assert_allclose(
+            compiled.predict(features),
+            booster.predict(to_model_input(features)),
+            rtol=1e-12,
+        )
+        np.testing.assert_allclose(
+            compiled.predict(features, raw_score=True),
+            booster.predict(to_model_input(features), raw_score=True),
+            rtol=1e-12,
+            atol=1e-12,
+        )
+
+    def test_zero_as_missing_splits(self):
+        """Splits that send zeros (and NaN) the default way match the Booster."""
+        # given
+        X, y = _make_dataset()
+        booster, encoder = _fit(X, y, "onehot", zero_as_missing=True)
+        features = encoder.transform(_make_dataset(n_samples=500, seed=1)[0])
+
+        # when
+        compiled = CompiledModel.from_booster(booster)
+
+        # then
+        assert compiled.has_zero_missing
+        np.testing.assert_allclose(
+            compiled.predict(features), booster.predict(features), rtol=1e-12
+        )
+
+    def test_single_row_and_empty_input(self):
+        """A single row scores like the Booster; no rows give an empty result."""
+        # given
+        X, y = _make_dataset()
+        booster, encoder = _fit(X, y, "onehot")
+        compiled = CompiledModel.from_booster(booster)
+        features = encoder.transform(X)
+
+        # when / then
+        np.testing.assert_allclose(
+            compiled.predict(features.iloc[[3]]),
+            booster.predict(features.iloc[[3]]),
+            rtol=1e-12,
+        )
+        assert compiled.predict(features.iloc[:0]).shape == (0,)
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        """The .npz keeps every array and the metadata."""
+        # given
+        X, y = _make_dataset()
+        booster, encoder = _fit(X, y, "category")
+        compiled = CompiledModel.from_booster(booster)
+        path = str(tmp_path / "model" / "model.npz")
+
+        # when
+        compiled.save(path)
+        loaded = CompiledModel.load(path)
+
+        # then
+        features = encoder.transform(X)
+        assert loaded.feature_names == booster.feature_name()
+        assert loaded.max_depth == compiled.max_depth
+        np.testing.assert_array_equal(
+            loaded.predict(features), compiled.predict(features)
+        )
+
+    def test_wrong_number_of_features_raises(self):
+        """Input with other columns than the model's is rejected."""
+        # given
+        X, y = _make_dataset()
+        booster, _ = _fit(X, y, "category")
+
+        # when / then
+        with pytest.raises(ValueError, match="Expected 4 features, got 2"):
+            CompiledModel.from_booster(booster).predict(np.zeros((3, 2)))
+
+    def test_multiclass_model_raises(self):
+        """Models with several trees per iteration are not supported."""
+        # given
+        rng = np.random.default_rng(0)
+        booster = lgb.train(
+            {"objective": "multiclass", "num_class": 3, "verbosity": -1},
+            lgb.Dataset(rng.random((100, 2)), rng.integers(0, 3, 100)),
+            num_boost_round=2,
+        )
+
+        # when / then
+        with pytest.raises(ValueError, match="single-output"):
+            CompiledModel.from_booster(booster)
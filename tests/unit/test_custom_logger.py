@@ -0,0 +1,129 @@
+"""Unit tests for utils.custom_logger."""
+
+import json
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import pytest
+from test_train import _make_optuna_config, _make_synthetic_data
+
+from model.model_trainer import ModelTrainer
+from utils import custom_logger
+from utils.custom_logger import configure_logging, log_event, logger, worker_logging
+
+
+@pytest.fixture
+def restore_logging():
+    """Detach the handlers a test configures; keep the logger's level."""
+    level = logger.level
+    yield
+    custom_logger._stop_listeners()
+    logger.setLevel(level)
+
+
+def _log_from_worker(message: str):
+    logger.warning(message)
+
+
+class _Unformattable:
+    """Argument recording the thread its text is built on."""
+
+    def __init__(self):
+        self.threads = []
+
+    def __str__(self) -> str:
+        self.threads.append(threading.current_thread().name)
+        return "formatted"
+
+
+@pytest.mark.usefixtures("restore_logging")
+class TestConfigureLogging:
+    """Tests for configure_logging."""
+
+    def test_records_are_formatted_off_the_calling_thread(self, tmp_path):
+        """Messages are built by the listener, and only for enabled levels."""
+        # given
+        log_path = tmp_path / "training.log"
+        configure_logging(str(log_path), level="INFO")
+        argument = _Unformattable()
+
+        # when
+        logger.debug("skipped %s", argument)
+        logger.info("kept %s", argument)
+        custom_logger._stop_listeners()
+
+        # then
+        assert argument.threads and threading.main_thread().name not in (
+            argument.threads
+        )
+        lines = log_path.read_text().splitlines()
+        assert len(lines) == 1 and lines[0].endswith("INFO - kept formatted")
+
+    def test_events_are_written_as_json_lines(self, tmp_path, capsys):
+        """Only events reach the events file; the console can print JSON."""
+        # given
+        events_path = tmp_path / "out" / "events.jsonl"
+        configure_logging(None, console="json", events_path=str(events_path))
+
+        # when
+        logger.info("plain record")
+        log_event("trial", "Trial %d done", 3, number=3, params={"max_depth": 4})
+        custom_logger._stop_listeners()
+
+        # then
+        events = [json.loads(line) for line in events_path.read_text().splitlines()]
+        assert len(events) == 1
+        assert events[0]["event"] == "trial"
+        assert events[0]["message"] == "Trial 3 done"
+        assert events[0]["params"] == {"max_depth": 4}
+        console = [json.loads(line) for line in capsys.readouterr().err.splitlines()]
+        assert [entry["message"] for entry in console] == [
+            "plain record",
+            "Trial 3 done",
+        ]
+
+    def test_unknown_console_format_raises(self):
+        """Only the text and json console formats exist."""
+        with pytest.raises(ValueError, match="Unknown console format"):
+            configure_logging(None, console="xml")
+
+    def test_worker_processes_log_through_the_parent(self, tmp_path):
+        """Records of spawned workers are written by the parent's handlers."""
+        # given
+        log_path = tmp_path / "training.log"
+        configure_logging(str(log_path), level=logging.INFO)
+
+        # when
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=get_context("spawn"), **worker_logging()
+        ) as executor:
+            executor.submit(_log_from_worker, "from the worker").result()
+        custom_logger._stop_listeners()
+
+        # then
+        assert "WARNING - from the worker" in log_path.read_text()
+
+    def test_optimize_logs_one_event_per_trial(self, tmp_path):
+        """Every finished trial is an event with its params, score and duration."""
+        # given
+        events_path = tmp_path / "events.jsonl"
+        configure_logging(None, level="WARNING", events_path=str(events_path))
+        logger.setLevel(logging.INFO)
+        X, y = _make_synthetic_data()
+        config = _make_optuna_config(n_trials=3)
+
+        # when
+        ModelTrainer(X, y, random_state=42).optimize(test_size=0.2, config=config)
+        custom_logger._stop_listeners()
+
+        # then
+        events = [json.loads(line) for line in events_path.read_text().splitlines()]
+        assert [event["number"] for event in events] == [0, 1, 2]
+        for event in events:
+            assert event["state"] == "COMPLETE"
+            assert set(event["params"]) >= {"n_estimators", "learning_rate"}
+            assert 0 <= event["values"][0] <= 1
+            assert event["duration_seconds"] > 0
+            assert event["cpu_seconds"] >= 0
@@ -1,9 +1,12 @@
 """Unit tests for data.data_loader."""
 
+import numpy as np
 import pandas as pd
 import pytest
 
 from data.data_loader import DataLoader
+from data.formats import iter_dataset, resolve_format, write_dataset
+from data.schema import CATEGORY, FLOAT, INTEGER, default_dtypes_bytes
 
 
 class TestDataLoaderLoadData:
@@ -29,3 +32,186 @@ class TestDataLoaderLoadData:
         """load_data raises when the path does not exist."""
         with pytest.raises(FileNotFoundError):
             DataLoader.load_data("/nonexistent/path/data.csv")
+
+    def test_load_data_csv_selected_columns(self, tmp_path):
+        """load_data reads only the requested columns."""
+        # given
+        csv_path = tmp_path / "data.csv"
+        csv_path.write_text("a,b,c\n1,2,3\n4,5,6\n")
+
+        # when
+        result = DataLoader.load_data(str(csv_path), columns=["a", "c"])
+
+        # then
+        assert list(result.columns) == ["a", "c"]
+
+    @pytest.mark.parametrize("file_name", ["data.parquet", "data.feather"])
+    def test_load_data_columnar_keeps_categories(self, tmp_path, file_name):
+        """Columnar files round-trip string columns as dictionary-encoded categories."""
+        # given
+        path = tmp_path / file_name
+        df = pd.DataFrame({"a": [1, 2, 3], "g": ["x", "y", "x"], "z": [0.1, 0.2, 0.3]})
+        write_dataset(df, str(path), resolve_format(str(path)))
+
+        # when
+        result = DataLoader.load_data(str(path), columns=["a", "g"])
+
+        # then
+        assert list(result.columns) == ["a", "g"]
+        assert isinstance(result["g"].dtype, pd.CategoricalDtype)
+        assert result["g"].tolist() == ["x", "y", "x"]
+        assert result["a"].tolist() == [1, 2, 3]
+
+
+class TestDataLoaderSchema:
+    """Tests for DataLoader.load_data with a schema."""
+
+    SCHEMA = {"year": CATEGORY, "g": CATEGORY, "n": INTEGER, "big": INTEGER, "x": FLOAT}
+
+    @staticmethod
+    def _make_dataset(n_rows: int = 1_000) -> pd.DataFrame:
+        rng = np.random.default_rng(0)
+        return pd.DataFrame(
+            {
+                "year": rng.choice([2009, 2010], n_rows),
+                "g": rng.choice(["alpha", "beta", "gamma"], n_rows),
+                "n": rng.integers(0, 100, n_rows),
+                "big": rng.integers(0, 100_000, n_rows),
+                "x": rng.uniform(0, 1, n_rows),
+                "unused": rng.uniform(0, 1, n_rows),
+            }
+        )
+
+    @pytest.mark.parametrize("file_name", ["data.csv", "data.parquet"])
+    def test_load_data_with_schema_compacts_dtypes(self, tmp_path, file_name):
+        """Schema columns load as categories, float32 and the narrowest integers."""
+        # given
+        path = tmp_path / file_name
+        dataset = self._make_dataset()
+        write_dataset(dataset, str(path), resolve_format(str(path)))
+
+        # when
+        result = DataLoader.load_data(str(path), schema=self.SCHEMA)
+
+        # then
+        assert list(result.columns) == list(self.SCHEMA)
+        assert isinstance(result["g"].dtype, pd.CategoricalDtype)
+        assert isinstance(result["year"].dtype, pd.CategoricalDtype)
+        assert result["n"].dtype == np.int8
+        assert result["big"].dtype == np.int32
+        assert result["x"].dtype == np.float32
+        # Same values as a plain load, numeric categories stay numeric
+        plain = DataLoader.load_data(str(path), columns=list(self.SCHEMA))
+        assert result["year"].tolist() == plain["year"].tolist()
+        assert result["g"].tolist() == plain["g"].tolist()
+        assert result["big"].tolist() == plain["big"].tolist()
+        np.testing.assert_allclose(result["x"], plain["x"], rtol=1e-6)
+
+    def test_load_data_with_schema_reports_smaller_footprint(self, tmp_path):
+        """The compact frame is smaller than the estimated default-dtype frame."""
+        # given
+        path = tmp_path / "data.csv"
+        self._make_dataset().to_csv(path, index=False)
+
+        # when
+        result = DataLoader.load_data(str(path), schema=self.SCHEMA)
+
+        # then
+        plain = DataLoader.load_data(str(path), columns=list(self.SCHEMA))
+        assert default_dtypes_bytes(result) == plain.memory_usage(deep=True).sum()
+        assert result.memory_usage(deep=True).sum() < default_dtypes_bytes(result) / 3
+
+    def test_load_data_with_schema_and_columns(self, tmp_path):
+        """Explicit columns override the schema's column list."""
+        # given
+        path = tmp_path / "data.csv"
+        self._make_dataset().to_csv(path, index=False)
+
+        # when
+        result = DataLoader.load_data(
+            str(path), columns=["g", "unused"], schema=self.SCHEMA
+        )
+
+        # then
+        assert list(result.columns) == ["g", "unused"]
+        assert isinstance(result["g"].dtype, pd.CategoricalDtype)
+        assert result["unused"].dtype == np.float64
+
+
+class TestWriteDataset:
+    """Tests for data.formats.write_dataset."""
+
+    def test_write_feather_reads_zero_copy(self, tmp_path):
+        """Feather is written uncompressed, so reads come from the memory map."""
+        # given
+        pa = pytest.importorskip("pyarrow")
+        path = tmp_path / "data.feather"
+        df = pd.DataFrame({"a": np.arange(100_000), "x": np.ones(100_000)})
+        write_dataset(df, str(path), "feather")
+
+        # when
+        allocated = pa.total_allocated_bytes()
+        with pa.memory_map(str(path)) as source:
+            table = pa.ipc.open_file(source).read_all()
+
+            # then
+            assert table.num_rows == 100_000
+            assert pa.total_allocated_bytes() - allocated < 100_000
+
+
+class TestIterDataset:
+    """Tests for data.formats.iter_dataset."""
+
+    @pytest.mark.parametrize("file_name", ["d.csv", "d.parquet", "d.feather"])
+    def test_iter_dataset_yields_all_rows_in_chunks(self, tmp_path, file_name):
+        """Chunks hold at most chunk_size rows and concatenate to the file."""
+        # given
+        path = tmp_path / file_name
+        df = pd.DataFrame({"a": np.arange(1_000), "g": ["x", "y"] * 500})
+        write_dataset(df, str(path), resolve_format(str(path)))
+
+        # when
+        chunks = list(
+            iter_dataset(str(path), resolve_format(str(path)), 300, columns=["a"])
+        )
+
+        # then
+        assert [len(chunk) for chunk in chunks] == [300, 300, 300, 100]
+        assert pd.concat(chunks)["a"].tolist() == list(range(1_000))
+        assert all(list(chunk.columns) == ["a"] for chunk in chunks)
+
+    def test_iter_compressed_feather_decompresses_one_batch_at_a_time(self, tmp_path):
+        """A compressed Feather file is never decompressed as a whole."""
+        # given
+        pa = pytest.importorskip("pyarrow")
+        path = tmp_path / "d.feather"
+        n_rows = 200_000
+        df = pd.DataFrame({"a": np.arange(n_rows), "x": np.ones(n_rows)})
+        df.to_feather(path, compression="lz4", chunksize=10_000)
+
+        # when
+        allocated = pa.total_allocated_bytes()
+        peak = 0
+        for _ in iter_dataset(str(path), "feather", 5_000):
+            peak = max(peak, pa.total_allocated_bytes() - allocated)
+
+        # then
+        assert peak < df.memory_usage().sum() / 10
+
+
+class TestResolveFormat:
+    """Tests for data.formats.resolve_format."""
+
+    @pytest.mark.parametrize(
+        "path, expected",
+        [("d.csv", "csv"), ("d.parquet", "parquet"), ("d.arrow", "feather")],
+    )
+    def test_resolve_format_from_extension(self, path, expected):
+        assert resolve_format(path) == expected
+
+    def test_resolve_format_explicit_overrides_extension(self):
+        assert resolve_format("d.csv", "parquet") == "parquet"
+
+    def test_resolve_format_unknown_extension_raises(self):
+        with pytest.raises(ValueError):
+            resolve_format("d.xlsx")
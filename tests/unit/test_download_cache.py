@@ -0,0 +1,131 @@
+"""Unit tests for data.data_downloader and data.download_cache (local HTTP server)."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+import rdata
+
+from data.data_downloader import DataDownloader
+from data.download_cache import DownloadCache
+
+DATASET_NAME = "pg15training"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serves `server.payload` with an ETag and honours If-None-Match."""
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        etag = f'"{server.version}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(server.payload)))
+        self.end_headers()
+        self.wfile.write(server.payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.requests = []
+    server.version = 1
+    server.payload = b""
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _rda_payload(tmp_path, df: pd.DataFrame) -> bytes:
+    rda_path = tmp_path / "source.rda"
+    rdata.write_rda(rda_path, {DATASET_NAME: df})
+    return rda_path.read_bytes()
+
+
+def _url(server) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}/pg15training.rda"
+
+
+class TestDownloadCache:
+    """Tests for DownloadCache.fetch."""
+
+    def test_fetch_revalidates_with_etag(self, http_server, tmp_path):
+        """A second fetch sends If-None-Match and reuses the cached blob on 304."""
+        # given
+        http_server.payload = b"payload"
+        cache = DownloadCache(str(tmp_path / "cache"))
+
+        # when
+        first = cache.fetch(_url(http_server))
+        second = cache.fetch(_url(http_server))
+
+        # then
+        assert first.sha256 == second.sha256
+        assert cache.blob_path(second).read_bytes() == b"payload"
+        assert http_server.requests[1]["If-None-Match"] == '"1"'
+
+    def test_fetch_within_ttl_skips_network(self, http_server, tmp_path):
+        """Entries younger than ttl_seconds are returned without a request."""
+        # given
+        http_server.payload = b"payload"
+        cache = DownloadCache(str(tmp_path / "cache"), ttl_seconds=3600)
+
+        # when
+        cache.fetch(_url(http_server))
+        cache.fetch(_url(http_server))
+
+        # then
+        assert len(http_server.requests) == 1
+
+    def test_fetch_downloads_changed_content(self, http_server, tmp_path):
+        """A changed ETag yields a new content-addressed blob."""
+        # given
+        http_server.payload = b"v1"
+        cache = DownloadCache(str(tmp_path / "cache"))
+        first = cache.fetch(_url(http_server))
+
+        # when
+        http_server.version, http_server.payload = 2, b"v2"
+        second = cache.fetch(_url(http_server))
+
+        # then
+        assert first.sha256 != second.sha256
+        assert cache.blob_path(second).read_bytes() == b"v2"
+        assert not list((tmp_path / "cache" / "blobs").glob("*.part"))
+
+
+class TestDataDownloaderCached:
+    """Tests for DataDownloader.download_data with a cache directory."""
+
+    def test_unchanged_source_skips_conversion(self, http_server, tmp_path):
+        """The CSV is rewritten only when the downloaded content changes."""
+        # given
+        df = pd.DataFrame({"a": [1, 2], "b": pd.Categorical(["x", "y"])})
+        http_server.payload = _rda_payload(tmp_path, df)
+        output_path = tmp_path / "raw" / "pg15training.csv"
+        cache_dir = str(tmp_path / "cache")
+
+        # when
+        DataDownloader.download_data(
+            _url(http_server), str(output_path), DATASET_NAME, cache_dir=cache_dir
+        )
+        first_mtime = output_path.stat().st_mtime_ns
+        DataDownloader.download_data(
+            _url(http_server), str(output_path), DATASET_NAME, cache_dir=cache_dir
+        )
+
+        # then
+        assert output_path.stat().st_mtime_ns == first_mtime
+        assert pd.read_csv(output_path)["a"].tolist() == [1, 2]
+        assert len(http_server.requests) == 2
@@ -0,0 +1,99 @@
+"""Unit tests for data.encoder."""
+
+import pandas as pd
+import pytest
+
+from data.encoder import FeatureEncoder
+
+CATEGORICAL_COLUMNS = ["color", "year"]
+
+
+def _make_dataset():
+    return pd.DataFrame(
+        {
+            "age": [30, 40, 50, 60],
+            "color": ["red", "blue", "red", "green"],
+            "year": [2014, 2015, 2014, 2015],
+        }
+    )
+
+
+class TestFeatureEncoder:
+    """Tests for FeatureEncoder."""
+
+    def test_onehot_matches_get_dummies(self):
+        """onehot encoding produces the get_dummies columns and values."""
+        # given
+        dataset = _make_dataset()
+        expected = pd.get_dummies(dataset, columns=CATEGORICAL_COLUMNS)
+
+        # when
+        result = FeatureEncoder(CATEGORICAL_COLUMNS).fit_transform(dataset)
+
+        # then
+        assert list(result.columns) == list(expected.columns)
+        assert (result.to_numpy() == expected.to_numpy()).all()
+
+    def test_transform_keeps_fitted_columns_for_new_batches(self):
+        """Unseen categories are ignored and missing ones still get columns."""
+        # given
+        encoder = FeatureEncoder(CATEGORICAL_COLUMNS).fit(_make_dataset())
+        batch = pd.DataFrame({"age": [20], "color": ["purple"], "year": [2015]})
+
+        # when
+        result = encoder.transform(batch)
+
+        # then
+        assert list(result.columns) == encoder.feature_names
+        row = result.iloc[0]
+        assert not row[["color_blue", "color_green", "color_red"]].any()
+        assert row["year_2015"] and not row["year_2014"]
+
+    def test_category_encoding_uses_fitted_vocabulary(self):
+        """category encoding keeps the fitted categories; unknown values are NaN."""
+        # given
+        encoder = FeatureEncoder(CATEGORICAL_COLUMNS, "category")
+        encoder.fit(_make_dataset())
+        batch = pd.DataFrame(
+            {"age": [20, 30], "color": ["red", "pink"], "year": [1, 2014]}
+        )
+
+        # when
+        result = encoder.transform(batch)
+
+        # then
+        assert list(result["color"].cat.categories) == ["blue", "green", "red"]
+        assert result["color"].tolist()[0] == "red"
+        assert pd.isna(result["color"].iloc[1])
+
+    def test_sparse_encoding_matches_onehot(self):
+        """sparse encoding holds the onehot values as SparseDtype columns."""
+        # given
+        dataset = _make_dataset()
+        onehot = FeatureEncoder(CATEGORICAL_COLUMNS).fit_transform(dataset)
+
+        # when
+        result = FeatureEncoder(CATEGORICAL_COLUMNS, "sparse").fit_transform(dataset)
+
+        # then
+        assert all(isinstance(dtype, pd.SparseDtype) for dtype in result.dtypes)
+        assert (result.sparse.to_dense().to_numpy() == onehot.to_numpy()).all()
+
+    def test_save_and_load_roundtrip(self, tmp_path):
+        """A loaded encoder transforms batches exactly like the fitted one."""
+        # given
+        encoder = FeatureEncoder(CATEGORICAL_COLUMNS).fit(_make_dataset())
+        path = tmp_path / "out" / "encoder.json"
+
+        # when
+        encoder.save(str(path))
+        loaded = FeatureEncoder.load(str(path))
+
+        # then
+        pd.testing.assert_frame_equal(
+            loaded.transform(_make_dataset()), encoder.transform(_make_dataset())
+        )
+
+    def test_transform_before_fit_raises(self):
+        with pytest.raises(ValueError):
+            FeatureEncoder(CATEGORICAL_COLUMNS).transform(_make_dataset())
@@ -1,4 +1,5 @@
 import pandas as pd
+import pytest
 
 from data.etl import DataPreparation
 
@@ -42,6 +43,20 @@ class TestDataPreparationTransformDataset:
         assert DataPreparation.TARGET_COLUMN in result.columns
 
 
+class TestDataPreparationRequiredColumns:
+    """Tests for DataPreparation.required_columns."""
+
+    def test_required_columns_adds_etl_inputs_once(self):
+        # when
+        columns = DataPreparation.required_columns(["Age", "Gender"])
+
+        # then
+        assert columns[:2] == ["Age", "Gender"]
+        assert len(columns) == len(set(columns))
+        assert set(DataPreparation.CATEGORICAL_COLUMNS) <= set(columns)
+        assert set(DataPreparation.NUMERICAL_COLUMNS) <= set(columns)
+
+
 class TestDataPreparationTrainTestSplit:
     """Tests for DataPreparation.train_test_split."""
 
@@ -67,3 +82,57 @@ class TestDataPreparationTrainTestSplit:
         assert len(y_train) == 3
         assert len(X_test) == 1
         assert len(y_test) == 1
+
+    def test_split_rows_matches_train_test_split(self):
+        """split_rows returns the positions of the train_test_split rows."""
+        # given
+        transformed = DataPreparation.transform_dataset(
+            pd.concat([_make_raw_dataset()] * 5, ignore_index=True)
+        )
+
+        # when
+        train_rows, test_rows = DataPreparation.split_rows(
+            len(transformed), random_state=42
+        )
+        X_train, X_test, _, _ = DataPreparation.train_test_split(
+            transformed, random_state=42
+        )
+
+        # then
+        assert train_rows.tolist() == X_train.index.tolist()
+        assert test_rows.tolist() == X_test.index.tolist()
+
+
+class TestDataPreparationEncodings:
+    """Tests for the encoding modes of DataPreparation.transform_dataset."""
+
+    def test_transform_dataset_category_encoding(self):
+        """category mode keeps one column per categorical with category dtype."""
+        # when
+        result = DataPreparation.transform_dataset(_make_raw_dataset(), "category")
+
+        # then
+        for col in DataPreparation.CATEGORICAL_COLUMNS:
+            assert isinstance(result[col].dtype, pd.CategoricalDtype)
+        assert result[DataPreparation.TARGET_COLUMN].tolist() == [0, 1, 1, 0]
+
+    def test_transform_dataset_sparse_encoding_matches_onehot(self):
+        """sparse mode yields the one-hot columns with SparseDtype."""
+        # given
+        onehot = DataPreparation.transform_dataset(_make_raw_dataset(), "onehot")
+
+        # when
+        result = DataPreparation.transform_dataset(_make_raw_dataset(), "sparse")
+
+        # then
+        features = result.drop(columns=DataPreparation.TARGET_COLUMN)
+        assert all(isinstance(dtype, pd.SparseDtype) for dtype in features.dtypes)
+        assert sorted(result.columns) == sorted(onehot.columns)
+        assert (
+            features.sparse.to_dense().astype(int).to_numpy()
+            == onehot[features.columns].astype(int).to_numpy()
+        ).all()
+
+    def test_transform_dataset_unknown_encoding_raises(self):
+        with pytest.raises(ValueError):
+            DataPreparation.transform_dataset(_make_raw_dataset(), "ordinal")
@@ -0,0 +1,190 @@
+"""Unit tests for model.incremental_trainer and model.lineage."""
+
+import numpy as np
+import pytest
+from test_chunked import _make_raw_dataset
+from test_train import _make_optuna_config, _make_synthetic_data
+
+from config import Config, DataConfig, DatasetConfig, ModelConfig
+from model.incremental_trainer import IncrementalTrainer
+from model.lineage import ModelLineage, file_sha256
+from model.model_trainer import ModelTrainer
+from pipeline import load_new_partitions
+
+PARAMS = {
+    "n_estimators": 10,
+    "learning_rate": 0.1,
+    "max_depth": 3,
+    "num_leaves": 8,
+    "min_child_samples": 5,
+    "random_state": 42,
+    "verbosity": -1,
+}
+
+
+@pytest.fixture
+def saved_model_path(tmp_path) -> str:
+    """model.txt of a model trained on the "old" rows."""
+    X, y = _make_synthetic_data(n_samples=300, seed=0)
+    trainer = ModelTrainer(X, y, random_state=42)
+    trainer.fit(PARAMS)
+    model_path = tmp_path / "model.txt"
+    trainer.save(str(tmp_path / "params.json"), str(model_path))
+    return str(model_path)
+
+
+class TestIncrementalTrainer:
+    """Tests for IncrementalTrainer."""
+
+    def test_boost_continues_from_saved_model(self, saved_model_path):
+        """Boosting keeps the saved trees and adds num_boost_round new ones."""
+        # given
+        X_new, y_new = _make_synthetic_data(n_samples=200, seed=1)
+        trainer = IncrementalTrainer(X_new, y_new, saved_model_path, random_state=42)
+
+        # when
+        booster = trainer.update(PARAMS, mode="boost", num_boost_round=5)
+
+        # then
+        assert booster.num_trees() == PARAMS["n_estimators"] + 5
+        np.testing.assert_allclose(
+            booster.predict(X_new, num_iteration=PARAMS["n_estimators"]),
+            trainer.init_model.predict(X_new),
+        )
+
+    def test_refit_keeps_trees_and_changes_leaf_values(self, saved_model_path):
+        """Refitting keeps the tree structure but moves the leaf values."""
+        # given
+        X_new, y_new = _make_synthetic_data(n_samples=200, seed=1)
+        trainer = IncrementalTrainer(X_new, y_new, saved_model_path, random_state=42)
+
+        # when
+        booster = trainer.update(PARAMS, mode="refit", decay_rate=0.5)
+
+        # then
+        assert booster.num_trees() == trainer.init_model.num_trees()
+        np.testing.assert_array_equal(
+            booster.predict(X_new, pred_leaf=True),
+            trainer.init_model.predict(X_new, pred_leaf=True),
+        )
+        assert not np.allclose(
+            booster.predict(X_new), trainer.init_model.predict(X_new)
+        )
+
+    def test_unknown_mode_raises(self, saved_model_path):
+        """Only boost and refit updates are supported."""
+        X_new, y_new = _make_synthetic_data(n_samples=50, seed=1)
+        trainer = IncrementalTrainer(X_new, y_new, saved_model_path)
+
+        with pytest.raises(ValueError, match="Unknown update mode"):
+            trainer.update(PARAMS, mode="retrain")
+
+    @pytest.mark.parametrize(
+        "metric, max_metric_drop, expected",
+        [
+            ("auc", 0.0, True),
+            ("logloss", 0.0, True),
+            ("pr_auc", 0.0, True),
+            # The update must improve auc by more than it can
+            ("auc", -1.0, False),
+        ],
+    )
+    def test_gate(self, saved_model_path, metric, max_metric_drop, expected):
+        """The gate compares both models on held-out rows in the metric's direction."""
+        # given
+        X_new, y_new = _make_synthetic_data(n_samples=600, seed=1)
+        trainer = IncrementalTrainer(
+            X_new[:400], y_new[:400], saved_model_path, random_state=42
+        )
+        trainer.update(PARAMS, mode="boost", num_boost_round=20)
+
+        # when
+        accepted, baseline, candidate = trainer.gate(
+            X_new[400:], y_new[400:], metric, max_metric_drop
+        )
+
+        # then
+        assert accepted == expected
+        assert set(baseline) == set(candidate)
+        assert candidate["log_loss"] < baseline["log_loss"]
+
+
+class TestLoadNewPartitions:
+    """Tests for pipeline.load_new_partitions."""
+
+    def test_streams_only_untrained_partitions(self, tmp_path):
+        # given
+        raw = _make_raw_dataset(n_samples=1_000, n_groups=4)
+        path = tmp_path / "dataset.csv"
+        raw.to_csv(path, index=False)
+        config = Config(
+            random_state=42,
+            data=DataConfig(
+                url="",
+                dataset_file_path=str(path),
+                dataset_name="",
+                columns=list(raw.columns),
+            ),
+            dataset=DatasetConfig(test_size=0.2, chunk_size=150),
+            optuna=_make_optuna_config(),
+            model=ModelConfig(output_path="", output_params_path="", metrics_path=""),
+        )
+        trained = {"CalYear0", "CalYear1"}
+
+        # when
+        new_rows = load_new_partitions(config, trained)
+
+        # then
+        expected = raw[~raw["CalYear"].isin(trained)]
+        assert len(new_rows) == len(expected)
+        assert set(new_rows["CalYear"].astype(str)) == {"CalYear2", "CalYear3"}
+        assert new_rows["CalYear"].dtype == "category"
+        np.testing.assert_array_equal(new_rows["Age"], expected["Age"])
+
+
+class TestModelLineage:
+    """Tests for ModelLineage."""
+
+    def test_chain_since_last_full_training(self, tmp_path):
+        """Only accepted updates after the last full training count."""
+        # given
+        path = str(tmp_path / "out" / "lineage.json")
+        lineage = ModelLineage(path)
+        lineage.record("full", partitions=["2008"], model_sha256="a")
+        lineage.record(
+            "incremental", partitions=["2009"], accepted=True, model_sha256="b"
+        )
+        lineage.record("full", partitions=["2009", "2010"], model_sha256="c")
+        lineage.record(
+            "incremental", partitions=["2011"], accepted=True, model_sha256="d"
+        )
+        lineage.record(
+            "incremental", partitions=["2012"], accepted=False, model_sha256=None
+        )
+
+        # when
+        reloaded = ModelLineage(path)
+
+        # then
+        assert len(reloaded.entries) == 5
+        assert reloaded.trained_partitions() == {"2009", "2010", "2011"}
+        assert reloaded.updates_since_full() == 1
+        assert reloaded.current_model_sha256() == "d"
+
+    def test_empty_lineage(self, tmp_path):
+        """Without a recorded full training there is no current model."""
+        lineage = ModelLineage(str(tmp_path / "lineage.json"))
+
+        assert lineage.current_model_sha256() is None
+        assert lineage.trained_partitions() == set()
+        assert lineage.updates_since_full() == 0
+
+    def test_file_sha256(self, tmp_path):
+        """The digest changes with the file content."""
+        path = tmp_path / "model.txt"
+        path.write_text("tree")
+        first = file_sha256(str(path))
+        path.write_text("tree 2")
+
+        assert first != file_sha256(str(path))
+        assert len(first) == 64
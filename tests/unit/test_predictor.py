@@ -0,0 +1,107 @@
+"""Unit tests for model.predictor."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from test_train import _make_optuna_config
+
+from data.encoder import FeatureEncoder
+from data.formats import resolve_format, write_dataset
+from model.compiled import CompiledModel
+from model.model_trainer import ModelTrainer
+from model.predictor import BatchPredictor
+
+
+def _make_raw_dataset(n_samples: int = 300, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(
+        {
+            "PolNum": np.arange(n_samples),
+            "Age": rng.integers(18, 80, n_samples),
+            "Gender": rng.choice(["Male", "Female"], n_samples),
+        }
+    )
+    y = pd.Series(((X["Gender"] == "Male") & (X["Age"] > 40)).astype(int))
+    return X, y
+
+
+@pytest.fixture
+def saved_model(tmp_path):
+    X, y = _make_raw_dataset()
+    encoder = FeatureEncoder(["Gender"]).fit(X)
+    trainer = ModelTrainer(encoder.transform(X), y, random_state=42)
+    trainer.run_optimization(test_size=0.2, config=_make_optuna_config())
+    model_path, encoder_path = tmp_path / "model.txt", tmp_path / "encoder.json"
+    trainer.save(str(tmp_path / "params.json"), str(model_path))
+    encoder.save(str(encoder_path))
+    return trainer, encoder, str(model_path), str(encoder_path)
+
+
+class TestBatchPredictor:
+    """Tests for BatchPredictor."""
+
+    def test_predict_proba_matches_trained_model(self, saved_model):
+        """A loaded predictor scores raw rows like the in-memory model."""
+        # given
+        trainer, encoder, model_path, encoder_path = saved_model
+        X, _ = _make_raw_dataset(n_samples=50, seed=1)
+
+        # when
+        probability = BatchPredictor.load(model_path, encoder_path).predict_proba(X)
+
+        # then
+        expected = trainer.best_model.predict_proba(encoder.transform(X))[:, 1]
+        np.testing.assert_allclose(probability, expected)
+
+    def test_compiled_model_scores_like_booster(self, saved_model, tmp_path):
+        """Loading model.npz instead of model.txt gives the same probabilities."""
+        # given
+        trainer, _, model_path, encoder_path = saved_model
+        compiled_path = str(tmp_path / "model.npz")
+        CompiledModel.from_booster(trainer.booster).save(compiled_path)
+        X, _ = _make_raw_dataset(n_samples=50, seed=1)
+
+        # when
+        predictor = BatchPredictor.load(model_path, encoder_path, compiled_path)
+
+        # then
+        assert isinstance(predictor.booster, CompiledModel)
+        np.testing.assert_allclose(
+            predictor.predict_proba(X),
+            BatchPredictor.load(model_path, encoder_path).predict_proba(X),
+            rtol=1e-12,
+        )
+
+    @pytest.mark.parametrize(
+        "file_name", ["input.csv", "input.parquet", "input.feather"]
+    )
+    def test_predict_file_streams_chunks_in_order(
+        self, saved_model, tmp_path, file_name
+    ):
+        """predict_file writes one prediction per input row, in input order."""
+        # given
+        _, _, model_path, encoder_path = saved_model
+        X, _ = _make_raw_dataset(n_samples=1000, seed=2)
+        X["Numtppd"] = 0
+        input_path = tmp_path / file_name
+        write_dataset(X, str(input_path), resolve_format(str(input_path)))
+        output_path = tmp_path / "out" / "predictions.csv"
+        predictor = BatchPredictor.load(model_path, encoder_path)
+
+        # when
+        stats = predictor.predict_file(
+            str(input_path),
+            str(output_path),
+            chunk_size=64,
+            n_threads=3,
+            id_column="PolNum",
+        )
+
+        # then
+        result = pd.read_csv(output_path)
+        assert stats["rows"] == 1000
+        assert list(result.columns) == ["PolNum", "probability", "prediction"]
+        assert result["PolNum"].tolist() == X["PolNum"].tolist()
+        np.testing.assert_allclose(
+            result["probability"], predictor.predict_proba(X), rtol=1e-6
+        )
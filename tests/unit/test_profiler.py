@@ -0,0 +1,99 @@
+"""Unit tests for utils.profiler."""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from utils.profiler import Measurement, PipelineProfiler, measure
+
+
+class TestMeasure:
+    """Tests for measure."""
+
+    def test_nested_measurements_record_parent_and_times(self):
+        """Inner blocks name their parent and never exceed the outer time or peak."""
+        # given
+        outer, inner = Measurement("outer"), Measurement("inner")
+
+        # when
+        with measure(outer):
+            with measure(inner):
+                sum(range(100_000))
+
+        # then
+        assert inner.parent == "outer"
+        assert outer.parent is None
+        assert 0 < inner.wall_seconds <= outer.wall_seconds
+        assert inner.cpu_seconds > 0
+        assert 0 < inner.peak_rss_mb <= outer.peak_rss_mb
+
+    @pytest.mark.skipif(
+        not os.path.exists("/proc/self/clear_refs"), reason="needs Linux procfs"
+    )
+    def test_peak_rss_is_reset_per_block(self):
+        """A large allocation raises only the peak of the block that made it."""
+        # given
+        small, large = Measurement("small"), Measurement("large")
+
+        # when
+        with measure(large):
+            array = np.ones(50 * 1024**2, dtype=np.uint8)
+            del array
+        with measure(small):
+            pass
+
+        # then
+        assert large.peak_rss_mb - small.peak_rss_mb > 40
+
+    def test_set_shape(self):
+        """Shape is taken from 2-D and 1-D data."""
+        record = Measurement("stage")
+
+        record.set_shape(np.zeros((3, 2)))
+        assert (record.rows, record.columns) == (3, 2)
+
+        record.set_shape(np.zeros(5))
+        assert (record.rows, record.columns) == (5, 1)
+
+
+class TestPipelineProfiler:
+    """Tests for PipelineProfiler."""
+
+    @pytest.mark.parametrize("mode", [None, "cprofile", "tracemalloc"])
+    def test_write_report(self, tmp_path, mode):
+        """The report lists stages and trials, plus the deep profile of the mode."""
+        # given
+        profiler = PipelineProfiler(mode)
+        report_path = tmp_path / "profile.json"
+
+        # when
+        with profiler.run():
+            with profiler.stage("load") as stage:
+                stage.set_shape(np.zeros((10, 4)))
+                data = [0] * 100_000
+            with profiler.stage("fit"):
+                del data
+        profiler.write_report(str(report_path), [{"number": 0, "value": 0.9}])
+
+        # then
+        report = json.loads(report_path.read_text())
+        assert [stage["name"] for stage in report["stages"]] == ["load", "fit"]
+        assert report["stages"][0]["rows"] == 10
+        assert report["stages"][0]["parent"] == "pipeline"
+        assert report["total"]["wall_seconds"] >= report["stages"][0]["wall_seconds"]
+        assert report["trials"] == [{"number": 0, "value": 0.9}]
+        assert ("cprofile" in report) == (mode == "cprofile")
+        assert ("tracemalloc" in report) == (mode == "tracemalloc")
+        if mode == "cprofile":
+            assert os.path.exists(report["cprofile"]["stats_path"])
+            assert report["cprofile"]["top_cumulative"]
+        if mode == "tracemalloc":
+            assert report["stages"][0]["traced_peak_mb"] > 0
+            assert report["tracemalloc"]["top_allocations"]
+
+    def test_unknown_mode_raises(self):
+        """Only the known deep profiling modes are accepted."""
+        with pytest.raises(ValueError, match="Unknown profiling mode"):
+            PipelineProfiler("perf")
@@ -0,0 +1,118 @@
+"""Unit tests for utils.resources."""
+
+import os
+
+import pytest
+from test_train import _make_optuna_config, _make_synthetic_data
+from threadpoolctl import threadpool_info, threadpool_limits
+
+from config import ResourcesConfig
+from model.model_trainer import ModelTrainer
+from utils.resources import (
+    DETERMINISTIC_PARAMS,
+    THREAD_LIMIT_VARS,
+    ResourceBudget,
+    configure_resources,
+)
+
+PARAMS = {
+    "n_estimators": 20,
+    "learning_rate": 0.1,
+    "num_leaves": 8,
+    "subsample": 0.8,
+    "subsample_freq": 1,
+    "colsample_bytree": 0.8,
+    "random_state": 42,
+    "verbosity": -1,
+}
+
+
+@pytest.fixture
+def restore_thread_limits(monkeypatch):
+    """Undo the process-wide limits a test applies."""
+    for name in THREAD_LIMIT_VARS:
+        monkeypatch.setenv(name, os.environ.get(name, ""))
+    limits = {info["prefix"]: info["num_threads"] for info in threadpool_info()}
+    yield
+    threadpool_limits(limits=limits)
+
+
+class TestResourceBudget:
+    """Tests for ResourceBudget."""
+
+    def test_from_config_defaults_to_all_cores(self):
+        """Without num_threads the budget is every core."""
+        budget = ResourceBudget.from_config(ResourcesConfig())
+
+        assert budget == ResourceBudget(os.cpu_count() or 1, deterministic=False)
+
+    @pytest.mark.parametrize(
+        "num_threads, n_workers, expected", [(8, 2, 4), (8, 3, 2), (2, 4, 1)]
+    )
+    def test_split_between_workers(self, num_threads, n_workers, expected):
+        """Workers share the budget; each keeps at least one thread."""
+        budget = ResourceBudget(num_threads, deterministic=True)
+
+        assert budget.split(n_workers) == ResourceBudget(expected, deterministic=True)
+
+    def test_lgb_params(self):
+        """Deterministic mode adds LightGBM's reproducibility params."""
+        assert ResourceBudget(4).lgb_params() == {"n_jobs": 4}
+        assert ResourceBudget(4, deterministic=True).lgb_params(2) == {
+            "n_jobs": 2,
+            **DETERMINISTIC_PARAMS,
+        }
+
+    @pytest.mark.usefixtures("restore_thread_limits")
+    def test_configure_resources_limits_thread_pools(self):
+        """Environment variables and loaded OpenMP/BLAS pools get the limit."""
+        # when
+        budget = configure_resources(ResourcesConfig(num_threads=1))
+
+        # then
+        assert budget.num_threads == 1
+        assert all(os.environ[name] == "1" for name in THREAD_LIMIT_VARS)
+        assert all(info["num_threads"] == 1 for info in threadpool_info())
+
+
+class TestDeterministicTraining:
+    """Trainers take their threads and determinism from the budget."""
+
+    def test_deterministic_fit_is_reproducible(self):
+        """Two deterministic fits on several threads give the same trees."""
+        # given
+        X, y = _make_synthetic_data(n_samples=2_000, n_features=8)
+        budget = ResourceBudget(2, deterministic=True)
+
+        # when
+        models = [
+            ModelTrainer(X, y, resources=budget).fit(PARAMS).booster_.model_to_string()
+            for _ in range(2)
+        ]
+
+        # then
+        assert models[0] == models[1]
+        trainer = ModelTrainer(X, y, resources=budget)
+        trainer.fit(PARAMS)
+        params = trainer.booster.params
+        assert params["deterministic"] and params["force_row_wise"]
+        assert params["num_threads"] == 2
+        assert trainer.best_params == PARAMS
+
+    @pytest.mark.parametrize(
+        "n_workers, threads_per_worker, expected", [(1, None, 6), (1, 2, 2)]
+    )
+    def test_search_uses_budget_threads(self, n_workers, threads_per_worker, expected):
+        """Trials use the budget's share of each worker unless set explicitly."""
+        # given
+        X, y = _make_synthetic_data()
+        config = _make_optuna_config(n_trials=1)
+        config.n_workers = n_workers
+        config.threads_per_worker = threads_per_worker
+        trainer = ModelTrainer(X, y, resources=ResourceBudget(6))
+
+        # when
+        trainer.optimize(test_size=0.2, config=config)
+
+        # then
+        assert trainer.num_threads == expected
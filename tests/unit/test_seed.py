@@ -2,6 +2,8 @@
 
 import os
 import random
+import subprocess
+import sys
 
 import numpy as np
 
@@ -38,3 +40,32 @@ class TestSetSeed:
 
         # then
         assert os.environ.get("PYTHONHASHSEED") == "7"
+
+    def test_set_seed_fixes_str_hashes_of_child_processes(self, monkeypatch):
+        """Processes started after set_seed hash strings the same way."""
+        # given
+        monkeypatch.delenv("PYTHONHASHSEED", raising=False)
+        set_seed(7)
+
+        # when
+        hashes = {
+            subprocess.run(
+                [sys.executable, "-c", "print(hash('pg15'))"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            for _ in range(2)
+        }
+
+        # then
+        assert len(hashes) == 1
+
+    def test_set_seed_warns_about_unseeded_process(self, monkeypatch, caplog):
+        """The running interpreter's str hashing cannot be seeded afterwards."""
+        monkeypatch.delenv("PYTHONHASHSEED", raising=False)
+
+        set_seed(7)
+
+        if sys.flags.hash_randomization:
+            assert "PYTHONHASHSEED=7" in caplog.text
@@ -0,0 +1,180 @@
+"""Unit tests for serving.batcher and serving.server."""
+
+import asyncio
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.encoder import FeatureEncoder
+from serving.batcher import MicroBatcher
+from serving.server import ScoringServer
+
+
+class _RecordingModel:
+    """Scores each row as its `x` value and records batch sizes."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def __call__(self, batch):
+        self.batch_sizes.append(len(batch))
+        return batch["x"].to_numpy(dtype=np.float64)
+
+
+class TestMicroBatcher:
+    """Tests for MicroBatcher."""
+
+    def test_concurrent_requests_are_coalesced(self):
+        """Concurrent requests share one predict call and get their own scores."""
+        # given
+        model = _RecordingModel()
+        batcher = MicroBatcher(model, max_batch_size=100, max_wait_ms=50)
+
+        async def run():
+            await batcher.start()
+            try:
+                return await asyncio.gather(
+                    *(batcher.predict([{"x": i}, {"x": i + 0.5}]) for i in range(10))
+                )
+            finally:
+                await batcher.stop()
+
+        # when
+        results = asyncio.run(run())
+
+        # then
+        assert results == [[i, i + 0.5] for i in range(10)]
+        assert model.batch_sizes == [20]
+
+    def test_batches_are_capped_at_max_batch_size(self):
+        """No predict call receives more rows than max_batch_size."""
+        # given
+        model = _RecordingModel()
+        batcher = MicroBatcher(model, max_batch_size=4, max_wait_ms=50)
+
+        async def run():
+            await batcher.start()
+            try:
+                await asyncio.gather(*(batcher.predict([{"x": i}]) for i in range(10)))
+            finally:
+                await batcher.stop()
+
+        # when
+        asyncio.run(run())
+
+        # then
+        assert sum(model.batch_sizes) == 10
+        assert max(model.batch_sizes) <= 4
+
+    def test_failing_request_does_not_fail_its_batch(self):
+        """A batch that fails is rescored per request; only the bad one errors."""
+        # given
+        model = _RecordingModel()
+        batcher = MicroBatcher(model, max_batch_size=100, max_wait_ms=50)
+
+        async def run():
+            await batcher.start()
+            try:
+                return await asyncio.gather(
+                    batcher.predict([{"x": 1}]),
+                    batcher.predict([{"x": "thirty"}]),
+                    batcher.predict([{"x": 2}, {"x": 3}]),
+                    return_exceptions=True,
+                )
+            finally:
+                await batcher.stop()
+
+        # when
+        first, bad, last = asyncio.run(run())
+
+        # then
+        assert first == [1.0]
+        assert isinstance(bad, ValueError)
+        assert last == [2.0, 3.0]
+        assert model.batch_sizes == [4, 1, 1, 2]
+
+
+async def _request(port: int, method: str, path: str, payload=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n"
+        f"Connection: close\r\n\r\n".encode()
+        + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, content = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(content)
+
+
+class TestScoringServer:
+    """Tests for ScoringServer over a local socket."""
+
+    def test_predict_and_health_endpoints(self):
+        # given
+        server = ScoringServer(MicroBatcher(_RecordingModel(), max_wait_ms=1), port=0)
+
+        async def run():
+            await server.start()
+            try:
+                return await asyncio.gather(
+                    _request(server.port, "GET", "/health"),
+                    _request(server.port, "POST", "/predict", {"x": 3}),
+                    _request(server.port, "POST", "/predict", [{"x": 1}, {"x": 2}]),
+                    _request(server.port, "POST", "/predict", []),
+                    _request(server.port, "GET", "/missing"),
+                )
+            finally:
+                await server.stop()
+
+        # when
+        health, single, many, empty, missing = asyncio.run(run())
+
+        # then
+        assert health == (200, {"status": "ok"})
+        assert single == (200, {"probabilities": [3.0]})
+        assert many == (200, {"probabilities": [1.0, 2.0]})
+        assert empty[0] == 400
+        assert missing[0] == 404
+
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            [{"x": 1, "g": "a"}, {"x": "thirty", "g": "a"}],
+            {"g": "a"},
+            {"x": None, "g": "a"},
+            {"x": True, "g": "a"},
+            [{"x": 1, "g": "a"}, 5],
+        ],
+    )
+    def test_invalid_rows_are_rejected(self, payload):
+        """Rows missing encoder inputs or with non-numeric features get 400."""
+        # given
+        model = _RecordingModel()
+        encoder = FeatureEncoder(["g"]).fit(pd.DataFrame({"x": [1.0], "g": ["a"]}))
+        server = ScoringServer(
+            MicroBatcher(model, max_wait_ms=1), port=0, encoder=encoder
+        )
+
+        async def run():
+            await server.start()
+            try:
+                return await asyncio.gather(
+                    _request(server.port, "POST", "/predict", payload),
+                    _request(server.port, "POST", "/predict", {"x": 2, "g": "z"}),
+                )
+            finally:
+                await server.stop()
+
+        # when
+        invalid, valid = asyncio.run(run())
+
+        # then
+        assert invalid[0] == 400
+        assert invalid[1]["error"].startswith("Invalid row")
+        assert valid == (200, {"probabilities": [2.0]})
+        assert model.batch_sizes == [1]
@@ -0,0 +1,129 @@
+"""Unit tests for utils.stage_cache."""
+
+import os
+from dataclasses import replace
+
+import optuna
+import pandas as pd
+from test_chunked import _make_raw_dataset
+from test_train import _make_optuna_config
+
+import pipeline
+from config import CacheConfig, Config, DataConfig, DatasetConfig, ModelConfig
+from model.model_trainer import _journal_storage
+from utils.stage_cache import StageCache
+
+
+class TestStageCache:
+    """Tests for StageCache."""
+
+    def test_key_depends_on_stage_and_inputs(self):
+        """Keys are stable for equal inputs and change with any input."""
+        key = StageCache.key("split", "parent", DatasetConfig(test_size=0.2))
+
+        assert key == StageCache.key("split", "parent", DatasetConfig(test_size=0.2))
+        assert key != StageCache.key("split", "parent", DatasetConfig(test_size=0.3))
+        assert key != StageCache.key("split", "other", DatasetConfig(test_size=0.2))
+        assert key != StageCache.key("fit", "parent", DatasetConfig(test_size=0.2))
+
+    def test_cached_computes_once(self, tmp_path):
+        """A second lookup with the same key returns the stored value."""
+        # given
+        cache = StageCache(str(tmp_path))
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return pd.DataFrame({"a": [1, 2]})
+
+        # when
+        first = cache.cached("load-1", compute)
+        second = StageCache(str(tmp_path)).cached("load-1", compute)
+
+        # then
+        assert len(calls) == 1
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_disabled_cache_always_computes(self):
+        cache = StageCache(None)
+        values = iter([1, 2])
+
+        assert cache.cached("k", lambda: next(values)) == 1
+        assert cache.cached("k", lambda: next(values)) == 2
+
+    def test_evicts_least_recently_used_over_size_cap(self, tmp_path):
+        """Entries beyond max_size_bytes are evicted oldest access first."""
+        # given
+        payload = b"x" * 1000
+        cache = StageCache(str(tmp_path), max_size_bytes=2500)
+        cache.cached("a", lambda: payload)
+        cache.cached("b", lambda: payload)
+        os.utime(tmp_path / "a.pkl", ns=(1, 1))
+        os.utime(tmp_path / "b.pkl", ns=(2, 2))
+        cache.cached("a", lambda: payload)  # hit refreshes "a"
+
+        # when
+        cache.cached("c", lambda: payload)
+
+        # then
+        assert sorted(p.stem for p in tmp_path.glob("*.pkl")) == ["a", "c"]
+
+    def test_file_fingerprint_changes_with_content(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_text("a\n1\n")
+        before = StageCache.file_fingerprint(str(path))
+
+        path.write_text("a\n1\n2\n")
+
+        assert StageCache.file_fingerprint(str(path)) != before
+
+
+class TestPipelineStageCache:
+    """Tests for the stage cache in pipeline.ml_pipeline."""
+
+    def test_extended_study_grows_on_every_run(self, tmp_path, monkeypatch):
+        """A cached search must not hide the trials `extend_study` adds."""
+        # given
+        raw = _make_raw_dataset(n_samples=500)
+        dataset_path = tmp_path / "dataset.csv"
+        raw.to_csv(dataset_path, index=False)
+        storage_path = tmp_path / "study.log"
+        config = Config(
+            random_state=42,
+            data=DataConfig(
+                url="",
+                dataset_file_path=str(dataset_path),
+                dataset_name="",
+                columns=list(raw.columns),
+            ),
+            dataset=DatasetConfig(test_size=0.2),
+            optuna=replace(
+                _make_optuna_config(n_trials=2),
+                storage_path=str(storage_path),
+                extend_study=True,
+            ),
+            model=ModelConfig(
+                output_path=str(tmp_path / "model.txt"),
+                output_params_path=str(tmp_path / "params.json"),
+                metrics_path=str(tmp_path / "metrics.json"),
+                encoder_path=str(tmp_path / "encoder.json"),
+                compiled_path=str(tmp_path / "model.npz"),
+                lineage_path=str(tmp_path / "lineage.jsonl"),
+            ),
+            cache=CacheConfig(dir=str(tmp_path / "cache")),
+        )
+        monkeypatch.setattr(pipeline, "download_dataset", lambda config: None)
+
+        def n_trials() -> int:
+            storage = _journal_storage(str(storage_path))
+            (summary,) = optuna.get_all_study_summaries(storage)
+            return summary.n_trials
+
+        # when
+        pipeline.ml_pipeline(config)
+        first = n_trials()
+        pipeline.ml_pipeline(config)
+
+        # then
+        assert first == 2
+        assert n_trials() == 4
@@ -2,7 +2,19 @@
 
 import json
 
+import numpy as np
 import pandas as pd
+import pytest
+from sklearn.metrics import (
+    accuracy_score,
+    average_precision_score,
+    f1_score,
+    log_loss,
+    precision_recall_curve,
+    precision_score,
+    recall_score,
+    roc_auc_score,
+)
 
 from utils.statistics import ModelStatistics
 
@@ -44,3 +56,101 @@ class TestModelStatistics:
         assert "precision" in data
         assert "recall" in data
         assert "f1" in data
+
+    def test_calculate_metrics_match_sklearn(self):
+        """Confusion-matrix metrics equal sklearn's scorers."""
+        # given
+        rng = np.random.default_rng(0)
+        y_test = pd.Series(rng.integers(0, 2, 1_000))
+        y_pred = rng.integers(0, 2, 1_000)
+
+        # when
+        metrics = ModelStatistics.calculate_metrics(y_test, y_pred)
+
+        # then
+        assert metrics["accuracy"] == pytest.approx(accuracy_score(y_test, y_pred))
+        assert metrics["precision"] == pytest.approx(precision_score(y_test, y_pred))
+        assert metrics["recall"] == pytest.approx(recall_score(y_test, y_pred))
+        assert metrics["f1"] == pytest.approx(f1_score(y_test, y_pred))
+
+    def test_calculate_metrics_without_predicted_positives(self):
+        """Precision and F1 are 0.0 when nothing is predicted positive."""
+        metrics = ModelStatistics.calculate_metrics(
+            pd.Series([1, 0, 0]), np.zeros(3, dtype=int)
+        )
+
+        assert metrics["precision"] == 0.0
+        assert metrics["f1"] == 0.0
+        assert metrics["accuracy"] == pytest.approx(2 / 3)
+
+    def test_probability_metrics_match_sklearn(self):
+        """ROC-AUC, log-loss and PR-AUC equal sklearn's, also with tied scores."""
+        # given
+        rng = np.random.default_rng(1)
+        y_test = pd.Series(rng.integers(0, 2, 2_000))
+        # Rounded scores create many ties
+        y_proba = np.round(np.clip(0.3 * y_test + rng.uniform(0, 0.7, 2_000), 0, 1), 2)
+
+        # when
+        metrics = ModelStatistics.calculate_metrics(
+            y_test, (y_proba > 0.5).astype(int), y_proba=y_proba
+        )
+
+        # then
+        assert metrics["roc_auc"] == pytest.approx(roc_auc_score(y_test, y_proba))
+        assert metrics["log_loss"] == pytest.approx(log_loss(y_test, y_proba))
+        assert metrics["pr_auc"] == pytest.approx(
+            average_precision_score(y_test, y_proba)
+        )
+
+    def test_threshold_curve_matches_precision_recall_curve(self):
+        """Every distinct threshold gets sklearn's precision and recall."""
+        # given
+        rng = np.random.default_rng(2)
+        y_test = rng.integers(0, 2, 500)
+        y_proba = np.round(rng.uniform(0, 1, 500), 2)
+
+        # when
+        curve = ModelStatistics.threshold_curve(y_test, y_proba)
+
+        # then
+        precision, recall, thresholds = precision_recall_curve(y_test, y_proba)
+        expected = pd.DataFrame(
+            {"precision": precision[:-1], "recall": recall[:-1]}, index=thresholds
+        ).sort_index(ascending=False)
+        np.testing.assert_allclose(curve["threshold"], expected.index)
+        np.testing.assert_allclose(curve["precision"], expected["precision"])
+        np.testing.assert_allclose(curve["recall"], expected["recall"])
+        best = curve["f1"].idxmax()
+        assert curve["f1"][best] == pytest.approx(
+            f1_score(y_test, y_proba >= curve["threshold"][best])
+        )
+
+    def test_threshold_curve_empty_input_raises(self):
+        """No predictions give a clear error instead of an IndexError."""
+        with pytest.raises(ValueError, match="no predictions"):
+            ModelStatistics.threshold_curve(np.array([], dtype=int), np.array([]))
+
+        with pytest.raises(ValueError, match="no predictions"):
+            ModelStatistics.calculate_metrics(
+                pd.Series([], dtype=int), np.array([], dtype=int), y_proba=[]
+            )
+
+    def test_single_class_metrics_save_undefined_as_null(self, tmp_path):
+        """ROC-AUC of one class is undefined and saved as null, not NaN."""
+        # given
+        output_file = tmp_path / "metrics.json"
+        y_test = pd.Series([0, 0, 0])
+
+        # when
+        metrics = ModelStatistics.calculate_metrics(
+            y_test, np.zeros(3, dtype=int), str(output_file), np.array([0.1, 0.2, 0.3])
+        )
+
+        # then
+        assert np.isnan(metrics["roc_auc"])
+        text = output_file.read_text()
+        assert "NaN" not in text
+        data = json.loads(text)
+        assert data["roc_auc"] is None
+        assert data["accuracy"] == 1.0
@@ -0,0 +1,116 @@
+"""Unit tests for sweep and data.shared."""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+from test_chunked import _make_raw_dataset
+
+from data.encoder import FeatureEncoder
+from data.etl import DataPreparation
+from data.shared import load_shared, save_shared
+from sweep import expand_config_paths, run_sweep
+
+BASE_CONFIG_PATH = Path(__file__).parents[2] / "config" / "base.yaml"
+
+
+def _write_sweep_configs(tmp_path, variants: list[dict]) -> list[str]:
+    """Small-search copies of base.yaml on a local dataset, one per variant."""
+    dataset_path = tmp_path / "dataset.csv"
+    _make_raw_dataset(n_samples=1_000).to_csv(dataset_path, index=False)
+    base = yaml.safe_load(BASE_CONFIG_PATH.read_text())
+    base["data"].update(dataset_file_path=str(dataset_path), columns=["Age"])
+    base["optuna"].update(n_trials=2, storage_path=None, pruner=None)
+    base["optuna"]["n_estimators"] = {"min": 5, "max": 10}
+
+    paths = []
+    for i, variant in enumerate(variants):
+        config = {**base, "random_state": variant.get("random_state", 42)}
+        config["dataset"] = {**base["dataset"], **variant.get("dataset", {})}
+        config["resources"] = {**base["resources"], **variant.get("resources", {})}
+        path = tmp_path / f"config_{i}.yaml"
+        path.write_text(yaml.safe_dump(config))
+        paths.append(str(path))
+    return paths
+
+
+class TestSharedDataset:
+    """Tests for data.shared."""
+
+    @pytest.mark.parametrize("encoding", FeatureEncoder.ENCODINGS)
+    def test_round_trip(self, tmp_path, encoding):
+        """Loaded frames equal the saved ones; dense columns stay memory-mapped."""
+        # given
+        dataset = DataPreparation.build_target(_make_raw_dataset(n_samples=200))
+        y = dataset.pop(DataPreparation.TARGET_COLUMN)
+        X = DataPreparation.create_encoder(encoding).fit_transform(dataset)
+
+        # when
+        save_shared(X, y, str(tmp_path / "shared"))
+        X_shared, y_shared = load_shared(str(tmp_path / "shared"))
+
+        # then
+        pd.testing.assert_frame_equal(X_shared.copy(), X)
+        np.testing.assert_array_equal(y_shared, y)
+        assert y_shared.name == y.name
+        if encoding == "onehot":
+            # A read-only view of the mapped file, not a copy
+            assert not X_shared["Age"].to_numpy().flags.writeable
+
+
+class TestSweep:
+    """Tests for sweep."""
+
+    def test_run_sweep_writes_one_row_per_config(self, tmp_path, monkeypatch):
+        """Configs run on a process pool; each gets its own split and metrics."""
+        # given
+        prepared = []
+        monkeypatch.setattr("sweep.download_dataset", lambda config: None)
+        monkeypatch.setattr(
+            "sweep.save_shared",
+            lambda X, y, directory: (
+                prepared.append(directory) or save_shared(X, y, directory)
+            ),
+        )
+        config_paths = _write_sweep_configs(
+            tmp_path,
+            [
+                {"random_state": 1, "resources": {"num_threads": 4}},
+                {"random_state": 2, "dataset": {"test_size": 0.3}},
+                {"dataset": {"encoding": "category"}},
+            ],
+        )
+        output_path = tmp_path / "out" / "sweep.csv"
+
+        # when
+        results = run_sweep(config_paths, str(output_path), n_workers=2)
+
+        # then
+        assert len(prepared) == 2  # one shared dataset per encoding
+        table = pd.read_csv(output_path)
+        assert table["config"].tolist() == config_paths
+        assert "error" not in table
+        assert table["random_state"].tolist() == [1, 2, 42]
+        assert table["test_size"].tolist() == [0.2, 0.3, 0.2]
+        # The threads budget of a config is shared by the workers
+        assert table["num_threads"].iloc[0] == 2
+        assert table["test_roc_auc"].between(0, 1).all()
+        # Cut to the early-stopped iteration, so possibly below the minimum
+        assert table["param_n_estimators"].between(1, 10).all()
+        assert (table["n_trials"] == 2).all()
+        pd.testing.assert_frame_equal(table, results, check_dtype=False)
+
+    def test_expand_config_paths(self, tmp_path):
+        """Globs expand in sorted order, duplicates are dropped, misses raise."""
+        for name in ("b.yaml", "a.yaml"):
+            (tmp_path / name).write_text("")
+
+        paths = expand_config_paths(
+            [str(tmp_path / "*.yaml"), str(tmp_path / "a.yaml")]
+        )
+
+        assert paths == [str(tmp_path / "a.yaml"), str(tmp_path / "b.yaml")]
+        with pytest.raises(FileNotFoundError, match="No config file matches"):
+            expand_config_paths([str(tmp_path / "missing-*.yaml")])
@@ -1,10 +1,13 @@
 import json
+import warnings
 
 import numpy as np
+import optuna
 import pandas as pd
+import pytest
 
 from config import FloatRange, IntRange, OptunaConfig
-from model.model_trainer import ModelTrainer
+from model.model_trainer import ModelTrainer, _create_pruner, _journal_storage
 
 
 def _make_optuna_config(n_trials: int = 2) -> OptunaConfig:
@@ -56,6 +59,44 @@ class TestModelTrainer:
         assert preds.shape[0] == 10
         assert set(preds).issubset({0, 1})
 
+    @pytest.mark.parametrize("cv_folds", [None, 3])
+    def test_rows_train_like_the_gathered_rows(self, cv_folds):
+        """A trainer on `rows` of a frame matches one on a copy of those rows."""
+        # given
+        X, y = _make_synthetic_data(n_samples=300, n_features=4)
+        rows = np.random.default_rng(0).permutation(len(y))[:200]
+        config = _make_optuna_config(n_trials=2)
+        config.cv_folds = cv_folds
+        on_rows = ModelTrainer(X, y, random_state=42, rows=rows)
+        on_copy = ModelTrainer(X.iloc[rows], y.iloc[rows], random_state=42)
+
+        # when
+        _, params = on_rows.run_optimization(test_size=0.2, config=config)
+        _, expected = on_copy.run_optimization(test_size=0.2, config=config)
+
+        # then
+        assert params == expected
+        np.testing.assert_array_equal(
+            on_rows.predict_proba(X), on_copy.predict_proba(X)
+        )
+
+    def test_optimize_records_trial_profiles(self):
+        """Every trial run by optimize has its time and peak RSS recorded."""
+        # given
+        X, y = _make_synthetic_data()
+        trainer = ModelTrainer(X, y, random_state=42)
+
+        # when
+        trainer.optimize(test_size=0.2, config=_make_optuna_config(n_trials=3))
+
+        # then
+        assert [profile["number"] for profile in trainer.trial_profiles] == [0, 1, 2]
+        for profile in trainer.trial_profiles:
+            assert profile["state"] == "COMPLETE"
+            assert profile["wall_seconds"] > 0
+            assert profile["peak_rss_mb"] > 0
+            assert profile["rows"] == 160
+
     def test_save_writes_params_and_model_to_disk(self, tmp_path):
         """save() writes params JSON and model file to given paths."""
 
@@ -79,3 +120,336 @@ class TestModelTrainer:
 
         assert model_path.exists()
         assert model_path.stat().st_size > 0
+
+    def test_run_optimization_splits_and_bins_once_per_study(self, monkeypatch):
+        """The validation split is built once and shared by all trials."""
+        # given
+        import model.model_trainer as model_trainer
+
+        calls = []
+        original_split = model_trainer.train_test_split
+
+        def counting_split(*args, **kwargs):
+            calls.append(1)
+            return original_split(*args, **kwargs)
+
+        monkeypatch.setattr(model_trainer, "train_test_split", counting_split)
+        X, y = _make_synthetic_data(n_samples=150, n_features=4)
+        trainer = ModelTrainer(X, y, random_state=42)
+
+        # when
+        trainer.run_optimization(test_size=0.2, config=_make_optuna_config(n_trials=3))
+
+        # then
+        assert len(calls) == 1
+        assert trainer._train_set is None
+        assert trainer._X_val is None
+
+    def test_run_optimization_parallel_workers_share_study_storage(self, tmp_path):
+        """Worker processes run all trials against a shared journal file."""
+        # given
+        X, y = _make_synthetic_data(n_samples=150, n_features=4)
+        config = _make_optuna_config(n_trials=4)
+        config.n_workers = 2
+        config.threads_per_worker = 1
+        config.storage_path = str(tmp_path / "study.log")
+        trainer = ModelTrainer(X, y, random_state=42)
+
+        # when
+        model, params = trainer.run_optimization(test_size=0.2, config=config)
+
+        # then
+        assert (tmp_path / "study.log").exists()
+        assert trainer.num_threads == 1
+        assert "n_estimators" in params
+        assert model.predict(X.head(5)).shape[0] == 5
+
+    def test_optimize_resumes_persisted_study(self, tmp_path):
+        """A rerun on the same data tops the persisted study up to n_trials."""
+        # given
+        X, y = _make_synthetic_data(n_samples=150, n_features=4)
+        config = _make_optuna_config(n_trials=2)
+        config.storage_path = str(tmp_path / "studies.log")
+        ModelTrainer(X, y, random_state=42).optimize(test_size=0.2, config=config)
+
+        # when
+        config.n_trials = 3
+        ModelTrainer(X, y, random_state=42).optimize(test_size=0.2, config=config)
+        config.extend_study = True
+        ModelTrainer(X, y, random_state=42).optimize(test_size=0.2, config=config)
+
+        # then
+        summaries = optuna.get_all_study_summaries(
+            _journal_storage(config.storage_path)
+        )
+        assert [summary.n_trials for summary in summaries] == [6]
+
+    def test_optimize_warm_starts_new_study_from_latest(self, tmp_path):
+        """A study for new data starts with the best params of the previous study."""
+        # given
+        config = _make_optuna_config(n_trials=2)
+        config.storage_path = str(tmp_path / "studies.log")
+        X, y = _make_synthetic_data(n_samples=150, n_features=4)
+        first = ModelTrainer(X, y, random_state=42).optimize(0.2, config)
+
+        # when
+        X, y = _make_synthetic_data(n_samples=150, n_features=4, seed=7)
+        ModelTrainer(X, y, random_state=42).optimize(0.2, config)
+
+        # then
+        storage = _journal_storage(config.storage_path)
+        summaries = optuna.get_all_study_summaries(storage)
+        assert len(summaries) == 2
+        second = optuna.load_study(study_name=summaries[1].study_name, storage=storage)
+        warm_trial = second.trials[0]
+        assert warm_trial.user_attrs["warm_start_from"] == summaries[0].study_name
+        assert warm_trial.params == {
+            name: value for name, value in first.items() if name != "random_state"
+        }
+
+    def test_run_optimization_with_early_stopping_and_pruner(self):
+        """Early stopping caps n_estimators of the best params at the best iteration."""
+        # given
+        X, y = _make_synthetic_data(n_samples=300, n_features=4)
+        config = _make_optuna_config(n_trials=4)
+        config.n_estimators = IntRange(min=50, max=200)
+        config.early_stopping_rounds = 5
+        config.pruner = "median"
+        trainer = ModelTrainer(X, y, random_state=42)
+
+        # when
+        _, params = trainer.run_optimization(test_size=0.2, config=config)
+
+        # then
+        assert 1 <= params["n_estimators"] <= 200
+
+    def test_run_optimization_with_cross_validation(self):
+        """CV mode scores trials by the mean accuracy over stratified folds."""
+        # given
+        X, y = _make_synthetic_data(n_samples=300, n_features=4)
+        config = _make_optuna_config(n_trials=2)
+        config.cv_folds = 3
+        config.early_stopping_rounds = 5
+        config.threads_per_worker = 2
+        trainer = ModelTrainer(X, y, random_state=42)
+
+        # when
+        model, params = trainer.run_optimization(test_size=0.2, config=config)
+
+        # then
+        assert model.predict(X.head(5)).shape[0] == 5
+        assert params["n_estimators"] <= config.n_estimators.max
+        assert trainer._folds is None
+
+    def test_cross_validation_prunes_after_first_fold(self):
+        """A trial the pruner rejects stops after its first fold."""
+
+        # given
+        class AlwaysPrune(optuna.pruners.BasePruner):
+            def prune(self, study, trial):
+                return True
+
+        X, y = _make_synthetic_data(n_samples=300, n_features=4)
+        config = _make_optuna_config(n_trials=1)
+        config.cv_folds = 4
+        trainer = ModelTrainer(X, y, random_state=42)
+        trainer.num_threads = 1
+        study = optuna.create_study(direction="maximize", pruner=AlwaysPrune())
+
+        # when
+        trainer._optimize(study, test_size=0.2, config=config, n_trials=1)
+
+        # then
+        trial = study.trials[0]
+        assert trial.state == optuna.trial.TrialState.PRUNED
+        assert list(trial.intermediate_values) == [1]
+
+    @pytest.mark.parametrize(
+        "name, pruner_type",
+        [
+            (None, "NopPruner"),
+            ("median", "MedianPruner"),
+            ("successive_halving", "SuccessiveHalvingPruner"),
+            ("hyperband", "HyperbandPruner"),
+        ],
+    )
+    def test_create_pruner(self, name, pruner_type):
+        """Pruner is selected by its config name."""
+        # given
+        config = _make_optuna_config()
+        config.pruner = name
+
+        # when / then
+        assert type(_create_pruner(config)).__name__ == pruner_type
+
+    def test_create_pruner_unknown_raises(self):
+        """An unknown pruner name is rejected."""
+        config = _make_optuna_config()
+        config.pruner = "random"
+        with pytest.raises(ValueError):
+            _create_pruner(config)
+
+    @pytest.mark.parametrize(
+        "metric, cv_folds",
+        [("auc", None), ("logloss", None), ("f1", None), ("f1", 3)],
+    )
+    def test_optimize_with_configured_metric(self, metric, cv_folds):
+        """Trials are scored by the configured metric in its direction."""
+        # given
+        X, y = _make_synthetic_data()
+        config = _make_optuna_config(n_trials=3)
+        config.metric = metric
+        config.cv_folds = cv_folds
+        config.pruner = "median"
+        trainer = ModelTrainer(X, y, random_state=42)
+
+        # when
+        trainer.optimize(test_size=0.2, config=config)
+
+        # then
+        values = [profile["value"] for profile in trainer.trial_profiles]
+        if metric == "logloss":
+            assert all(0 < value < 1 for value in values)
+        else:
+            assert all(0.5 < value <= 1 for value in values)
+
+    def test_optimize_unknown_metric_raises(self):
+        """An unknown objective metric is rejected before any trial runs."""
+        X, y = _make_synthetic_data()
+        config = _make_optuna_config()
+        config.metric = "precision"
+        with pytest.raises(ValueError, match="Unknown metric"):
+            ModelTrainer(X, y).optimize(test_size=0.2, config=config)
+
+    @pytest.mark.parametrize("inference_cost", ["complexity", "latency"])
+    def test_multi_objective_optimize_writes_pareto_front(
+        self, tmp_path, inference_cost
+    ):
+        """The Pareto front trades the metric against inference cost."""
+        # given
+        X, y = _make_synthetic_data()
+        config = _make_optuna_config(n_trials=8)
+        config.metric = "auc"
+        config.inference_cost = inference_cost
+        config.pruner = "median"
+        config.pareto_front_path = str(tmp_path / "pareto_front.json")
+        trainer = ModelTrainer(X, y, random_state=42)
+
+        # when
+        params = trainer.optimize(test_size=0.2, config=config)
+
+        # then
+        front = trainer.pareto_front
+        assert front
+        assert json.loads((tmp_path / "pareto_front.json").read_text()) == front
+        costs = [row[inference_cost] for row in front]
+        assert costs == sorted(costs) and costs[0] > 0
+        # Non-dominated: a higher cost must buy a better score
+        for cheaper, dearer in zip(front, front[1:], strict=False):
+            assert dearer["auc"] > cheaper["auc"]
+        best = max(front, key=lambda row: row["auc"])
+        assert params == {**best["params"], "random_state": 42}
+
+    def test_multi_objective_selects_within_cost_limit(self):
+        """max_inference_cost picks the best trial the serving budget allows."""
+        # given
+        X, y = _make_synthetic_data()
+        config = _make_optuna_config(n_trials=8)
+        config.metric = "auc"
+        config.inference_cost = "complexity"
+        trainer = ModelTrainer(X, y, random_state=42)
+        trainer.optimize(test_size=0.2, config=config)
+        cheapest = trainer.pareto_front[0]
+        config.max_inference_cost = cheapest["complexity"]
+
+        # when
+        params = trainer.optimize(test_size=0.2, config=config)
+
+        # then
+        assert params == {**cheapest["params"], "random_state": 42}
+
+    def test_prepare_fidelities_cuts_nested_stratified_samples(self):
+        """Fidelity samples are stratified, sized by fraction and nested."""
+        # given
+        X, y = _make_synthetic_data(n_samples=500)
+        trainer = ModelTrainer(X, y, random_state=42)
+        trainer._prepare_hold_out(test_size=0.2)
+
+        # when
+        trainer._prepare_fidelities([0.1, 0.5])
+
+        # then
+        train_labels = trainer._train_set.get_label()
+        small, large = trainer._fidelity_sets
+        assert [small.num_data(), large.num_data()] == [40, 200]
+        assert set(small.used_indices) <= set(large.used_indices)
+        for sample in (small, large):
+            assert sample.get_label().mean() == pytest.approx(
+                train_labels.mean(), abs=0.02
+            )
+
+    def test_multi_fidelity_search_prunes_low_ranked_trials(self):
+        """Trials train on all rows only after ranking well on every sample."""
+        # given
+        X, y = _make_synthetic_data(n_samples=400)
+        config = _make_optuna_config(n_trials=8)
+        config.metric = "auc"
+        config.fidelities = [0.25, 0.5]
+        config.fidelity_reduction_factor = 2
+        trainer = ModelTrainer(X, y, random_state=42)
+        study = optuna.create_study(direction="maximize")
+        trainer.num_threads = 1
+
+        # when
+        trainer._optimize(study, test_size=0.2, config=config, n_trials=8)
+
+        # then
+        completed = study.get_trials(states=(optuna.trial.TrialState.COMPLETE,))
+        pruned = study.get_trials(states=(optuna.trial.TrialState.PRUNED,))
+        assert completed and pruned
+        assert all(len(t.user_attrs["fidelity_scores"]) == 2 for t in completed)
+        assert all(t.user_attrs["fidelity_scores"] for t in pruned)
+        assert trainer._fidelity_sets is None
+
+    def test_multi_fidelity_with_cross_validation_raises(self):
+        """Row samples are cut from the hold-out training set only."""
+        X, y = _make_synthetic_data()
+        config = _make_optuna_config()
+        config.fidelities = [0.5]
+        config.cv_folds = 3
+        with pytest.raises(ValueError, match="fidelities"):
+            ModelTrainer(X, y).optimize(test_size=0.2, config=config)
+
+    @pytest.mark.parametrize("encoding", ["category", "sparse"])
+    def test_run_optimization_with_encodings(self, encoding):
+        """Trainer accepts native categorical and sparse encoded features."""
+        # given
+        rng = np.random.default_rng(0)
+        raw = pd.DataFrame(
+            {
+                "g": rng.choice(["a", "b", "c"], size=200),
+                "x": rng.standard_normal(200),
+            }
+        )
+        y = pd.Series((raw["g"] == "a").astype(int))
+        if encoding == "category":
+            X = raw.astype({"g": "category"})
+        else:
+            X = pd.get_dummies(raw, columns=["g"], sparse=True)
+            X = X.astype({"x": pd.SparseDtype(float, 0)})
+        trainer = ModelTrainer(X, y, random_state=42)
+
+        # when
+        trainer.run_optimization(test_size=0.2, config=_make_optuna_config())
+        with warnings.catch_warnings():
+            # e.g. "X does not have valid feature names" for the sparse matrix
+            warnings.simplefilter("error")
+            preds = trainer.evaluate(X.head(10), y.head(10))
+            proba = trainer.predict_proba(X.head(10))
+
+        # then
+        assert preds.shape[0] == 10
+        np.testing.assert_array_equal(preds, (proba > 0.5).astype(int))
+        np.testing.assert_allclose(
+            proba, trainer.best_model.predict_proba(X.head(10))[:, 1]
+        )